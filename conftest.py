@@ -0,0 +1 @@
+# root conftest: membuat paket `spklu` bisa di-import saat pytest dijalankan dari root repo
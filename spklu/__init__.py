@@ -0,0 +1,3 @@
+"""
+Modul pendukung untuk dashboard optimasi lokasi SPKLU (`spklu_app.py`).
+"""
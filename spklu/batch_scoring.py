@@ -0,0 +1,135 @@
+"""
+Skoring banyak lokasi hipotetis sekaligus dengan model Gradient Boosting.
+
+Input divalidasi terhadap kolom yang diharapkan pipeline, kolom turunan
+diisi dengan aturan yang sama seperti form di sidebar, lalu diprediksi
+per chunk (satu panggilan `predict` vektor per chunk).
+"""
+
+import io
+
+import numpy as np
+import pandas as pd
+
+CHUNK_SIZE = 20_000
+
+NUMERIC_FEATURES = ['total_level2', 'total_dc_fast', 'avg_station_age_days',
+                    'last_station_opened_days_ago', 'new_station_last_2_years']
+CATEGORICAL_FEATURES = ['dominant_facility_type', 'dominant_ev_network',
+                        'dominant_interaction']
+
+# kolom minimal yang wajib ada di file upload, sisanya bisa diturunkan
+REQUIRED_COLUMNS = ['total_level2', 'total_dc_fast', 'dominant_facility_type',
+                    'dominant_ev_network', 'avg_station_age_days']
+
+# nilai default sama dengan form prediksi di sidebar
+DEFAULT_NEW_STATIONS = 2
+LAST_OPENED_RATIO = 0.5
+
+# pilihan & rentang input form prediksi (dipakai juga oleh sweep what-if)
+FACILITY_TYPES = ['HOTEL', 'CAR_DEALER', 'PUBLIC', 'OFFICE_BLDG', 'PARKING_LOT', 'FED_GOV',
+                  'GAS_STATION', 'MUNI_GOV', 'SHOPPING_CENTER', 'RESTAURANT', 'COLLEGE_CAMPUS',
+                  'CONVENIENCE_STORE', 'OTHER']
+EV_NETWORK_TYPES = ['ChargePoint Network', 'Non-Networked', 'Blink Network', 'Tesla Destination',
+                    'Tesla', 'EV Connect', 'AMPUP', 'SHELL_RECHARGE', 'FLO', 'Electrify America',
+                    'EVgo', 'OTHER_NETWORK']
+INPUT_RANGES = {
+    'total_level2': (0, 1056),
+    'total_dc_fast': (0, 151),
+    'avg_station_age_days': (0, 8519),
+}
+
+LAT_COLUMNS = ('latitude', 'avg_latitude', 'lat')
+LON_COLUMNS = ('longitude', 'avg_longitude', 'lon', 'lng')
+
+
+def expected_columns(model):
+    """Kolom input pipeline (urutan saat training)."""
+    return list(getattr(model, 'feature_names_in_', REQUIRED_COLUMNS))
+
+
+def read_sites(file, name=None):
+    """Baca file CSV / Parquet (path atau file-like dari st.file_uploader)."""
+    name = name or getattr(file, 'name', str(file))
+    if name.lower().endswith('.parquet'):
+        return pd.read_parquet(file)
+    if hasattr(file, 'getvalue'):
+        file = io.BytesIO(file.getvalue())
+    return pd.read_csv(file)
+
+
+def prepare_sites(df, model):
+    """
+    Validasi dan lengkapi kolom fitur.
+
+    Raises
+    ------
+    ValueError kalau kolom wajib tidak ada atau kolom numerik tidak valid.
+    """
+    columns = expected_columns(model)
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f'Kolom berikut tidak ditemukan: {missing}')
+
+    # nilai kosong (NaN) diteruskan ke imputer pipeline, hanya teks bukan angka yang ditolak
+    features = pd.DataFrame(index=df.index)
+    for col in NUMERIC_FEATURES:
+        if col in df.columns:
+            features[col] = pd.to_numeric(df[col], errors='coerce')
+
+    invalid = [col for col in features.columns
+               if (features[col].isna() & df[col].notna()).any()]
+    if invalid:
+        raise ValueError(f'Kolom numerik berisi nilai bukan angka: {invalid}')
+
+    for col in CATEGORICAL_FEATURES:
+        if col in df.columns:
+            # astype(str) mengubah NaN menjadi kategori 'nan'
+            features[col] = df[col].astype(object).where(df[col].notna())
+
+    if 'dominant_interaction' not in features.columns:
+        features['dominant_interaction'] = (features['dominant_facility_type'] + '_' +
+                                            features['dominant_ev_network'])
+    if 'new_station_last_2_years' not in features.columns:
+        features['new_station_last_2_years'] = DEFAULT_NEW_STATIONS
+    if 'last_station_opened_days_ago' not in features.columns:
+        features['last_station_opened_days_ago'] = (features['avg_station_age_days'] *
+                                                    LAST_OPENED_RATIO)
+
+    unknown = [col for col in columns if col not in features.columns]
+    if unknown:
+        raise ValueError(f'Model membutuhkan kolom yang tidak dikenal: {unknown}')
+    return features[columns]
+
+
+def score_sites(model, features, chunk_size=CHUNK_SIZE):
+    """Prediksi demand untuk semua baris, per chunk."""
+    predictions = np.empty(len(features), dtype=np.float64)
+    for start in range(0, len(features), chunk_size):
+        chunk = features.iloc[start:start + chunk_size]
+        predictions[start:start + len(chunk)] = model.predict(chunk)
+    return predictions
+
+
+def coordinate_columns(df):
+    """Nama kolom (lat, lon) kalau ada, untuk ditampilkan di peta."""
+    lat = next((col for col in LAT_COLUMNS if col in df.columns), None)
+    lon = next((col for col in LON_COLUMNS if col in df.columns), None)
+    if lat is None or lon is None:
+        return None
+    return lat, lon
+
+
+def score_frame(model, df, chunk_size=CHUNK_SIZE):
+    """Validasi + skoring, return salinan df dengan kolom `predicted_demand`."""
+    features = prepare_sites(df, model)
+    result = df.copy()
+    result['predicted_demand'] = score_sites(model, features, chunk_size)
+    return result
+
+
+def model_fingerprint(model):
+    """Hash isi model (kunci cache hasil turunan model: sweep, SHAP)."""
+    import joblib
+
+    return joblib.hash(model)[:16]
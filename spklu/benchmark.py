@@ -0,0 +1,186 @@
+"""
+Benchmark tahap-tahap data dashboard di beberapa skala, tanpa network.
+
+    python -m spklu.benchmark                         # 10k / 100k / 1M stasiun
+    python -m spklu.benchmark --sizes 10000 --repeats 5 --baseline hasil_lama.json
+
+Data dibangkitkan oleh `spklu.synthetic`; jumlah baris ZIP = ZIP_RATIO x
+jumlah stasiun, dibatasi MAX_ZIPS (jumlah ZIP di US ~41 ribu). Hasil ditulis
+sebagai JSON (satu entri per tahap x skala, plus metadata versi library) ke
+folder `benchmarks/`, sehingga beberapa run bisa dibandingkan dengan
+`--baseline`.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from spklu.cluster_profile import cluster_profile
+from spklu.coverage import coverage_from_frame
+from spklu.snapshot_store import recommendation_frame, zip_state_index
+from spklu.synthetic import synthetic_stations, synthetic_zip_tables
+from spklu.zoning import ZoningService
+
+SIZES = (10_000, 100_000, 1_000_000)
+REPEATS = 3
+ZIP_RATIO = 0.2
+MAX_ZIPS = 41_000
+RESULTS_DIR = 'benchmarks'
+MODEL_PATH = 'best_model_Gradient_Boosting.pkl'
+
+# parameter default dashboard
+TOP_STATES = 5
+TOP_N = 50
+NUM_CLUSTER = 5
+RADIUS_KM = 10.0
+
+
+def _timeit(fn, repeats):
+    timings = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings[i] = time.perf_counter() - start
+    return {'min_s': float(timings.min()), 'median_s': float(np.median(timings)),
+            'max_s': float(timings.max())}
+
+
+def filter_top_n(recommendations, top_states=TOP_STATES, top_n=TOP_N):
+    """Filter State + sort Top N seperti tab rekomendasi."""
+    states = recommendations['State'].value_counts().head(top_states).index
+    selected = recommendations[recommendations['State'].isin(states)]
+    return selected.sort_values('predicted_demand_covered', ascending=False).head(top_n)
+
+
+def _kmeans(coords):
+    # service baru tiap repeat supaya tidak kena cache / warm start
+    service = ZoningService(k_range=[NUM_CLUSTER])
+    return service.get(coords, NUM_CLUSTER)
+
+
+def _load_predictors(model_path):
+    if not os.path.exists(model_path):
+        return {}
+    import joblib
+    from sklearn import set_config
+
+    from spklu.fast_inference import FastPipeline, UnsupportedPipelineError
+
+    set_config(transform_output='pandas')
+    model = joblib.load(model_path)
+    predictors = {'model_scoring': model}
+    try:
+        predictors['model_scoring_fast'] = FastPipeline.from_pipeline(model)
+    except UnsupportedPipelineError:
+        pass
+    return predictors
+
+
+def stage_functions(n_stations, predictors=None, seed=0):
+    """Data sintetis untuk satu skala + dict {nama tahap: (jumlah baris, fungsi)}."""
+    n_zips = min(max(int(n_stations * ZIP_RATIO), 1), MAX_ZIPS)
+    stations = synthetic_stations(n_stations, seed)
+    zip_table, raw_recommendations = synthetic_zip_tables(n_zips, seed)
+    zip_state = zip_state_index(zip_table)
+    recommendations = recommendation_frame(raw_recommendations, zip_state)
+    coords = stations[['latitude', 'longitude']]
+    clustered = stations.assign(cluster_label=_kmeans(coords).labels)
+
+    stages = {
+        'recommendation_filter_top_n': (n_zips, lambda: filter_top_n(recommendations)),
+        'zip_state_merge': (n_zips, lambda: recommendation_frame(raw_recommendations, zip_state)),
+        'kmeans_zoning': (n_stations, lambda: _kmeans(coords)),
+        'cluster_profile': (n_stations, lambda: cluster_profile(clustered)),
+        'coverage_matrix': (n_zips, lambda: coverage_from_frame(recommendations, RADIUS_KM)),
+    }
+    if predictors:
+        from spklu.batch_scoring import score_sites
+        from spklu.fast_inference import sample_inputs
+
+        model = predictors['model_scoring']
+        features = sample_inputs(model, n_zips, seed)
+        for name, predictor in predictors.items():
+            stages[name] = (n_zips, lambda p=predictor: score_sites(p, features))
+    return stages
+
+
+def run(sizes=SIZES, repeats=REPEATS, model_path=MODEL_PATH, stages=None, seed=0):
+    predictors = _load_predictors(model_path) if model_path else {}
+    results = []
+    for n_stations in sizes:
+        for name, (n_rows, fn) in stage_functions(n_stations, predictors, seed).items():
+            if stages and name not in stages:
+                continue
+            timing = _timeit(fn, repeats)
+            results.append({'stage': name, 'n_stations': n_stations, 'n_rows': n_rows,
+                             'repeats': repeats, **timing})
+            print(f"{name:<30} {n_stations:>10,} stasiun  median {timing['median_s'] * 1000:10.1f} ms")
+    return {'meta': _metadata(seed), 'results': results}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _metadata(seed):
+    import pandas as pd
+    import sklearn
+
+    return {
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git_commit': _git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+        'seed': seed,
+    }
+
+
+def compare(report, baseline):
+    """Rasio median baseline / sekarang per (tahap, skala); > 1 berarti lebih cepat."""
+    old = {(r['stage'], r['n_stations']): r['median_s'] for r in baseline['results']}
+    return {f"{r['stage']}@{r['n_stations']}": old[r['stage'], r['n_stations']] / r['median_s']
+            for r in report['results'] if (r['stage'], r['n_stations']) in old}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark tahap data dengan data sintetis')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES))
+    parser.add_argument('--repeats', type=int, default=REPEATS)
+    parser.add_argument('--stages', nargs='+', help='hanya jalankan tahap tertentu')
+    parser.add_argument('--model', default=MODEL_PATH, help="'' untuk skip skoring model")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='file JSON hasil (default: benchmarks/<timestamp>.json)')
+    parser.add_argument('--baseline', help='file JSON run sebelumnya untuk dibandingkan')
+    args = parser.parse_args()
+
+    report = run(args.sizes, args.repeats, args.model, args.stages, args.seed)
+    output = args.output or os.path.join(
+        RESULTS_DIR, datetime.now().strftime('%Y%m%d-%H%M%S') + '.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f'hasil ditulis ke {output}')
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        for key, speedup in compare(report, baseline).items():
+            print(f'{key:<42} {speedup:6.2f}x')
+
+
+if __name__ == '__main__':
+    main()
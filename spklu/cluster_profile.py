@@ -0,0 +1,88 @@
+"""
+Profil dan warna tiap zona hasil clustering, dihitung dengan operasi vektor.
+
+Semua kolom kategori diubah ke kode integer, lalu jumlah stasiun, fuel
+dominan dan jumlah kota / negara bagian unik per zona dihitung dengan
+`np.bincount` (tanpa groupby + lambda per grup).
+"""
+
+import numpy as np
+import pandas as pd
+
+# color dictionary (RGB) to 20 cluster first
+COLOR_PALETTE = [
+    [255, 0, 0], [0, 255, 0], [0, 0, 255], [255, 255, 0], [0, 255, 255],
+    [255, 0, 255], [128, 0, 0], [0, 128, 0], [0, 0, 128], [128, 128, 0],
+    [128, 0, 128], [0, 128, 128], [255, 128, 0], [255, 0, 128], [128, 255, 0],
+    [0, 255, 128], [0, 128, 255], [128, 0, 255], [192, 192, 192], [64, 64, 64]
+]
+COLOR_ALPHA = 160
+
+_PALETTE = np.asarray(COLOR_PALETTE, dtype=np.uint8)
+
+
+def cluster_colors(labels):
+    """Array RGB (n, 3) uint8; cluster di luar palette kembali ke warna awal."""
+    return _PALETTE[np.asarray(labels) % len(_PALETTE)]
+
+
+def add_color_columns(df, label_col='cluster_label'):
+    """Tambah kolom numerik r, g, b (pakai di pydeck: '[r, g, b, 160]')."""
+    rgb = cluster_colors(df[label_col].to_numpy())
+    return df.assign(r=rgb[:, 0], g=rgb[:, 1], b=rgb[:, 2])
+
+
+def _codes(values):
+    """Kode integer terurut (NaN = -1) dan kategori uniknya."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.cat.remove_unused_categories()
+        order = np.argsort(values.cat.categories.to_numpy())
+        remap = np.empty(len(order), dtype=np.int64)
+        remap[order] = np.arange(len(order))
+        codes = values.cat.codes.to_numpy().astype(np.int64)
+        codes = np.where(codes >= 0, remap[np.maximum(codes, 0)], -1)
+        return codes, values.cat.categories.to_numpy()[order]
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes.astype(np.int64), np.asarray(uniques)
+
+
+def _distinct_per_label(labels, values, n_labels):
+    codes, uniques = _codes(values)
+    valid = codes >= 0
+    pairs = np.unique(labels[valid] * max(len(uniques), 1) + codes[valid])
+    return np.bincount(pairs // max(len(uniques), 1), minlength=n_labels)
+
+
+def _mode_per_label(labels, values, n_labels, missing='N/A'):
+    codes, uniques = _codes(values)
+    valid = codes >= 0
+    n_unique = max(len(uniques), 1)
+    table = np.bincount(labels[valid] * n_unique + codes[valid],
+                        minlength=n_labels * n_unique).reshape(n_labels, n_unique)
+    # argmax ambil indeks pertama -> kategori terkecil saat seri, sama seperti mode()[0]
+    best = table.argmax(axis=1)
+    result = np.asarray(uniques, dtype=object)[best] if len(uniques) else \
+        np.full(n_labels, missing, dtype=object)
+    result[table.max(axis=1) == 0] = missing
+    return result
+
+
+def cluster_profile(df, label_col='cluster_label'):
+    """
+    Tabel 'Profil Tiap Zona': jumlah stasiun, fuel dominan, jumlah kota
+    dan negara bagian unik per zona.
+    """
+    labels = df[label_col].to_numpy().astype(np.int64)
+    n_labels = int(labels.max()) + 1 if len(labels) else 0
+
+    counts = np.bincount(labels, minlength=n_labels)
+    # seperti agg 'count' di versi groupby: nama stasiun kosong tidak dihitung
+    named = df['station_name'].notna().to_numpy()
+    profile = pd.DataFrame({
+        'Zona ID': np.arange(n_labels),
+        'Total Stasiun': np.bincount(labels[named], minlength=n_labels),
+        'Dominan Fuel': _mode_per_label(labels, df['fuel_type'], n_labels),
+        'Jml Kota': _distinct_per_label(labels, df['city'], n_labels),
+        'Jml N.Bagian': _distinct_per_label(labels, df['state'], n_labels),
+    })
+    return profile[counts > 0].reset_index(drop=True)
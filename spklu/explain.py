@@ -0,0 +1,213 @@
+"""
+Atribusi TreeSHAP per ZIP dan per prediksi ad-hoc, di-cache di disk.
+
+TreeSHAP dihitung pada matriks fitur final (hasil `FastPipeline.transform`)
+lalu kolom one-hot dijumlahkan kembali ke kolom input asalnya, sehingga satu
+nilai per input form (total_level2, dominant_ev_network, ...). Nilai dasar +
+jumlah atribusi = prediksi model.
+
+- Atribusi semua ZIP di tabel fitur dihitung per batch di proses terpisah
+  (TreeSHAP menahan GIL selama satu batch) dan disimpan sebagai tabel Arrow
+  `zip-<fingerprint model>-<fingerprint data>`.
+- Prediksi ad-hoc di-cache per baris input (hash) di tabel
+  `adhoc-<fingerprint model>`, jadi input yang sama tidak dihitung dua kali.
+
+    python -m spklu.explain        # precompute atribusi semua ZIP di zip_features.parquet
+"""
+
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from spklu.batch_scoring import model_fingerprint
+from spklu.fast_inference import FastPipeline
+from spklu.process_pool import spawn_executor
+from spklu.snapshot_store import SNAPSHOT_DIR, read_table, write_table, zip_to_int
+
+SHAP_DIR = os.path.join(SNAPSHOT_DIR, 'shap')
+FEATURES_PATH = 'zip_features.parquet'
+
+# TreeSHAP ~1.5 ms per baris untuk model 400 pohon
+SHAP_BATCH = 2_000
+ADHOC_MAX_ROWS = 5_000
+ROW_KEY = 'row_key'
+
+
+def row_keys(X):
+    """Hash per baris input (kunci cache atribusi ad-hoc)."""
+    return pd.util.hash_pandas_object(X, index=False).to_numpy()
+
+
+def top_factors(attributions, n=3):
+    """Teks faktor terbesar per baris, mis. 'total_level2 +2.31 · dominant_ev_network -0.80'."""
+    values = attributions.to_numpy()
+    names = np.asarray(attributions.columns)
+    order = np.argsort(-np.abs(values), axis=1)[:, :n]
+    return pd.Series([' · '.join(f'{names[j]} {values[i, j]:+.2f}' for j in row)
+                      for i, row in enumerate(order)], index=attributions.index)
+
+
+def _zip_job(model, fast, features, data_fp, zip_col, directory):
+    ShapCache(model, fast, directory).zip_attributions(features, data_fp, zip_col)
+
+
+class ShapExplainer:
+    def __init__(self, model, fast=None):
+        import shap
+
+        self.fast = fast or FastPipeline.from_pipeline(model)
+        regressor = list(model.named_steps.values())[-1]
+        self._explainer = shap.TreeExplainer(regressor)
+        self.expected_value = float(np.ravel(self._explainer.expected_value)[0])
+
+        # matriks (fitur final x kolom input) untuk menjumlahkan one-hot ke input asal
+        origin = {idx: col for idx, col, *_ in self.fast.numeric}
+        for col, entry in self.fast.categorical.items():
+            origin.update({idx: col for idx in entry['lookup'].values()})
+        self.columns = [col for col in self.fast.input_columns if col in origin.values()]
+        self._groups = np.zeros((self.fast.n_features, len(self.columns)))
+        for idx, col in origin.items():
+            self._groups[idx, self.columns.index(col)] = 1.0
+
+    def explain(self, X, batch_size=SHAP_BATCH):
+        """Atribusi per kolom input (DataFrame, index ikut X)."""
+        out = np.empty((len(X), len(self.columns)))
+        for start in range(0, len(X), batch_size):
+            features = self.fast.transform(X.iloc[start:start + batch_size])
+            values = self._explainer.shap_values(features, check_additivity=False)
+            out[start:start + len(features)] = values @ self._groups
+        return pd.DataFrame(out, index=X.index, columns=self.columns)
+
+
+class ShapCache:
+    def __init__(self, model, fast=None, directory=SHAP_DIR):
+        self.model = model
+        self.explainer = ShapExplainer(model, fast)
+        self.fingerprint = model_fingerprint(model)
+        self.directory = directory
+        self.error = None
+        self._zip_table = None
+        self._future = None
+        self._lock = threading.Lock()
+        self._adhoc = self._load_adhoc()
+
+    @property
+    def expected_value(self):
+        return self.explainer.expected_value
+
+    # --- atribusi per ZIP ---
+
+    def zip_table_name(self, data_fp):
+        return f'zip-{self.fingerprint}-{data_fp}'
+
+    def zip_attributions(self, features, data_fp, zip_col='ZIP'):
+        """
+        Atribusi semua ZIP (kolom zip_code int32 + satu kolom per input),
+        dibaca dari disk kalau sudah pernah dihitung untuk model & data ini.
+        """
+        name = self.zip_table_name(data_fp)
+        table = read_table(name, self.directory)
+        if table is None:
+            table = self._compute_zips(features, zip_col)
+            write_table(table, name, self.directory)
+        self._zip_table = table
+        return table
+
+    def _compute_zips(self, features, zip_col):
+        # tabel fitur sudah berisi semua kolom model (NaN diimputasi pipeline)
+        X = features[self.explainer.fast.input_columns]
+        # banyak ZIP punya fitur identik: hitung sekali per baris unik
+        keys = row_keys(X)
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        unique = self.explainer.explain(X.iloc[first])
+        table = pd.DataFrame(unique.to_numpy()[inverse].astype(np.float32),
+                             columns=self.explainer.columns)
+        table.insert(0, 'zip_code', zip_to_int(features[zip_col]).to_numpy())
+        return table.dropna(subset=['zip_code']).drop_duplicates('zip_code')
+
+    def precompute_zips(self, features, data_fp, zip_col='ZIP', background=True):
+        """
+        Siapkan atribusi ZIP. Kalau belum ada di disk dan background=True,
+        dihitung di proses terpisah; `zip_table` tetap None sampai selesai.
+        """
+        name = self.zip_table_name(data_fp)
+        if not background or read_table(name, self.directory) is not None:
+            return self.zip_attributions(features, data_fp, zip_col)
+        executor = spawn_executor(1)
+        self._future = executor.submit(_zip_job, self.model, self.explainer.fast, features,
+                                       data_fp, zip_col, self.directory)
+        self._future.add_done_callback(lambda future: self._zip_done(future, name))
+        executor.shutdown(wait=False)
+        return None
+
+    def _zip_done(self, future, name):
+        if future.exception() is not None:
+            self.error = repr(future.exception())
+        else:
+            self._zip_table = read_table(name, self.directory)
+
+    @property
+    def computing(self):
+        return self._future is not None and not self._future.done()
+
+    @property
+    def zip_table(self):
+        """Tabel atribusi ZIP, None selama precompute belum selesai."""
+        return self._zip_table
+
+    # --- atribusi prediksi ad-hoc ---
+
+    def _adhoc_name(self):
+        return f'adhoc-{self.fingerprint}'
+
+    def _load_adhoc(self):
+        table = read_table(self._adhoc_name(), self.directory, memory_map=False)
+        if table is None:
+            return pd.DataFrame(columns=self.explainer.columns,
+                                index=pd.Index([], dtype=np.uint64, name=ROW_KEY))
+        return table.set_index(ROW_KEY)
+
+    def explain_rows(self, X):
+        """Atribusi untuk baris input form; baris yang pernah dihitung diambil dari cache."""
+        X = X[self.explainer.fast.input_columns]
+        keys = row_keys(X)
+        with self._lock:
+            missing = ~np.isin(keys, self._adhoc.index.to_numpy())
+            if missing.any():
+                fresh = self.explainer.explain(X[missing])
+                fresh.index = pd.Index(keys[missing], name=ROW_KEY)
+                adhoc = pd.concat([self._adhoc, fresh]) if len(self._adhoc) else fresh
+                adhoc = adhoc[~adhoc.index.duplicated(keep='last')].tail(ADHOC_MAX_ROWS)
+                write_table(adhoc.reset_index(), self._adhoc_name(), self.directory)
+                self._adhoc = adhoc
+            result = self._adhoc.loc[keys]
+        result.index = X.index
+        return result
+
+
+def main():
+    import joblib
+    from sklearn import set_config
+
+    from spklu.zoning import fingerprint
+
+    parser = argparse.ArgumentParser(description='Precompute atribusi TreeSHAP per ZIP')
+    parser.add_argument('--model', default='best_model_Gradient_Boosting.pkl')
+    parser.add_argument('--features', default=FEATURES_PATH)
+    args = parser.parse_args()
+
+    set_config(transform_output='pandas')
+    features = pd.read_parquet(args.features)
+    cache = ShapCache(joblib.load(args.model))
+    start = time.perf_counter()
+    table = cache.zip_attributions(features, fingerprint(features))
+    print(f'{len(table):,} ZIP dalam {time.perf_counter() - start:.1f} detik -> '
+          f'{cache.zip_table_name(fingerprint(features))}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,345 @@
+"""
+Jalur inferensi cepat untuk pipeline Gradient Boosting.
+
+Pipeline sklearn (ColumnTransformer + OneHotEncoder + seleksi fitur +
+GradientBoostingRegressor) dikompilasi sekali menjadi:
+- parameter imputasi / scaling per kolom numerik,
+- lookup kategori -> index kolom one-hot,
+- array pohon yang diratakan (feature, threshold, child, value),
+sehingga prediksi hanya berupa operasi NumPy tanpa overhead pandas/joblib.
+
+Hasilnya harus sama dengan `model.predict` (dicek dengan `check_parity`).
+
+Micro-benchmark:  python -m spklu.fast_inference
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+PARITY_ATOL = 1e-6
+# baris tunggal yang dicek parity-nya (jalur prediksi form)
+PARITY_SINGLE_ROWS = 8
+
+# di atas jumlah baris ini traversal NumPy kalah cepat dari predict_stages (Cython)
+NUMPY_TRAVERSAL_MAX_ROWS = 64
+
+# kategori None (bukan NaN) tidak diimputasi SimpleImputer, jadi tetap kategori sendiri
+_NONE_KEY = '__none__'
+
+
+class UnsupportedPipelineError(ValueError):
+    pass
+
+
+def _unwrap(transformer):
+    """Pecah Pipeline kecil (imputer -> scaler / onehot) menjadi dict per tipe step."""
+    from sklearn.pipeline import Pipeline
+
+    steps = transformer.steps if isinstance(transformer, Pipeline) else [
+        (None, transformer)]
+    found = {}
+    for _, step in steps:
+        name = type(step).__name__
+        if name in found:
+            raise UnsupportedPipelineError(f'step {name} muncul dua kali')
+        found[name] = step
+    return found
+
+
+def _preprocessor_specs(preprocessor, input_columns):
+    """Spesifikasi setiap kolom output ColumnTransformer, diindeks nama fitur."""
+    specs = {}
+    for name, transformer, columns in preprocessor.transformers_:
+        if transformer == 'drop' or name == 'remainder' and transformer == 'drop':
+            continue
+        if isinstance(columns, slice) or np.asarray(columns).dtype.kind in 'biu':
+            columns = list(np.asarray(input_columns)[columns])
+        if transformer == 'passthrough':
+            for col in columns:
+                specs[col] = ('num', col, np.nan, 0.0, 1.0)
+            continue
+
+        steps = _unwrap(transformer)
+        unknown = set(steps) - {'SimpleImputer', 'StandardScaler', 'OneHotEncoder'}
+        if unknown:
+            raise UnsupportedPipelineError(f'transformer tidak didukung: {unknown}')
+
+        imputer = steps.get('SimpleImputer')
+        fill = imputer.statistics_ if imputer is not None else [np.nan] * len(columns)
+
+        if 'OneHotEncoder' in steps:
+            encoder = steps['OneHotEncoder']
+            if encoder.drop_idx_ is not None or encoder.handle_unknown != 'ignore':
+                raise UnsupportedPipelineError('OneHotEncoder harus drop=None dan handle_unknown=ignore')
+            out_names = encoder.get_feature_names_out(columns)
+            offset = 0
+            for col, fill_value, categories in zip(columns, fill, encoder.categories_):
+                for category in categories:
+                    specs[out_names[offset]] = ('cat', col, fill_value, category)
+                    offset += 1
+        else:
+            scaler = steps.get('StandardScaler')
+            means = scaler.mean_ if scaler is not None and scaler.mean_ is not None \
+                else np.zeros(len(columns))
+            scales = scaler.scale_ if scaler is not None and scaler.scale_ is not None \
+                else np.ones(len(columns))
+            for col, fill_value, mean, scale in zip(columns, fill, means, scales):
+                specs[col] = ('num', col, float(fill_value), float(mean), float(scale))
+    return specs
+
+
+def _selected_features(model):
+    """Urutan nama fitur yang masuk ke regressor setelah semua step seleksi."""
+    steps = list(model.named_steps.values())
+    preprocessor, selectors, regressor = steps[0], steps[1:-1], steps[-1]
+    names = list(preprocessor.get_feature_names_out())
+    for selector in selectors:
+        kind = type(selector).__name__
+        if kind == 'ColumnTransformer':
+            names = list(selector.get_feature_names_out())
+        elif kind == 'VarianceThreshold':
+            names = list(np.asarray(names)[selector.get_support()])
+        elif kind == 'DropDuplicateFeatures':
+            names = [n for n in names if n not in set(selector.features_to_drop_)]
+        else:
+            raise UnsupportedPipelineError(f'step seleksi tidak didukung: {kind}')
+    if hasattr(regressor, 'feature_names_in_'):
+        names = list(regressor.feature_names_in_)
+    return names
+
+
+class FastPipeline:
+    def __init__(self, input_columns, numeric, categorical, trees, baseline,
+                 learning_rate, n_features, estimators=None):
+        self.input_columns = input_columns
+        self.numeric = numeric
+        self.categorical = categorical
+        self.trees = trees
+        self.baseline = baseline
+        self.learning_rate = learning_rate
+        self.n_features = n_features
+        self.estimators = estimators
+
+    @property
+    def feature_names_in_(self):
+        # sama seperti atribut sklearn, supaya bisa dipakai di tempat `model`
+        return np.asarray(self.input_columns, dtype=object)
+
+    @classmethod
+    def from_pipeline(cls, model, verify_with=None):
+        """
+        Kompilasi pipeline yang sudah di-fit. Kalau `verify_with` diberikan
+        (DataFrame input), hasilnya dicek terhadap `model.predict`.
+        """
+        steps = list(model.named_steps.values())
+        regressor = steps[-1]
+        if type(regressor).__name__ != 'GradientBoostingRegressor':
+            raise UnsupportedPipelineError('regressor harus GradientBoostingRegressor')
+        if type(steps[0]).__name__ != 'ColumnTransformer':
+            raise UnsupportedPipelineError('step pertama harus ColumnTransformer')
+
+        input_columns = list(model.feature_names_in_)
+        specs = _preprocessor_specs(steps[0], input_columns)
+        final_names = _selected_features(model)
+
+        numeric, categorical = [], {}
+        for idx, name in enumerate(final_names):
+            spec = specs.get(name)
+            if spec is None:
+                raise UnsupportedPipelineError(f'asal fitur {name} tidak diketahui')
+            if spec[0] == 'num':
+                _, col, fill, mean, scale = spec
+                numeric.append((idx, col, fill, mean, scale))
+            else:
+                _, col, fill, category = spec
+                entry = categorical.setdefault(col, {'fill': fill, 'lookup': {}})
+                key = _NONE_KEY if category is None else category
+                entry['lookup'][key] = idx
+
+        fast = cls(input_columns=input_columns, numeric=numeric,
+                   categorical=categorical, trees=_flatten_trees(regressor),
+                   baseline=_baseline(regressor, len(final_names)),
+                   learning_rate=regressor.learning_rate,
+                   n_features=len(final_names), estimators=regressor.estimators_)
+        if verify_with is not None:
+            diff = check_parity(model, fast, verify_with)
+            if diff > PARITY_ATOL:
+                raise UnsupportedPipelineError(
+                    f'hasil fast path berbeda dari model.predict (selisih {diff:.2e})')
+        return fast
+
+    def transform(self, X):
+        """Matriks fitur final (float32, sama seperti input tree sklearn)."""
+        if not isinstance(X, pd.DataFrame):
+            X = pd.DataFrame(X, columns=self.input_columns)
+        n_rows = len(X)
+        out = np.zeros((n_rows, self.n_features), dtype=np.float64)
+
+        for idx, col, fill, mean, scale in self.numeric:
+            values = np.asarray(X[col], dtype=np.float64)
+            if not np.isnan(fill):
+                values = np.where(np.isnan(values), fill, values)
+            out[:, idx] = (values - mean) / scale
+
+        rows = np.arange(n_rows)
+        for col, entry in self.categorical.items():
+            lookup = entry['lookup']
+            values = np.asarray(X[col], dtype=object).copy()
+            values[values != values] = entry['fill']
+            values[np.equal(values, None)] = _NONE_KEY
+            codes = pd.Categorical(values, categories=list(lookup)).codes
+            targets = np.fromiter(lookup.values(), dtype=np.int64, count=len(lookup))
+            known = codes >= 0
+            out[rows[known], targets[codes[known]]] = 1.0
+
+        return out.astype(np.float32)
+
+    def predict(self, X):
+        features = self.transform(X)
+        if len(features) > NUMPY_TRAVERSAL_MAX_ROWS and self.estimators is not None:
+            return self._predict_stages(features)
+        return self.baseline + self.learning_rate * self.trees.predict(features)
+
+    def _predict_stages(self, features):
+        # evaluator Cython yang sama dengan GradientBoostingRegressor.predict,
+        # tanpa validasi input / konversi pandas
+        from sklearn.ensemble._gradient_boosting import predict_stages
+
+        out = np.full((len(features), 1), self.baseline, dtype=np.float64)
+        predict_stages(self.estimators, features, self.learning_rate, out)
+        return out.ravel()
+
+
+class _FlatForest:
+    """Semua pohon dalam satu set array, ditelusuri bersamaan per kedalaman."""
+
+    def __init__(self, feature, threshold, children, value, roots, depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.depth = depth
+
+    def predict(self, features):
+        n_rows, n_features = features.shape
+        # sklearn membandingkan nilai float32 dengan threshold float64
+        flat = features.astype(np.float64).ravel()
+        row_offset = (np.arange(n_rows, dtype=np.int64) * n_features)[:, None]
+        nodes = np.broadcast_to(self.roots, (n_rows, len(self.roots)))
+        for _ in range(self.depth):
+            x = flat.take(row_offset + self.feature.take(nodes))
+            go_right = x > self.threshold.take(nodes)
+            nodes = self.children.take(nodes * 2 + go_right)
+        return self.value.take(nodes).sum(axis=1)
+
+
+def _flatten_trees(regressor):
+    feature, threshold, children, value, roots = [], [], [], [], []
+    offset, depth = 0, 0
+    for estimator in regressor.estimators_[:, 0]:
+        tree = estimator.tree_
+        n_nodes = tree.node_count
+        leaf = tree.children_left == -1
+        node_ids = np.arange(n_nodes)
+        # daun menunjuk ke dirinya sendiri supaya loop bisa berjalan rata
+        feature.append(np.where(leaf, 0, tree.feature))
+        threshold.append(np.where(leaf, np.inf, tree.threshold))
+        left = np.where(leaf, node_ids, tree.children_left) + offset
+        right = np.where(leaf, node_ids, tree.children_right) + offset
+        children.append(np.column_stack([left, right]).ravel())
+        value.append(tree.value[:, 0, 0])
+        roots.append(offset)
+        offset += n_nodes
+        depth = max(depth, tree.max_depth)
+    return _FlatForest(
+        feature=np.concatenate(feature).astype(np.int64),
+        threshold=np.concatenate(threshold),
+        children=np.concatenate(children).astype(np.int64),
+        value=np.concatenate(value), roots=np.asarray(roots, dtype=np.int64),
+        depth=depth)
+
+
+def _baseline(regressor, n_features):
+    if regressor.init_ == 'zero':
+        return 0.0
+    return float(regressor.init_.predict(np.zeros((1, n_features)))[0])
+
+
+def check_parity(model, fast, X):
+    """
+    Selisih absolut maksimum antara fast path dan `model.predict`, dicek di
+    kedua jalur: seluruh `X` (predict_stages kalau besar) dan traversal NumPy
+    (potongan <= NUMPY_TRAVERSAL_MAX_ROWS baris dan beberapa baris tunggal).
+    """
+    batches = [X, X.iloc[:NUMPY_TRAVERSAL_MAX_ROWS]]
+    batches += [X.iloc[[i]] for i in range(min(len(X), PARITY_SINGLE_ROWS))]
+    return max(float(np.max(np.abs(model.predict(batch) - fast.predict(batch))))
+               for batch in batches)
+
+
+def sample_inputs(model, n_rows=1000, seed=0):
+    """Input sintetis acak dari kategori & statistik yang dipelajari pipeline."""
+    rng = np.random.default_rng(seed)
+    columns = list(model.feature_names_in_)
+    specs = _preprocessor_specs(list(model.named_steps.values())[0], columns)
+    data = {}
+    for col in columns:
+        categories = [spec[3] for spec in specs.values()
+                      if spec[0] == 'cat' and spec[1] == col]
+        if categories:
+            data[col] = rng.choice(np.asarray(categories, dtype=object), n_rows)
+            continue
+        spec = specs.get(col)
+        mean, scale = (spec[3], spec[4]) if spec else (0.0, 1.0)
+        data[col] = np.abs(rng.normal(mean, scale, n_rows)).round()
+    return pd.DataFrame(data, columns=columns)
+
+
+def _latency(predict, X, repeats):
+    timings = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        predict(X)
+        timings[i] = time.perf_counter() - start
+    return {'p50_ms': float(np.percentile(timings, 50) * 1000),
+            'p99_ms': float(np.percentile(timings, 99) * 1000)}
+
+
+def benchmark(model, fast, X, repeats=200, batch_size=1000):
+    """Latensi p50/p99 single-row dan batch untuk pipeline asli vs fast path."""
+    single = X.iloc[:1]
+    batch = X.iloc[:batch_size]
+    batch_repeats = max(repeats // 10, 5)
+    return {
+        'pipeline_single': _latency(model.predict, single, repeats),
+        'fast_single': _latency(fast.predict, single, repeats),
+        'pipeline_batch': _latency(model.predict, batch, batch_repeats),
+        'fast_batch': _latency(fast.predict, batch, batch_repeats),
+    }
+
+
+def main():
+    import joblib
+    from sklearn import set_config
+
+    parser = argparse.ArgumentParser(description='Parity check & micro-benchmark fast path')
+    parser.add_argument('--model', default='best_model_Gradient_Boosting.pkl')
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeats', type=int, default=200)
+    args = parser.parse_args()
+
+    set_config(transform_output='pandas')
+    model = joblib.load(args.model)
+    X = sample_inputs(model, args.rows)
+    fast = FastPipeline.from_pipeline(model, verify_with=X)
+    print(f'parity: selisih maksimum {check_parity(model, fast, X):.2e}')
+    for name, stats in benchmark(model, fast, X, args.repeats, args.rows).items():
+        print(f"{name:<16} p50 {stats['p50_ms']:8.3f} ms   p99 {stats['p99_ms']:8.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+"""
+Agregasi fitur per ZIP dari export mentah AFDC secara streaming.
+
+File dibaca per chunk dan setiap chunk hanya memperbarui akumulator per ZIP
+yang bisa di-merge (jumlah, count, tabel frekuensi kategori dan tanggal buka),
+jadi memori sebanding dengan jumlah ZIP (x tanggal buka berbeda), bukan jumlah
+baris. Tanggal buka disimpan sebagai count per hari, sehingga stasiun terbaru
+yang dihapus ikut menurunkan tanggal buka terakhir dan fitur 2 tahun bisa
+dihitung untuk tanggal acuan kapan pun. Akumulator disimpan
+ke disk sehingga export harian (delta) cukup ditambahkan tanpa memproses
+ulang seluruh histori. Fitur yang dihasilkan sama dengan notebook:
+jumlah_stasiun, avg_latitude, avg_longitude, total_level2, total_dc_fast,
+dominant_facility_type, dominant_ev_network, dominant_interaction,
+avg_station_age_days, last_station_opened_days_ago, new_station_last_2_years.
+
+    python -m spklu.feature_pipeline build alt_fuel_stations_historical_day.csv
+    python -m spklu.feature_pipeline delta export_harian.csv [--removed ...]
+"""
+
+import argparse
+import json
+import os
+import uuid
+
+import numpy as np
+import pandas as pd
+
+RAW_COLUMNS = ['ZIP', 'Fuel Type Code', 'Status Code', 'Country',
+               'EV Level2 EVSE Num', 'EV DC Fast Count', 'Facility Type',
+               'EV Network', 'Open Date', 'Latitude', 'Longitude']
+CHUNK_SIZE = 200_000
+STATE_DIR = 'feature_state'
+FEATURES_PATH = 'zip_features.parquet'
+
+NEW_STATION_YEARS = 2
+
+SUM_COLUMNS = ['n_stations', 'sum_level2', 'sum_dc_fast', 'n_open', 'sum_open_day',
+               'n_coord', 'sum_lat', 'sum_lon']
+CATEGORY_FEATURES = ['dominant_facility_type', 'dominant_ev_network',
+                     'dominant_interaction']
+
+
+def _day_number(timestamp):
+    return int(pd.Timestamp(timestamp).normalize().value // 86_400_000_000_000)
+
+
+def _filter_ev(chunk):
+    mask = ((chunk['Fuel Type Code'] == 'ELEC') &
+            (chunk['Status Code'] == 'E') &
+            (chunk['Country'] == 'US') &
+            chunk['ZIP'].notna())
+    return chunk[mask]
+
+
+class FeatureAccumulator:
+    """Akumulator per ZIP yang bisa di-merge dan disimpan ke disk."""
+
+    def __init__(self, stats=None, categories=None, open_days=None,
+                 rows_processed=0, rows_removed=0):
+        self.stats = stats if stats is not None else pd.DataFrame(
+            columns=SUM_COLUMNS, index=pd.Index([], name='ZIP'))
+        self.categories = categories if categories is not None else pd.Series(
+            dtype=np.int64, index=pd.MultiIndex.from_arrays(
+                [[], [], []], names=['ZIP', 'feature', 'value']), name='count')
+        # jumlah stasiun per (ZIP, hari buka): sumber tanggal buka terakhir & stasiun baru
+        self.open_days = open_days if open_days is not None else pd.Series(
+            dtype=np.int64, index=pd.MultiIndex.from_arrays(
+                [[], []], names=['ZIP', 'open_day']), name='count')
+        # baris yang ditambahkan dan yang dikurangi (--removed) dihitung terpisah
+        self.rows_processed = rows_processed
+        self.rows_removed = rows_removed
+
+    def add(self, chunk, sign=1):
+        """Tambahkan (sign=1) atau kurangi (sign=-1) baris mentah AFDC."""
+        df = _filter_ev(chunk)
+        if df.empty:
+            return
+        zips = df['ZIP'].astype(str).str.strip().to_numpy()
+
+        open_date = pd.to_datetime(df['Open Date'], errors='coerce')
+        has_open = open_date.notna().to_numpy()
+        open_day = np.where(
+            has_open, open_date.to_numpy().astype('datetime64[D]').astype(np.int64), 0)
+
+        lat = pd.to_numeric(df['Latitude'], errors='coerce').to_numpy()
+        lon = pd.to_numeric(df['Longitude'], errors='coerce').to_numpy()
+        has_coord = ~(np.isnan(lat) | np.isnan(lon))
+
+        frame = pd.DataFrame({
+            'ZIP': zips,
+            'n_stations': sign,
+            'sum_level2': sign * pd.to_numeric(df['EV Level2 EVSE Num'], errors='coerce').fillna(0).to_numpy(),
+            'sum_dc_fast': sign * pd.to_numeric(df['EV DC Fast Count'], errors='coerce').fillna(0).to_numpy(),
+            'n_open': sign * has_open.astype(np.int64),
+            'sum_open_day': sign * open_day,
+            'n_coord': sign * has_coord.astype(np.int64),
+            'sum_lat': sign * np.where(has_coord, lat, 0.0),
+            'sum_lon': sign * np.where(has_coord, lon, 0.0),
+        })
+        grouped = frame.groupby('ZIP')[SUM_COLUMNS].sum()
+        if not self.stats.empty:
+            grouped = pd.concat([self.stats[SUM_COLUMNS], grouped]).groupby(level='ZIP').sum()
+        self.stats = grouped
+
+        facility = df['Facility Type']
+        network = df['EV Network']
+        # sama seperti notebook & form prediksi: NaN kalau salah satu bagian kosong
+        interaction = (facility.astype(str) + '_' + network.astype(str)).where(
+            facility.notna() & network.notna())
+        category_frame = pd.concat([
+            pd.DataFrame({'ZIP': zips, 'feature': 'dominant_facility_type',
+                          'value': facility.to_numpy()}),
+            pd.DataFrame({'ZIP': zips, 'feature': 'dominant_ev_network',
+                          'value': network.to_numpy()}),
+            pd.DataFrame({'ZIP': zips, 'feature': 'dominant_interaction',
+                          'value': interaction.to_numpy()}),
+        ]).dropna(subset=['value'])
+        counts = category_frame.groupby(['ZIP', 'feature', 'value']).size() * sign
+        self.categories = self._merge_counts(self.categories, counts)
+
+        if has_open.any():
+            opens = pd.DataFrame({'ZIP': zips[has_open], 'open_day': open_day[has_open]})
+            counts = opens.groupby(['ZIP', 'open_day']).size() * sign
+            self.open_days = self._merge_counts(self.open_days, counts)
+
+        if sign > 0:
+            self.rows_processed += len(df)
+        else:
+            self.rows_removed += len(df)
+
+    @staticmethod
+    def _merge_counts(current, counts):
+        if current.empty:
+            return counts[counts != 0].rename('count')
+        merged = pd.concat([current, counts.rename('count')])
+        merged = merged.groupby(level=list(range(merged.index.nlevels))).sum()
+        return merged[merged != 0].rename('count')
+
+    def add_file(self, path, sign=1, chunk_size=CHUNK_SIZE):
+        reader = pd.read_csv(path, usecols=lambda c: c in RAW_COLUMNS,
+                             dtype={'ZIP': str, 'Facility Type': str,
+                                    'EV Network': str},
+                             chunksize=chunk_size, low_memory=False)
+        for chunk in reader:
+            self.add(chunk, sign=sign)
+
+    def features(self, as_of=None):
+        """Tabel fitur per ZIP, umur stasiun dihitung relatif terhadap `as_of`."""
+        as_of = pd.Timestamp(as_of if as_of is not None else 'today')
+        today = _day_number(as_of)
+        cutoff = _day_number(as_of - pd.DateOffset(years=NEW_STATION_YEARS))
+
+        stats = self.stats[self.stats['n_stations'] > 0]
+        out = pd.DataFrame(index=stats.index)
+        out['jumlah_stasiun'] = stats['n_stations'].astype(np.int64)
+        n_coord = stats['n_coord'].where(stats['n_coord'] > 0)
+        out['avg_latitude'] = stats['sum_lat'] / n_coord
+        out['avg_longitude'] = stats['sum_lon'] / n_coord
+        out['total_level2'] = stats['sum_level2']
+        out['total_dc_fast'] = stats['sum_dc_fast']
+
+        categories = self.categories[self.categories > 0].reset_index()
+        # mode(): count terbanyak, seri -> nilai terkecil
+        dominant = categories.sort_values(['count', 'value'], ascending=[False, True],
+                                          kind='mergesort')
+        dominant = dominant.drop_duplicates(['ZIP', 'feature'])
+        dominant = dominant.pivot(index='ZIP', columns='feature', values='value')
+        for col in CATEGORY_FEATURES:
+            out[col] = dominant[col] if col in dominant.columns else None
+
+        n_open = stats['n_open'].where(stats['n_open'] > 0)
+        out['avg_station_age_days'] = today - stats['sum_open_day'] / n_open
+        opens = self.open_days[self.open_days > 0].reset_index()
+        last_open = opens.groupby('ZIP')['open_day'].max()
+        out['last_station_opened_days_ago'] = today - last_open.reindex(out.index)
+
+        recent = opens[opens['open_day'] > cutoff].groupby('ZIP')['count'].sum()
+        out['new_station_last_2_years'] = recent.reindex(out.index, fill_value=0).astype(np.int64)
+        return out.reset_index()
+
+    def save(self, directory=STATE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        self.stats.to_parquet(os.path.join(directory, 'stats.parquet'))
+        self.categories.to_frame().to_parquet(os.path.join(directory, 'categories.parquet'))
+        self.open_days.to_frame().to_parquet(os.path.join(directory, 'open_days.parquet'))
+        with open(os.path.join(directory, 'meta.json'), 'w') as f:
+            json.dump({'rows_processed': self.rows_processed,
+                       'rows_removed': self.rows_removed}, f)
+
+    @classmethod
+    def load(cls, directory=STATE_DIR):
+        open_days_path = os.path.join(directory, 'open_days.parquet')
+        if not os.path.exists(open_days_path):
+            # state lama hanya menyimpan tanggal buka 3 tahun terakhir
+            raise ValueError(f'state akumulator di {directory} versi lama, jalankan build ulang')
+        with open(os.path.join(directory, 'meta.json')) as f:
+            meta = json.load(f)
+        return cls(
+            stats=pd.read_parquet(os.path.join(directory, 'stats.parquet')),
+            categories=pd.read_parquet(os.path.join(directory, 'categories.parquet'))['count'],
+            open_days=pd.read_parquet(open_days_path)['count'],
+            rows_processed=meta['rows_processed'],
+            rows_removed=meta.get('rows_removed', 0))
+
+
+def write_features(features, path=FEATURES_PATH):
+    tmp_path = f'{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp'
+    features.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Agregasi fitur ZIP dari export AFDC')
+    parser.add_argument('mode', choices=['build', 'delta'])
+    parser.add_argument('path', help='file CSV mentah AFDC (full / delta)')
+    parser.add_argument('--removed', help='CSV baris yang dihapus sejak export terakhir (delta)')
+    parser.add_argument('--state-dir', default=STATE_DIR)
+    parser.add_argument('--output', default=FEATURES_PATH)
+    parser.add_argument('--as-of', default=None, help='tanggal acuan umur stasiun')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if args.mode == 'build':
+        acc = FeatureAccumulator()
+    else:
+        acc = FeatureAccumulator.load(args.state_dir)
+    acc.add_file(args.path, chunk_size=args.chunk_size)
+    if args.removed:
+        acc.add_file(args.removed, sign=-1, chunk_size=args.chunk_size)
+    acc.save(args.state_dir)
+
+    features = acc.features(args.as_of)
+    write_features(features, args.output)
+    print(f'{acc.rows_processed:,} baris diproses, {acc.rows_removed:,} baris dihapus, '
+          f'{len(features):,} ZIP ditulis ke {args.output}')
+
+
+if __name__ == '__main__':
+    main()
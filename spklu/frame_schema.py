@@ -0,0 +1,86 @@
+"""
+Skema in-memory ringkas untuk tabel stasiun & rekomendasi, plus laporan memori.
+
+Kolom teks yang berulang (nama stasiun, kota, state, tipe fuel, status)
+disimpan sebagai categorical dan koordinat sebagai float32 (presisi ~1 m).
+Frame hasil load dipakai bersama semua sesi (`st.cache_resource`) dan
+diperlakukan read-only; turunan per sesi memakai mask atau subset kolom,
+bukan salinan penuh.
+"""
+
+import sys
+
+import numpy as np
+import pandas as pd
+
+STATION_CATEGORICAL = ['station_name', 'city', 'state', 'fuel_type', 'status']
+STATION_FLOAT32 = ['latitude', 'longitude']
+RECOMMENDATION_CATEGORICAL = ['State']
+RECOMMENDATION_FLOAT32 = ['avg_latitude', 'avg_longitude']
+
+SCOPE_SHARED = 'proses (bersama)'
+SCOPE_SESSION = 'sesi'
+
+
+def compact_frame(df, categorical=(), float32=()):
+    """
+    Cast kolom ke category / float32. Kolom yang sudah ringkas tidak disalin,
+    kategori yang tidak terpakai lagi (mis. setelah filter) dibuang.
+    """
+    casts = {}
+    for col in categorical:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            casts[col] = 'category'
+    for col in float32:
+        if col in df.columns and df[col].dtype != np.float32:
+            casts[col] = np.float32
+    if casts:
+        df = df.astype(casts)
+
+    unused = {}
+    for col in categorical:
+        if col in df.columns and casts.get(col) is None:
+            codes = df[col].cat.codes.to_numpy()
+            counts = np.bincount(codes[codes >= 0], minlength=len(df[col].cat.categories))
+            if (counts == 0).any():
+                unused[col] = df[col].cat.remove_unused_categories()
+    return df.assign(**unused) if unused else df
+
+
+def compact_stations(df):
+    return compact_frame(df, STATION_CATEGORICAL, STATION_FLOAT32)
+
+
+def compact_recommendations(df):
+    return compact_frame(df, RECOMMENDATION_CATEGORICAL, RECOMMENDATION_FLOAT32)
+
+
+def object_bytes(obj):
+    """Perkiraan memori (byte) objek: deep untuk DataFrame, rekursif untuk container."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(index=True, deep=True).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(object_bytes(v) for v in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(object_bytes(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+def memory_report(shared, session):
+    """
+    Tabel memori per objek. `shared` / `session` : dict {nama: objek}, objek
+    bersama dihitung sekali per proses, objek sesi dihitung per sesi.
+    """
+    rows = []
+    for scope, objects in ((SCOPE_SHARED, shared), (SCOPE_SESSION, session)):
+        for name, obj in objects.items():
+            if obj is None:
+                continue
+            rows.append({'objek': name, 'cakupan': scope,
+                         'baris': len(obj) if isinstance(obj, (pd.DataFrame, pd.Series)) else None,
+                         'MB': object_bytes(obj) / 1024 ** 2})
+    return pd.DataFrame(rows, columns=['objek', 'cakupan', 'baris', 'MB'])
@@ -0,0 +1,87 @@
+"""
+Data peta pydeck dengan level-of-detail di sisi server.
+
+Pada zoom jauh, stasiun diagregasi ke grid persegi (ukuran sel mengikuti
+zoom) sehingga yang dikirim ke browser hanya satu titik per sel. Titik asli
+baru dikirim saat zoom dekat / jumlah titik kecil, dan hanya kolom yang
+dipakai layer (koordinat float32 + kolom tooltip).
+"""
+
+import numpy as np
+import pandas as pd
+
+# label level detail -> zoom pydeck
+ZOOM_LEVELS = {
+    'Nasional': 3,
+    'Regional': 5,
+    'Kota': 7,
+    'Detail (titik asli)': 9,
+}
+RAW_POINTS_MIN_ZOOM = 9
+MAX_RAW_POINTS = 5_000
+
+# satu sel grid ~ 1/8 lebar tile peta pada zoom tersebut
+_CELL_DEG_AT_ZOOM_0 = 360 / 8
+_KM_PER_DEG = 111.32
+
+
+def cell_size_deg(zoom):
+    return _CELL_DEG_AT_ZOOM_0 / 2 ** zoom
+
+
+def aggregate_grid(df, cell_deg, lat_col='latitude', lon_col='longitude',
+                   group_col=None):
+    """
+    Agregasi titik ke grid persegi.
+
+    Returns
+    -------
+    DataFrame [lat, lon, count, radius (+ group_col)] dengan lat/lon = centroid
+    titik di sel tersebut, radius (meter) sebanding dengan sqrt(count).
+    """
+    lat = df[lat_col].to_numpy(dtype=np.float64)
+    lon = df[lon_col].to_numpy(dtype=np.float64)
+    valid = ~(np.isnan(lat) | np.isnan(lon))
+    lat, lon = lat[valid], lon[valid]
+
+    ix = np.floor((lon + 180) / cell_deg).astype(np.int64)
+    iy = np.floor((lat + 90) / cell_deg).astype(np.int64)
+    key = iy * (int(360 / cell_deg) + 1) + ix
+    if group_col is not None:
+        groups, group_codes = np.unique(df[group_col].to_numpy()[valid],
+                                        return_inverse=True)
+        key = key * len(groups) + group_codes
+
+    cells, inverse, counts = np.unique(key, return_inverse=True, return_counts=True)
+    out = pd.DataFrame({
+        'lat': (np.bincount(inverse, weights=lat) / counts).astype(np.float32),
+        'lon': (np.bincount(inverse, weights=lon) / counts).astype(np.float32),
+        'count': counts.astype(np.int32),
+    })
+    cell_m = cell_deg * _KM_PER_DEG * 1000
+    out['radius'] = (cell_m / 2 * np.sqrt(counts / counts.max())).astype(np.float32)
+    if group_col is not None:
+        out[group_col] = groups[cells % len(groups)]
+    return out
+
+
+def map_frame(df, zoom, columns=(), lat_col='latitude', lon_col='longitude',
+              group_col=None, max_points=MAX_RAW_POINTS):
+    """
+    Pilih antara titik asli dan grid agregat untuk zoom tertentu.
+
+    Returns
+    -------
+    (DataFrame kolom minimal, aggregated: bool). Titik asli memakai kolom
+    `lat`, `lon` dan `columns`; grid memakai output `aggregate_grid`.
+    """
+    if zoom >= RAW_POINTS_MIN_ZOOM or len(df) <= max_points:
+        keep = [c for c in dict.fromkeys(list(columns) + ([group_col] if group_col else []))]
+        raw = df[keep].copy()
+        raw.insert(0, 'lat', df[lat_col].astype(np.float32))
+        raw.insert(1, 'lon', df[lon_col].astype(np.float32))
+        return raw.dropna(subset=['lat', 'lon']), False
+    return aggregate_grid(df, cell_size_deg(zoom), lat_col, lon_col, group_col), True
+
+
+AGGREGATED_TOOLTIP = {"html": "Jumlah Stasiun di Area Ini : <b>{count}</b>"}
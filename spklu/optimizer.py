@@ -0,0 +1,193 @@
+"""
+Optimasi penempatan SPKLU (maximum coverage) langsung di dashboard.
+
+MILP Pyomo/CBC di notebook diganti dengan greedy lazy-evaluated (CELF):
+greedy untuk fungsi submodular seperti ini dijamin mencapai minimal
+(1 - 1/e) ~ 63% dari solusi optimal, dan dengan evaluasi lazy biasanya
+hanya sebagian kecil kandidat yang perlu dihitung ulang di tiap langkah.
+"""
+
+import heapq
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from spklu.coverage import build_coverage_matrix
+
+GREEDY_BOUND = 1 - 1 / np.e
+
+# parameter yang dipakai untuk menghasilkan rekomendasi_lokasi_spklu.csv
+MILP_BUDGET = 50
+MILP_RADIUS_KM = 10
+
+
+@dataclass
+class CoverageSolution:
+    selected: np.ndarray
+    gains: np.ndarray
+    covered_demand: float
+    total_demand: float
+    upper_bound: float
+    evaluations: int
+    elapsed: float
+    timed_out: bool = False
+
+    @property
+    def coverage_ratio(self):
+        return self.covered_demand / self.total_demand if self.total_demand else 0.0
+
+    @property
+    def optimality_ratio(self):
+        """Batas bawah (covered / OPT) yang terbukti untuk solusi ini."""
+        return self.covered_demand / self.upper_bound if self.upper_bound else 1.0
+
+
+def upper_bound(coverage, demand, covered, budget, greedy=False):
+    """
+    Batas atas online: OPT <= f(S) + jumlah k marginal gain terbesar saat ini.
+
+    greedy=True hanya untuk S hasil greedy yang lengkap (tepat `budget`
+    langkah, atau berhenti karena tidak ada gain tersisa): baru saat itu
+    OPT <= f(S) / (1 - 1/e) juga berlaku. Prefix yang terpotong batas waktu
+    tidak memenuhi syarat itu.
+    """
+    covered_demand = float(demand[covered].sum())
+    residual = coverage @ np.where(covered, 0.0, demand)
+    n_cand = coverage.shape[0]
+    k = min(budget, n_cand)
+    top = np.partition(residual, n_cand - k)[n_cand - k:].sum() if k else 0.0
+    bound = covered_demand + float(top)
+    if greedy and covered_demand > 0:
+        bound = min(bound, covered_demand / GREEDY_BOUND)
+    return bound
+
+
+def lazy_greedy_max_coverage(coverage, demand, budget, time_limit=None):
+    """
+    Pilih maksimal `budget` kandidat yang memaksimalkan total demand tercover.
+
+    Parameters
+    ----------
+    coverage : scipy.sparse matrix (n_kandidat, n_area)
+        Output `build_coverage_matrix`; elemen non-zero = area tercover.
+    demand : array-like (n_area,)
+        Demand tiap area.
+    budget : int
+        Jumlah SPKLU baru yang boleh dibangun.
+    time_limit : float, optional
+        Batas waktu (detik); kalau lewat, pilihan sejauh ini dikembalikan
+        dengan `timed_out=True` (tetap prefix yang valid dari urutan greedy).
+    """
+    start = time.perf_counter()
+    coverage = coverage.tocsr()
+    demand = np.asarray(demand, dtype=np.float64)
+    n_cand, n_area = coverage.shape
+    if len(demand) != n_area:
+        raise ValueError('panjang demand harus sama dengan jumlah kolom coverage')
+    if budget < 0:
+        raise ValueError('budget tidak boleh negatif')
+
+    indptr, indices = coverage.indptr, coverage.indices
+    covered = np.zeros(n_area, dtype=bool)
+
+    initial = np.add.reduceat(demand[indices], indptr[:-1]) if len(indices) else \
+        np.zeros(n_cand)
+    # reduceat mengembalikan nilai elemen berikutnya untuk baris kosong
+    initial[np.diff(indptr) == 0] = 0.0
+
+    # heap berisi (-gain, kandidat, putaran saat gain dihitung)
+    heap = [(-g, i, 0) for i, g in enumerate(initial) if g > 0]
+    heapq.heapify(heap)
+
+    selected, gains = [], []
+    evaluations = n_cand
+    timed_out = False
+    while heap and len(selected) < budget:
+        if time_limit is not None and time.perf_counter() - start > time_limit:
+            timed_out = True
+            break
+        neg_gain, i, computed_at = heapq.heappop(heap)
+        if computed_at == len(selected):
+            selected.append(i)
+            gains.append(-neg_gain)
+            covered[indices[indptr[i]:indptr[i + 1]]] = True
+            continue
+
+        row = indices[indptr[i]:indptr[i + 1]]
+        gain = demand[row][~covered[row]].sum()
+        evaluations += 1
+        if gain > 0:
+            heapq.heappush(heap, (-gain, i, len(selected)))
+
+    return CoverageSolution(
+        selected=np.asarray(selected, dtype=np.int64),
+        gains=np.asarray(gains, dtype=np.float64),
+        covered_demand=float(demand[covered].sum()),
+        total_demand=float(demand.sum()),
+        upper_bound=upper_bound(coverage, demand, covered, budget, greedy=not timed_out),
+        evaluations=evaluations,
+        elapsed=time.perf_counter() - start,
+        timed_out=timed_out,
+    )
+
+
+def covered_demand_by_sites(site_lat, site_lon, area_lat, area_lon, demand,
+                            radius_km):
+    """Total demand area yang tercover oleh sekumpulan lokasi (mis. hasil MILP)."""
+    coverage = build_coverage_matrix(site_lat, site_lon, area_lat, area_lon,
+                                     radius_km=radius_km)
+    covered = np.asarray(coverage.sum(axis=0)).ravel() > 0
+    return float(np.asarray(demand, dtype=np.float64)[covered].sum())
+
+
+def candidates_from_stations(df_stations, lat_col='latitude', lon_col='longitude'):
+    """
+    Kandidat area dari tabel stasiun live kalau tabel fitur ZIP tidak ada:
+    satu area per (city, state), demand = jumlah stasiun (sama seperti
+    `jumlah_stasiun` per ZIP di notebook).
+    """
+    df = df_stations.dropna(subset=[lat_col, lon_col, 'city', 'state'])
+    areas = df.groupby(['city', 'state'], observed=True).agg(
+        avg_latitude=(lat_col, 'mean'),
+        avg_longitude=(lon_col, 'mean'),
+        demand=(lat_col, 'size'),
+    ).reset_index()
+    areas['id'] = areas['city'].astype(str) + ', ' + areas['state'].astype(str)
+    return areas[['id', 'avg_latitude', 'avg_longitude', 'demand', 'state']]
+
+
+def solve_placement(areas, budget, radius_km, exact=False):
+    """
+    Jalankan optimasi untuk DataFrame area (`id, avg_latitude, avg_longitude,
+    demand`). Setiap area sekaligus menjadi kandidat lokasi, sama seperti
+    formulasi di notebook.
+
+    Returns
+    -------
+    (DataFrame lokasi terpilih urut sesuai langkah greedy, CoverageSolution)
+    """
+    coverage = build_coverage_matrix(areas['avg_latitude'].to_numpy(),
+                                     areas['avg_longitude'].to_numpy(),
+                                     radius_km=radius_km, exact=exact)
+    solution = lazy_greedy_max_coverage(coverage, areas['demand'].to_numpy(),
+                                        budget)
+    chosen = areas.iloc[solution.selected].reset_index(drop=True)
+    chosen.insert(0, 'urutan', np.arange(1, len(chosen) + 1))
+    chosen['marginal_demand'] = solution.gains
+    return chosen, solution
+
+
+def milp_gap(solution, milp_sites, areas, radius_km):
+    """
+    Bandingkan hasil greedy dengan lokasi hasil MILP pada area yang sama.
+    Nilai positif berarti MILP lebih baik (dalam persen demand MILP).
+    """
+    milp_covered = covered_demand_by_sites(
+        milp_sites['avg_latitude'].to_numpy(), milp_sites['avg_longitude'].to_numpy(),
+        areas['avg_latitude'].to_numpy(), areas['avg_longitude'].to_numpy(),
+        areas['demand'].to_numpy(), radius_km)
+    if milp_covered == 0:
+        return pd.NA, milp_covered
+    return (milp_covered - solution.covered_demand) / milp_covered * 100, milp_covered
@@ -0,0 +1,31 @@
+"""
+Process pool yang aman dibuat dari dalam skrip Streamlit.
+
+Streamlit memasang skrip app sebagai modul `__main__` dengan `__file__` tapi
+tanpa `__spec__`, sehingga worker `spawn` menjalankan ulang seluruh skrip app
+(sebagai `__mp_main__`) saat start. Skrip app memanggil `guard_script_main`
+di baris pertama: `__main__`-nya diberi spec bernama `__main__` (seperti
+`python -c`), jadi worker tidak meng-import skrip sama sekali, termasuk worker
+yang di-start belakangan. Fungsi worker harus berada di modul yang bisa
+di-import (`spklu.*`).
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from importlib.machinery import ModuleSpec
+
+
+def guard_script_main(namespace):
+    """Tandai skrip `namespace` (globals()) supaya tidak dijalankan ulang di worker spawn."""
+    if namespace.get('__spec__') is None:
+        namespace['__spec__'] = ModuleSpec('__main__', None)
+
+
+def spawn_executor(max_workers, initializer=None, initargs=()):
+    """ProcessPoolExecutor (spawn) dengan semua worker langsung di-start."""
+    executor = ProcessPoolExecutor(max_workers=max_workers,
+                                   mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=initializer, initargs=initargs)
+    for _ in range(max_workers):
+        executor.submit(int)
+    return executor
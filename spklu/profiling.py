@@ -0,0 +1,155 @@
+"""
+Instrumentasi waktu per tahap untuk setiap rerun Streamlit.
+
+    profiler = RerunProfiler(st.session_state)
+    with profiler.stage('load_bq', cached=True):
+        df = load_data_from_bq()      # di dalam fungsi cache: record_miss()
+    ...
+    profiler.finish()
+
+Di dalam `st.fragment` yang bisa rerun sendiri, pakai `@profiled(name)` dan
+fungsi `stage()`: saat rerun penuh stage dicatat ke profiler rerun tersebut,
+saat hanya fragment yang rerun dibuat record terpisah dengan scope = name.
+
+`track(name, obj)` mencatat frame yang dibuat pada rerun ini (untuk laporan
+memori per sesi di tab diagnostik); hanya referensi, tidak masuk riwayat.
+
+Cache hit / miss dideteksi dari body fungsi `st.cache_*`: body hanya jalan
+saat miss, jadi `record_miss()` di dalamnya menandai stage yang sedang
+aktif. Hasil disimpan per sesi (jumlah rerun + riwayat) dan bisa ditulis
+sebagai JSON lines ke file di env SPKLU_PROFILE_LOG.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+PROFILE_LOG_ENV = 'SPKLU_PROFILE_LOG'
+DIAGNOSTICS_ENV = 'SPKLU_DIAGNOSTICS'
+HISTORY_SIZE = 50
+
+_SESSION_KEY = '_spklu_profiler'
+_active = threading.local()
+
+
+def record_miss():
+    """Panggil di dalam body fungsi cache untuk menandai cache miss."""
+    profiler = getattr(_active, 'profiler', None)
+    if profiler is not None and profiler._open:
+        profiler._open[-1]['cache'] = 'miss'
+
+
+def stage(name, cached=False):
+    """`profiler.stage` milik profiler aktif (no-op kalau tidak ada)."""
+    profiler = getattr(_active, 'profiler', None)
+    if profiler is None:
+        return nullcontext({})
+    return profiler.stage(name, cached)
+
+
+def track(name, obj):
+    """Catat objek per sesi milik rerun aktif (no-op kalau tidak ada profiler)."""
+    profiler = getattr(_active, 'profiler', None)
+    if profiler is not None:
+        profiler.frames[name] = obj
+
+
+def profiled(name, session_state=None):
+    """Decorator body fragment: stage `name` di rerun penuh, record sendiri di rerun fragment."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if getattr(_active, 'profiler', None) is not None:
+                with stage(name):
+                    return fn(*args, **kwargs)
+            state = session_state
+            if state is None:
+                import streamlit as st
+                state = st.session_state
+            profiler = RerunProfiler(state, scope=name)
+            try:
+                with profiler.stage(name):
+                    return fn(*args, **kwargs)
+            finally:
+                profiler.finish()
+        return wrapper
+    return decorator
+
+
+def diagnostics_enabled(query_params=None):
+    if os.environ.get(DIAGNOSTICS_ENV, '').lower() in ('1', 'true', 'yes'):
+        return True
+    return query_params is not None and query_params.get('diag') == '1'
+
+
+class RerunProfiler:
+    def __init__(self, session_state, log_path=None, scope='app', started_at=None):
+        state = session_state.setdefault(
+            _SESSION_KEY, {'session_id': uuid.uuid4().hex[:8], 'reruns': 0,
+                           'history': []})
+        state['reruns'] += 1
+        self._state = state
+        self.scope = scope
+        self.log_path = log_path if log_path is not None else os.environ.get(PROFILE_LOG_ENV)
+        self.stages = []
+        self.frames = {}
+        self._open = []
+        self._start = started_at if started_at is not None else time.perf_counter()
+        _active.profiler = self
+
+    @property
+    def session_id(self):
+        return self._state['session_id']
+
+    @property
+    def rerun(self):
+        return self._state['reruns']
+
+    @property
+    def history(self):
+        return self._state['history']
+
+    @contextmanager
+    def stage(self, name, cached=False):
+        entry = {'stage': name, 'cache': 'hit' if cached else None}
+        self._open.append(entry)
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry['seconds'] = time.perf_counter() - start
+            self._open.pop()
+            self.stages.append(entry)
+
+    def record(self, name, seconds, cache=None):
+        """Tambahkan stage yang diukur di luar `stage()` (mis. blok import)."""
+        self.stages.append({'stage': name, 'cache': cache, 'seconds': seconds})
+
+    def finish(self):
+        """Tutup rerun ini: simpan ke riwayat sesi dan log JSONL (opsional)."""
+        record = {
+            'ts': time.time(),
+            'session_id': self.session_id,
+            'rerun': self.rerun,
+            'scope': self.scope,
+            'total_seconds': time.perf_counter() - self._start,
+            'stages': self.stages,
+        }
+        history = self._state['history']
+        history.append(record)
+        del history[:-HISTORY_SIZE]
+
+        self.log_event(record)
+        if getattr(_active, 'profiler', None) is self:
+            _active.profiler = None
+        return record
+
+    def log_event(self, record):
+        """Tambahkan satu record ke log JSONL (kalau SPKLU_PROFILE_LOG di-set)."""
+        if self.log_path:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record) + '\n')
@@ -0,0 +1,266 @@
+"""
+Sweep skenario optimasi (budget x radius x region) untuk kurva coverage vs budget.
+
+- Matriks jarak kandidat-area dibangun sekali untuk radius terbesar
+  (`build_coverage_matrix(return_distance=True)`), lalu di-threshold per
+  radius; region = subset baris & kolom matriks yang sama.
+- Urutan lazy greedy bersarang: solusi budget k adalah prefix solusi budget
+  K > k. Jadi tiap (radius, region) cukup diselesaikan sekali untuk budget
+  terbesar dan semua budget lebih kecil diambil dari prefix-nya (warm start
+  antar skenario bertetangga). Batas optimalitas dihitung per budget.
+- Grup (radius, region) dibagi ke process pool; matriks jarak dikirim sekali
+  per worker. Setiap grup punya batas waktu; budget yang belum tercapai saat
+  waktu habis ditandai `time_limit`.
+- Semua hasil disimpan ke satu store Arrow (`scenarios` + `scenario_sites`)
+  yang dibaca dashboard. Read-merge-write store dikunci dengan file lock
+  (`scenarios.lock`), jadi replika / CLI yang menyimpan bersamaan tidak saling
+  menimpa hasil.
+
+    python -m spklu.scenarios --budgets 30 50 80 150 --radii 5 10 25 --regions ALL CA TX
+"""
+
+import argparse
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from spklu.coverage import build_coverage_matrix
+from spklu.optimizer import MILP_BUDGET, MILP_RADIUS_KM, lazy_greedy_max_coverage, upper_bound
+from spklu.process_pool import spawn_executor
+from spklu.snapshot_store import SNAPSHOT_DIR, read_table, write_table, zip_to_int
+
+ALL_REGIONS = 'ALL'
+DEFAULT_BUDGETS = (10, 30, MILP_BUDGET, 80, 150)
+DEFAULT_RADII = (5, MILP_RADIUS_KM, 25)
+TIME_LIMIT_SECONDS = 60
+MAX_WORKERS = 4
+
+SCENARIO_TABLE = 'scenarios'
+SITES_TABLE = 'scenario_sites'
+SCENARIO_KEY = ['data_fp', 'region', 'radius_km', 'budget']
+SITES_KEY = ['data_fp', 'region', 'radius_km']
+
+STORE_LOCK_FILE = 'scenarios.lock'
+
+_store_lock = threading.Lock()
+
+
+def threshold(distance, radius_km):
+    """Matriks coverage (int8) untuk radius <= radius matriks jarak."""
+    coverage = distance.copy()
+    coverage.data = (coverage.data <= radius_km).astype(np.int8)
+    coverage.eliminate_zeros()
+    return coverage
+
+
+def solve_group(distance, demand, regions, radius_km, region, budgets, time_limit=None):
+    """
+    Selesaikan semua budget untuk satu (radius, region).
+
+    Return (baris hasil per budget, DataFrame urutan lokasi terpilih) dengan
+    index lokasi global (posisi di tabel area).
+    """
+    if region == ALL_REGIONS:
+        members = np.arange(len(demand))
+    else:
+        members = np.flatnonzero(regions == region)
+        distance = distance[members][:, members]
+    coverage = threshold(distance, radius_km)
+    local_demand = demand[members]
+    budgets = sorted(budgets)
+    solution = lazy_greedy_max_coverage(coverage, local_demand, budgets[-1], time_limit)
+
+    rows = []
+    covered = np.zeros(len(members), dtype=bool)
+    indptr, indices = coverage.indptr, coverage.indices
+    done = 0
+    for budget in budgets:
+        reached = min(budget, len(solution.selected))
+        for i in solution.selected[done:reached]:
+            covered[indices[indptr[i]:indptr[i + 1]]] = True
+        done = reached
+        covered_demand = float(local_demand[covered].sum())
+        # budget tidak tercapai karena batas waktu (bukan karena demand sudah habis)
+        incomplete = solution.timed_out and reached < budget
+        bound = upper_bound(coverage, local_demand, covered, budget, greedy=not incomplete)
+        rows.append({
+            'region': region, 'radius_km': float(radius_km), 'budget': int(budget),
+            'n_selected': int(reached), 'covered_demand': covered_demand,
+            'total_demand': float(local_demand.sum()),
+            'optimality_ratio': covered_demand / bound if bound else 1.0,
+            'status': 'time_limit' if incomplete else 'ok',
+            'elapsed_s': solution.elapsed,
+        })
+
+    sites = pd.DataFrame({
+        'region': region, 'radius_km': float(radius_km),
+        'urutan': np.arange(1, len(solution.selected) + 1),
+        'area_index': members[solution.selected],
+        'marginal_demand': solution.gains,
+    })
+    return rows, sites
+
+
+# state per worker process: matriks jarak dikirim sekali lewat initializer
+_WORKER_DATA = None
+
+
+def _init_worker(distance, demand, regions):
+    global _WORKER_DATA
+    _WORKER_DATA = (distance, demand, regions)
+
+
+def _solve_in_worker(task):
+    return solve_group(*_WORKER_DATA, *task)
+
+
+def run_scenarios(areas, budgets=DEFAULT_BUDGETS, radii=DEFAULT_RADII, regions=(ALL_REGIONS,),
+                  region_col='state', time_limit=TIME_LIMIT_SECONDS, workers=None,
+                  data_fp=None):
+    """
+    Jalankan grid skenario untuk DataFrame area (`id, avg_latitude,
+    avg_longitude, demand`, opsional kolom region).
+
+    Returns
+    -------
+    (hasil per skenario, urutan lokasi terpilih per (region, radius))
+    """
+    if not budgets or not radii or not regions:
+        raise ValueError('budget, radius dan region minimal satu nilai')
+    regions = list(dict.fromkeys(regions))
+    if any(r != ALL_REGIONS for r in regions) and region_col not in areas.columns:
+        raise ValueError(f'kolom region `{region_col}` tidak ada di tabel area')
+
+    start = time.perf_counter()
+    # preprocessing bersama: jarak semua pasangan dalam radius terbesar
+    distance = build_coverage_matrix(areas['avg_latitude'].to_numpy(),
+                                     areas['avg_longitude'].to_numpy(),
+                                     radius_km=max(radii), return_distance=True)
+    demand = areas['demand'].to_numpy(dtype=np.float64)
+    area_regions = areas[region_col].astype(str).to_numpy() if region_col in areas.columns \
+        else np.full(len(areas), ALL_REGIONS)
+    preprocess_s = time.perf_counter() - start
+
+    tasks = [(radius, region, tuple(budgets), time_limit)
+             for radius in sorted(set(radii)) for region in regions]
+    workers = min(workers or os.cpu_count() or 1, MAX_WORKERS, len(tasks))
+    if workers > 1:
+        executor = spawn_executor(workers, _init_worker, (distance, demand, area_regions))
+        try:
+            outputs = list(executor.map(_solve_in_worker, tasks))
+        finally:
+            executor.shutdown()
+    else:
+        outputs = [solve_group(distance, demand, area_regions, *task) for task in tasks]
+
+    results = pd.DataFrame([row for rows, _ in outputs for row in rows])
+    results['coverage_ratio'] = np.where(results['total_demand'] > 0,
+                                         results['covered_demand'] / results['total_demand'], 0.0)
+    sites = pd.concat([s for _, s in outputs], ignore_index=True)
+    sites['id'] = areas['id'].astype(str).to_numpy()[sites['area_index']]
+    sites = sites.drop(columns='area_index')
+
+    run_meta = {'data_fp': data_fp or '', 'run_at': pd.Timestamp.now(tz='UTC'),
+                'preprocess_s': preprocess_s, 'workers': workers}
+    return results.assign(**run_meta), sites.assign(data_fp=data_fp or '')
+
+
+def load_results(directory=SNAPSHOT_DIR):
+    """(hasil skenario, urutan lokasi) dari store, None kalau belum ada."""
+    results = read_table(SCENARIO_TABLE, directory, memory_map=False)
+    sites = read_table(SITES_TABLE, directory, memory_map=False)
+    return results, sites
+
+
+@contextmanager
+def _locked_store(directory):
+    # thread lock untuk proses ini, flock untuk proses lain (tidak ada di Windows)
+    with _store_lock:
+        try:
+            import fcntl
+        except ImportError:
+            yield
+            return
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, STORE_LOCK_FILE), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def save_results(results, sites, directory=SNAPSHOT_DIR):
+    """Gabungkan hasil baru ke store (skenario yang sama ditimpa hasil terbaru)."""
+    with _locked_store(directory):
+        return _merge_and_write(results, sites, directory)
+
+
+def _merge_and_write(results, sites, directory):
+    old_results, old_sites = load_results(directory)
+    if old_results is not None:
+        results = pd.concat([old_results, results], ignore_index=True)
+        results = results.drop_duplicates(SCENARIO_KEY, keep='last')
+    if old_sites is not None:
+        # urutan lama untuk (data, region, radius) yang dijalankan ulang dibuang
+        rerun = sites[SITES_KEY].drop_duplicates()
+        stale = old_sites.merge(rerun, on=SITES_KEY, how='left', indicator=True)['_merge']
+        sites = pd.concat([old_sites[(stale == 'left_only').to_numpy()], sites],
+                          ignore_index=True)
+    results = results.sort_values(SCENARIO_KEY, ignore_index=True)
+    return (write_table(results, SCENARIO_TABLE, directory),
+            write_table(sites, SITES_TABLE, directory))
+
+
+def scenario_sites(sites, data_fp, region, radius_km, budget):
+    """Lokasi terpilih untuk satu skenario (prefix urutan greedy)."""
+    mask = ((sites['data_fp'] == data_fp) & (sites['region'] == region) &
+            (sites['radius_km'] == radius_km) & (sites['urutan'] <= budget))
+    return sites[mask].sort_values('urutan')
+
+
+def candidate_areas(features_path, zip_state=None):
+    """Area kandidat dari tabel fitur ZIP (+ State dari index ZIP kalau ada)."""
+    df = pd.read_parquet(features_path) if features_path.endswith('.parquet') else \
+        pd.read_csv(features_path, dtype={'ZIP': str})
+    df = df.rename(columns={'ZIP': 'id', 'jumlah_stasiun': 'demand'})
+    df = df.dropna(subset=['avg_latitude', 'avg_longitude'])
+    areas = df[['id', 'avg_latitude', 'avg_longitude', 'demand']].reset_index(drop=True)
+    if zip_state is not None:
+        states = zip_state.set_index('zip_code')['State']
+        areas['state'] = states.reindex(zip_to_int(areas['id'])).to_numpy()
+    return areas
+
+
+def main():
+    from spklu.zoning import fingerprint
+
+    parser = argparse.ArgumentParser(description='Sweep skenario budget x radius x region')
+    parser.add_argument('--features', default='zip_features.parquet')
+    parser.add_argument('--budgets', type=int, nargs='+', default=list(DEFAULT_BUDGETS))
+    parser.add_argument('--radii', type=float, nargs='+', default=list(DEFAULT_RADII))
+    parser.add_argument('--regions', nargs='+', default=[ALL_REGIONS],
+                        help=f"kode State, '{ALL_REGIONS}' untuk semua area")
+    parser.add_argument('--time-limit', type=float, default=TIME_LIMIT_SECONDS)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--dir', default=SNAPSHOT_DIR)
+    args = parser.parse_args()
+
+    areas = candidate_areas(args.features, read_table('zip_state', args.dir))
+    data_fp = fingerprint(areas[['id', 'avg_latitude', 'avg_longitude', 'demand']])
+    start = time.perf_counter()
+    results, sites = run_scenarios(areas, args.budgets, args.radii, args.regions,
+                                   time_limit=args.time_limit, workers=args.workers,
+                                   data_fp=data_fp)
+    save_results(results, sites, args.dir)
+    print(results[['region', 'radius_km', 'budget', 'covered_demand', 'coverage_ratio',
+                   'optimality_ratio', 'status']].to_string(index=False))
+    print(f'{len(results)} skenario dalam {time.perf_counter() - start:.1f} detik')
+
+
+if __name__ == '__main__':
+    main()
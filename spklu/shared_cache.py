@@ -0,0 +1,288 @@
+"""
+Cache bersama lintas proses untuk hasil query dan frame turunan.
+
+`st.cache_data` / `st.cache_resource` hanya berlaku per proses; cache ini
+dipakai bersama semua proses / replika di host yang sama (dan bertahan saat
+restart) lewat backend yang bisa diganti (`CacheBackend`, default
+`SQLiteBackend` berupa satu file lokal). Mode WAL SQLite butuh shared memory
+antar proses, jadi file cache jangan ditaruh di filesystem jaringan (NFS /
+SMB); replika di host berbeda butuh backend lain.
+
+- Kunci = hash teks query atau hash input (`cache_key`).
+- Nilai = DataFrame diserialisasi sebagai Arrow IPC stream terkompresi zstd
+  (`df.attrs` ikut tersimpan).
+- Entri punya TTL. Entri yang lewat TTL tetap disimpan sampai `max_stale`
+  supaya bisa disajikan selagi dihitung ulang; total ukuran dibatasi
+  `max_bytes` (entri yang paling lama tidak dibaca dibuang dulu).
+- Hanya satu worker yang menghitung ulang entri kedaluwarsa (lease lock di
+  backend); worker lain langsung menyajikan salinan lama. Kalau belum ada
+  salinan sama sekali, worker lain menunggu hasil worker pertama.
+
+    python -m spklu.shared_cache            # daftar entri
+    python -m spklu.shared_cache --clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from spklu.snapshot_store import SNAPSHOT_DIR
+
+SHARED_CACHE_ENV = 'SPKLU_SHARED_CACHE'
+DEFAULT_PATH = os.path.join(SNAPSHOT_DIR, 'shared_cache.sqlite')
+DEFAULT_TTL = 600
+MAX_BYTES = 512 * 1024 ** 2
+# entri kedaluwarsa masih boleh disajikan (stale) selama ini
+MAX_STALE = 24 * 3600
+# lease lock: worker yang mati tidak mengunci entri selamanya
+LOCK_LEASE = 300
+# lama worker menunggu hasil worker lain kalau belum ada salinan lama
+WAIT_SECONDS = 120
+POLL_SECONDS = 0.2
+COMPRESSION = 'zstd'
+
+
+def cache_key(namespace, *parts):
+    """Kunci cache: namespace + hash dari teks query / fingerprint input."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    if len(parts) == 1 and isinstance(parts[0], str):
+        # teks query: spasi/indentasi tidak mengubah kunci
+        payload = ' '.join(parts[0].split())
+    return f'{namespace}:{hashlib.sha1(payload.encode("utf-8")).hexdigest()[:24]}'
+
+
+def serialize_frame(df):
+    table = pa.Table.from_pandas(df)
+    sink = pa.BufferOutputStream()
+    options = ipc.IpcWriteOptions(compression=COMPRESSION)
+    with ipc.new_stream(sink, table.schema, options=options) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def deserialize_frame(payload):
+    return ipc.open_stream(pa.py_buffer(payload)).read_all().to_pandas()
+
+
+class CacheBackend:
+    """
+    Interface penyimpanan cache bersama.
+
+    - `get(key)`                   -> (payload bytes, expires epoch) atau None,
+    - `put(key, payload, expires)` -> simpan / timpa lalu evict,
+    - `acquire(key, owner, lease)` -> True kalau lock recompute didapat,
+    - `release(key, owner)`,
+    - `entries()`                  -> DataFrame ringkasan entri.
+    """
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def put(self, key, payload, expires):
+        raise NotImplementedError
+
+    def acquire(self, key, owner, lease=LOCK_LEASE):
+        raise NotImplementedError
+
+    def release(self, key, owner):
+        raise NotImplementedError
+
+    def entries(self):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class SQLiteBackend(CacheBackend):
+    """Satu file SQLite (mode WAL), aman dipakai banyak proses di host yang sama."""
+
+    def __init__(self, path=DEFAULT_PATH, max_bytes=MAX_BYTES, max_stale=MAX_STALE):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_stale = max_stale
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._connect() as con:
+            con.execute('PRAGMA journal_mode=WAL')
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY, payload BLOB NOT NULL, size INTEGER NOT NULL,
+                    created REAL NOT NULL, expires REAL NOT NULL, accessed REAL NOT NULL)
+            """)
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS locks (
+                    key TEXT PRIMARY KEY, owner TEXT NOT NULL, lease_expires REAL NOT NULL)
+            """)
+
+    def _connect(self):
+        # autocommit; transaksi tulis dibuka eksplisit dengan BEGIN IMMEDIATE
+        con = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        con.execute('PRAGMA busy_timeout=30000')
+        return _Closing(con)
+
+    def get(self, key):
+        # entri yang lewat max_stale dianggap tidak ada meski belum di-evict
+        with self._connect() as con:
+            row = con.execute('SELECT payload, expires FROM entries WHERE key = ? AND expires >= ?',
+                              (key, time.time() - self.max_stale)).fetchone()
+            if row is not None:
+                con.execute('UPDATE entries SET accessed = ? WHERE key = ?', (time.time(), key))
+        return row
+
+    def put(self, key, payload, expires):
+        now = time.time()
+        with self._connect() as con:
+            con.execute('BEGIN IMMEDIATE')
+            con.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)',
+                        (key, payload, len(payload), now, expires, now))
+            self._evict(con, now)
+            con.execute('COMMIT')
+
+    def _evict(self, con, now):
+        con.execute('DELETE FROM entries WHERE expires < ?', (now - self.max_stale,))
+        total = con.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in con.execute('SELECT key, size FROM entries ORDER BY accessed').fetchall():
+            con.execute('DELETE FROM entries WHERE key = ?', (key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def acquire(self, key, owner, lease=LOCK_LEASE):
+        now = time.time()
+        with self._connect() as con:
+            con.execute('BEGIN IMMEDIATE')
+            con.execute('DELETE FROM locks WHERE key = ? AND lease_expires < ?', (key, now))
+            acquired = con.execute('INSERT OR IGNORE INTO locks VALUES (?, ?, ?)',
+                                   (key, owner, now + lease)).rowcount == 1
+            con.execute('COMMIT')
+        return acquired
+
+    def release(self, key, owner):
+        with self._connect() as con:
+            con.execute('DELETE FROM locks WHERE key = ? AND owner = ?', (key, owner))
+
+    def entries(self):
+        with self._connect() as con:
+            return pd.read_sql_query(
+                'SELECT key, size, created, expires, accessed FROM entries ORDER BY accessed DESC',
+                con)
+
+    def clear(self):
+        with self._connect() as con:
+            con.execute('DELETE FROM entries')
+            con.execute('DELETE FROM locks')
+
+
+class _Closing:
+    # sqlite3.Connection sebagai context manager tidak menutup koneksi
+    def __init__(self, con):
+        self.con = con
+
+    def __enter__(self):
+        return self.con
+
+    def __exit__(self, *exc):
+        if exc[0] is not None and self.con.in_transaction:
+            self.con.execute('ROLLBACK')
+        self.con.close()
+
+
+class SharedCache:
+    def __init__(self, backend=None, ttl=DEFAULT_TTL, lock_lease=LOCK_LEASE,
+                 wait_seconds=WAIT_SECONDS):
+        self.backend = backend if backend is not None else SQLiteBackend()
+        self.ttl = ttl
+        self.lock_lease = lock_lease
+        self.wait_seconds = wait_seconds
+        self.stats = {'hit': 0, 'stale': 0, 'miss': 0, 'wait': 0}
+        self._lock = threading.Lock()
+
+    def _count(self, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
+
+    def get_or_compute(self, key, compute, ttl=None):
+        """
+        DataFrame untuk `key`: dari cache kalau masih segar, selain itu
+        dihitung dengan `compute()` oleh satu worker saja sementara worker
+        lain menyajikan salinan lama (atau menunggu kalau belum ada).
+        """
+        ttl = self.ttl if ttl is None else ttl
+        deadline = time.monotonic() + self.wait_seconds
+        waited = False
+        while True:
+            entry = self.backend.get(key)
+            if entry is not None and entry[1] > time.time():
+                self._count('wait' if waited else 'hit')
+                return deserialize_frame(entry[0])
+
+            owner = uuid.uuid4().hex
+            if self.backend.acquire(key, owner, self.lock_lease):
+                try:
+                    # cek ulang: worker lain mungkin baru saja selesai menulis
+                    entry = self.backend.get(key)
+                    if entry is not None and entry[1] > time.time():
+                        self._count('hit')
+                        return deserialize_frame(entry[0])
+                    value = compute()
+                    self.backend.put(key, serialize_frame(value), time.time() + ttl)
+                finally:
+                    self.backend.release(key, owner)
+                self._count('miss')
+                return value
+
+            if entry is not None:
+                # worker lain sedang menghitung ulang
+                self._count('stale')
+                return deserialize_frame(entry[0])
+            if time.monotonic() > deadline:
+                # worker pemegang lock terlalu lama: hitung sendiri tanpa menulis
+                self._count('miss')
+                return compute()
+            waited = True
+            time.sleep(POLL_SECONDS)
+
+
+def shared_cache_from_env():
+    """SharedCache di path dari env SPKLU_SHARED_CACHE (default snapshot/), None kalau '0'."""
+    path = os.environ.get(SHARED_CACHE_ENV, DEFAULT_PATH)
+    if path.lower() in ('', '0', 'false', 'no'):
+        return None
+    return SharedCache(SQLiteBackend(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Isi cache bersama lintas proses')
+    parser.add_argument('--path', default=os.environ.get(SHARED_CACHE_ENV, DEFAULT_PATH))
+    parser.add_argument('--clear', action='store_true')
+    args = parser.parse_args()
+
+    backend = SQLiteBackend(args.path)
+    if args.clear:
+        backend.clear()
+        print(f'cache dikosongkan: {args.path}')
+        return
+    entries = backend.entries()
+    now = time.time()
+    entries['size_kb'] = entries['size'] / 1024
+    entries['age_s'] = now - entries['created']
+    entries['expires_in_s'] = entries['expires'] - now
+    print(entries[['key', 'size_kb', 'age_s', 'expires_in_s']].round(1).to_string(index=False))
+    print(f'{len(entries)} entri, {entries["size"].sum() / 1024 ** 2:.1f} MB')
+
+
+if __name__ == '__main__':
+    main()
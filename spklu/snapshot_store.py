@@ -0,0 +1,163 @@
+"""
+Snapshot kolumnar (Arrow IPC) untuk semua data referensi dashboard.
+
+Tabel disimpan tanpa kompresi supaya bisa dibuka dengan memory map: replika
+baru langsung memakai buffer file (zero-copy untuk kolom numerik) tanpa
+parsing CSV dan tanpa merge ulang. Tabel yang disimpan:
+
+- `stations`        : tabel stasiun aktif hasil sync BigQuery,
+- `zip_state`       : index ZIP -> State (zip_code int32),
+- `recommendations` : hasil MILP yang sudah di-join dengan State.
+
+Build manual:  python -m spklu.snapshot_store
+"""
+
+import argparse
+import os
+import uuid
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from spklu.frame_schema import compact_recommendations
+
+SNAPSHOT_DIR = 'snapshot'
+RECOMMENDATION_CSV = 'rekomendasi_lokasi_spklu.csv'
+ZIP_STATE_CSV = 'zip_to_state_geodata.csv'
+
+
+def table_path(name, directory=SNAPSHOT_DIR):
+    return os.path.join(directory, f'{name}.arrow')
+
+
+def write_table(df, name, directory=SNAPSHOT_DIR):
+    """Tulis DataFrame sebagai file Arrow IPC (atomic replace)."""
+    os.makedirs(directory, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    path = table_path(name, directory)
+    # file sementara unik per penulis: warm-up, sesi lain dan replika bisa
+    # menulis tabel yang sama bersamaan
+    tmp_path = f'{path}.{os.getpid()}.{uuid.uuid4().hex}.tmp'
+    try:
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def read_table(name, directory=SNAPSHOT_DIR, memory_map=True):
+    """Buka tabel snapshot, None kalau belum pernah di-build."""
+    path = table_path(name, directory)
+    if not os.path.exists(path):
+        return None
+    source = pa.memory_map(path, 'r') if memory_map else pa.OSFile(path, 'rb')
+    table = ipc.open_file(source).read_all()
+    # split_blocks menjaga kolom numerik tetap view dari buffer mmap
+    return table.to_pandas(split_blocks=True)
+
+
+def is_stale(name, *sources, directory=SNAPSHOT_DIR):
+    """True kalau tabel belum ada atau lebih lama dari salah satu file sumber."""
+    path = table_path(name, directory)
+    if not os.path.exists(path):
+        return True
+    built_at = os.path.getmtime(path)
+    return any(os.path.exists(src) and os.path.getmtime(src) > built_at
+               for src in sources)
+
+
+def zip_to_int(zip_codes):
+    """
+    ZIP sebagai int32 untuk join (kode pos non-US seperti 'V7B' menjadi NA).
+    Nol di depan hilang, tampilkan dengan `zip_to_str`.
+    """
+    zip_codes = pd.Series(zip_codes).astype(str).str.strip()
+    zip_codes = zip_codes.where(zip_codes.str.fullmatch(r'\d{1,5}'))
+    return pd.to_numeric(zip_codes).astype('Int32')
+
+
+def zip_to_str(zip_codes):
+    """ZIP int32 -> teks 5 digit untuk tampilan (1803 -> '01803'), NA tetap NA."""
+    zip_codes = pd.Series(zip_codes)
+    return zip_codes.astype('Int32').astype(str).str.zfill(5).where(zip_codes.notna())
+
+
+def build_zip_state_index(path=ZIP_STATE_CSV):
+    return zip_state_index(pd.read_csv(path, dtype={'ZIP': str}))
+
+
+def zip_state_index(df):
+    """Index ZIP -> State (zip_code int32, State categorical) dari tabel ZIP, State."""
+    df = df.assign(zip_code=zip_to_int(df['ZIP'])).dropna(subset=['zip_code'])
+    df = df.drop_duplicates('zip_code')
+    return pd.DataFrame({
+        'zip_code': df['zip_code'].astype('int32').to_numpy(),
+        'State': df['State'].astype('category').array,
+    })
+
+
+def build_recommendations(path=RECOMMENDATION_CSV, zip_state=None):
+    return recommendation_frame(pd.read_csv(path), zip_state)
+
+
+def recommendation_frame(df, zip_state=None):
+    """Rekomendasi per ZIP (kolom id, avg_latitude, avg_longitude, demand) + State."""
+    required_cols = {'id', 'avg_latitude', 'avg_longitude', 'demand'}
+    if not required_cols.issubset(df.columns):
+        missing = required_cols - set(df.columns)
+        raise KeyError(f'Kolom berikut tidak ditemukan di CSV: {missing}')
+
+    df = pd.DataFrame({
+        'zip_code': zip_to_int(df['id']),
+        'avg_latitude': pd.to_numeric(df['avg_latitude']),
+        'avg_longitude': pd.to_numeric(df['avg_longitude']),
+        'predicted_demand_covered': df['demand'],
+    })
+    if zip_state is not None:
+        df = df.merge(zip_state, on='zip_code', how='left')
+    return compact_recommendations(df)
+
+
+def build_snapshot(directory=SNAPSHOT_DIR, recommendation_csv=RECOMMENDATION_CSV,
+                   zip_state_csv=ZIP_STATE_CSV, stations=None):
+    """Build ulang tabel referensi dari CSV (dan tabel stasiun kalau ada)."""
+    written = []
+    zip_state = None
+    if os.path.exists(zip_state_csv):
+        zip_state = build_zip_state_index(zip_state_csv)
+        written.append(write_table(zip_state, 'zip_state', directory))
+    recommendations = build_recommendations(recommendation_csv, zip_state)
+    written.append(write_table(recommendations, 'recommendations', directory))
+    if stations is not None:
+        written.append(write_table(stations, 'stations', directory))
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dir', default=SNAPSHOT_DIR)
+    parser.add_argument('--recommendations', default=RECOMMENDATION_CSV)
+    parser.add_argument('--zip-state', default=ZIP_STATE_CSV)
+    parser.add_argument('--stations', help='file parquet/csv tabel stasiun (opsional)')
+    args = parser.parse_args()
+
+    stations = None
+    if args.stations:
+        if args.stations.endswith('.parquet'):
+            stations = pd.read_parquet(args.stations)
+        else:
+            stations = pd.read_csv(args.stations)
+
+    for path in build_snapshot(args.dir, args.recommendations, args.zip_state,
+                               stations):
+        print(f'snapshot ditulis: {path}')
+
+
+if __name__ == '__main__':
+    main()
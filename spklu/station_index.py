@@ -0,0 +1,82 @@
+"""
+Index spasial stasiun aktif untuk analisis gap di sekitar lokasi rekomendasi.
+
+BallTree haversine dibangun sekali per refresh data stasiun, lalu semua
+titik (rekomendasi atau titik yang dipilih di peta) di-query sekaligus:
+jumlah stasiun dalam beberapa radius, jarak ke stasiun terdekat, dan skor
+saturasi = stasiun dalam radius layanan / prediksi demand area tersebut.
+"""
+
+import numpy as np
+import pandas as pd
+
+from spklu.coverage import EARTH_RADIUS_KM, _to_radians
+from spklu.station_sync import ACTIVE_STATUS
+
+GAP_RADII_KM = (5, 10, 25)
+
+# radius layanan satu SPKLU (sama dengan skenario MILP)
+SATURATION_RADIUS_KM = 10
+
+
+def count_column(radius_km):
+    return f'stasiun_{radius_km:g}km'
+
+
+class StationIndex:
+    def __init__(self, lat, lon):
+        from sklearn.neighbors import BallTree
+
+        self.size = len(np.asarray(lat))
+        self._tree = BallTree(_to_radians(lat, lon), metric='haversine') if self.size else None
+
+    @classmethod
+    def from_frame(cls, df, lat_col='latitude', lon_col='longitude', status_col='status'):
+        """Index dari tabel stasiun; hanya status aktif kalau kolom status ada."""
+        if status_col in df.columns:
+            df = df[df[status_col] == ACTIVE_STATUS]
+        df = df.dropna(subset=[lat_col, lon_col])
+        return cls(df[lat_col].to_numpy(), df[lon_col].to_numpy())
+
+    def count_within(self, lat, lon, radius_km):
+        """Jumlah stasiun dalam radius_km untuk setiap titik (satu query batch)."""
+        points = _to_radians(np.atleast_1d(lat), np.atleast_1d(lon))
+        if self._tree is None:
+            return np.zeros(len(points), dtype=np.int64)
+        return self._tree.query_radius(
+            points, r=radius_km / EARTH_RADIUS_KM, count_only=True).astype(np.int64)
+
+    def nearest_km(self, lat, lon):
+        """Jarak (km) ke stasiun aktif terdekat; inf kalau index kosong."""
+        points = _to_radians(np.atleast_1d(lat), np.atleast_1d(lon))
+        if self._tree is None:
+            return np.full(len(points), np.inf)
+        dist, _ = self._tree.query(points, k=1)
+        return dist[:, 0] * EARTH_RADIUS_KM
+
+    def gap_analysis(self, lat, lon, demand=None, radii=GAP_RADII_KM):
+        """
+        Tabel gap untuk banyak titik sekaligus.
+
+        Kolom: `stasiun_<r>km` per radius, `jarak_terdekat_km`, dan
+        `saturasi` (kalau demand diberikan). Saturasi > 1 berarti stasiun
+        yang sudah ada di radius layanan melebihi prediksi demand area.
+        """
+        radii = sorted(set(radii) | {SATURATION_RADIUS_KM})
+        result = {count_column(r): self.count_within(lat, lon, r) for r in radii}
+        result['jarak_terdekat_km'] = self.nearest_km(lat, lon)
+        if demand is not None:
+            demand = np.asarray(demand, dtype=np.float64)
+            counts = result[count_column(SATURATION_RADIUS_KM)]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                result['saturasi'] = np.where(demand > 0, counts / demand, np.nan)
+        return pd.DataFrame(result)
+
+    def gap_frame(self, df, radii=GAP_RADII_KM, lat_col='avg_latitude',
+                  lon_col='avg_longitude', demand_col='predicted_demand_covered'):
+        """`gap_analysis` untuk DataFrame rekomendasi, index ikut df."""
+        demand = df[demand_col] if demand_col in df.columns else None
+        gaps = self.gap_analysis(df[lat_col].to_numpy(), df[lon_col].to_numpy(),
+                                 demand, radii)
+        gaps.index = df.index
+        return gaps
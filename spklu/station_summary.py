@@ -0,0 +1,184 @@
+"""
+Ringkasan tabel stasiun (KPI & distribusi) yang dihitung langsung di warehouse.
+
+Tab monitoring hanya butuh beberapa angka: jumlah stasiun aktif, jumlah
+negara bagian dan jumlah stasiun per jenis bahan bakar. Daripada menarik semua
+baris lalu menghitungnya di pandas, tiap ringkasan adalah query GROUP BY kecil
+yang dijalankan lewat `StationSource.run_query`, jadi definisi query yang sama
+jalan di BigQuery maupun di SQLite lokal. Tiap ringkasan di-cache sendiri
+dengan interval refresh masing-masing.
+
+`get` tidak pernah menunggu query: hasil terakhir (boleh lewat TTL)
+langsung dikembalikan dan query ulang jalan di background. Query yang gagal
+karena warehouse / jaringan dicatat di `errors` dan baru dicoba lagi setelah
+jeda `backoff`; error lain (bug di query) diteruskan ke pemanggil.
+
+    python -m spklu.station_summary --sqlite stations.db
+"""
+
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import pandas as pd
+
+from spklu.station_sync import ACTIVE_STATUS
+
+
+@dataclass(frozen=True)
+class Summary:
+    name: str
+    # template: {table} dan {active} diisi saat query dijalankan
+    sql: str
+    ttl: int
+
+
+SUMMARIES = {summary.name: summary for summary in [
+    Summary('kpi', """
+        SELECT COUNT(*) AS total_stations, COUNT(DISTINCT state) AS total_states
+        FROM {table}
+        WHERE status = '{active}'
+        """, ttl=300),
+    # urutan seri = nama terkecil dulu, sama seperti mode()[0] di pandas
+    Summary('fuel_distribution', """
+        SELECT fuel_type, COUNT(*) AS n_stations
+        FROM {table}
+        WHERE status = '{active}' AND fuel_type IS NOT NULL
+        GROUP BY fuel_type
+        ORDER BY n_stations DESC, fuel_type
+        """, ttl=1800),
+]}
+
+
+def summarize_frame(df, name):
+    """Ringkasan yang sama dihitung dari tabel stasiun di memori (fallback)."""
+    df = df[df['status'] == ACTIVE_STATUS]
+    if name == 'kpi':
+        return pd.DataFrame({'total_stations': [len(df)],
+                             'total_states': [df['state'].nunique()]})
+    if name == 'fuel_distribution':
+        counts = df['fuel_type'].value_counts()
+        counts = counts[counts > 0].rename_axis('fuel_type').reset_index(name='n_stations')
+        counts['fuel_type'] = counts['fuel_type'].astype(str)
+        return counts.sort_values(['n_stations', 'fuel_type'], ascending=[False, True],
+                                  ignore_index=True)
+    raise KeyError(name)
+
+
+# jeda sebelum query yang gagal dicoba lagi
+BACKOFF_SECONDS = 60
+
+
+class StationSummaries:
+    def __init__(self, source, summaries=SUMMARIES, shared=None, backoff=BACKOFF_SECONDS):
+        """
+        source  : StationSource (BigQuery / SQLite).
+        shared  : SharedCache opsional, supaya replika lain tidak query ulang.
+        backoff : detik sebelum ringkasan yang gagal di-query lagi.
+        """
+        self.source = source
+        self.summaries = summaries
+        self.shared = shared
+        self.backoff = backoff
+        self.errors = {}
+        self._cache = {}
+        self._retry_at = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._fetch_locks = {name: threading.Lock() for name in summaries}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='summary')
+
+    def query(self, name):
+        return self.summaries[name].sql.format(table=self.source.table_ref(),
+                                               active=ACTIVE_STATUS)
+
+    def _fresh(self, name):
+        cached = self._cache.get(name)
+        if cached is not None and time.monotonic() - cached[0] <= self.summaries[name].ttl:
+            return cached[1]
+        return None
+
+    def fetch(self, name):
+        """Query ringkasan `name` sekarang (sinkron), error apapun diteruskan."""
+        # satu query per ringkasan sekaligus; yang datang belakangan memakai hasilnya
+        with self._fetch_locks[name]:
+            frame = self._fresh(name)
+            if frame is not None:
+                return frame
+            sql = self.query(name)
+            if self.shared is not None:
+                from spklu.shared_cache import cache_key
+
+                frame = self.shared.get_or_compute(
+                    cache_key('summary', sql), lambda: self.source.run_query(sql),
+                    ttl=self.summaries[name].ttl)
+            else:
+                frame = self.source.run_query(sql)
+            with self._lock:
+                self._cache[name] = (time.monotonic(), frame)
+                self.errors.pop(name, None)
+            return frame
+
+    def refresh(self, name):
+        """`fetch` dengan backoff: error warehouse / jaringan dicatat, return None."""
+        try:
+            return self.fetch(name)
+        except self.source.query_errors() as e:
+            with self._lock:
+                self.errors[name] = f'{type(e).__name__}: {e}'
+                self._retry_at[name] = time.monotonic() + self.backoff
+            return None
+
+    def prefetch(self):
+        """Ambil semua ringkasan sekarang (untuk warm-up)."""
+        for name in self.summaries:
+            self.refresh(name)
+
+    def get(self, name):
+        """
+        Ringkasan terakhir `name` tanpa menunggu query, None kalau belum
+        pernah berhasil. Kalau sudah lewat TTL, query ulang dijadwalkan.
+        """
+        now = time.monotonic()
+        with self._lock:
+            future = self._pending.get(name)
+            if future is not None and future.done():
+                del self._pending[name]
+                if future.exception() is not None:
+                    # refresh hanya menangkap error warehouse: sisanya bug, tampilkan
+                    raise future.exception()
+                future = None
+            cached = self._cache.get(name)
+            expired = cached is None or now - cached[0] > self.summaries[name].ttl
+            if expired and future is None and now >= self._retry_at.get(name, 0):
+                self._pending[name] = self._executor.submit(self.refresh, name)
+        return cached[1] if cached is not None else None
+
+    def age(self, name):
+        """Detik sejak ringkasan terakhir berhasil diambil, None kalau belum pernah."""
+        cached = self._cache.get(name)
+        if cached is None:
+            return None
+        return time.monotonic() - cached[0]
+
+
+def main():
+    from spklu.station_sync import SQLiteSource
+
+    parser = argparse.ArgumentParser(description='Jalankan query ringkasan stasiun')
+    parser.add_argument('--sqlite', required=True, help='database SQLite pengganti BigQuery')
+    parser.add_argument('--table', default='clean_fuel_stations')
+    args = parser.parse_args()
+
+    summaries = StationSummaries(SQLiteSource(args.sqlite, args.table))
+    for name in summaries.summaries:
+        start = time.perf_counter()
+        frame = summaries.fetch(name)
+        print(f'[{name}] {(time.perf_counter() - start) * 1000:.1f} ms')
+        print(frame.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,316 @@
+"""
+Sinkronisasi tabel stasiun dari warehouse ke snapshot lokal.
+
+Load pertama menarik semua stasiun aktif per halaman (tanpa LIMIT), load
+berikutnya hanya mengambil baris yang berubah sejak watermark terakhir lalu
+di-merge ke tabel `stations` di snapshot store. Sumber data bisa diganti (BigQuery / SQLite)
+lewat `StationSource`, sehingga sync bisa dites tanpa akses cloud. Tabel yang
+disimpan tetap memakai tipe asli sumber (koordinat float64 adalah bagian dari
+kunci merge); skema ringkas (`compact_stations`) hanya untuk frame di memori app.
+
+Kunci stasiun: kolom id yang stabil (`id_col`) kalau sumber punya, selain
+itu (nama, latitude, longitude). Tanpa id, stasiun yang pindah koordinat
+muncul sebagai baris baru, dan stasiun yang dihapus permanen di sumber tidak
+pernah muncul di delta. Keduanya dibereskan oleh rekonsiliasi: daftar kunci
+stasiun aktif ditarik lalu baris snapshot yang kuncinya sudah tidak ada
+dibuang. Query itu membaca seluruh tabel (kolom kunci), jadi hanya dijalankan
+berkala (`reconcile_interval`), bukan di setiap delta sync.
+"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from spklu.snapshot_store import SNAPSHOT_DIR, read_table, write_table
+
+STATION_COLUMNS = ['station_name', 'latitude', 'longitude', 'city', 'state',
+                   'fuel_type', 'status']
+DEFAULT_KEY = ('station_name', 'latitude', 'longitude')
+ACTIVE_STATUS = 'E'
+PAGE_SIZE = 50_000
+
+
+class StationSource:
+    """
+    Interface sumber data stasiun.
+
+    `iter_pages(since=None)` mengembalikan iterator DataFrame:
+    - since=None  -> semua stasiun aktif (status = 'E'),
+    - since=nilai -> semua baris (status apapun) dengan watermark >= since,
+      supaya stasiun yang dinonaktifkan ikut terhapus dari snapshot.
+    """
+
+    watermark_col = None
+    id_col = None
+
+    def key(self):
+        """Kolom kunci stasiun: id stabil kalau ada, selain itu nama + koordinat."""
+        return (self.id_col,) if self.id_col else DEFAULT_KEY
+
+    def active_keys(self):
+        """Kunci semua stasiun aktif di sumber (untuk membuang stasiun yang dihapus)."""
+        return self.run_query(f"""
+        SELECT DISTINCT {', '.join(self.key())}
+        FROM {self.table_ref()}
+        WHERE {self._where(None, None)}
+        """)
+
+    def iter_pages(self, since=None, page_size=PAGE_SIZE):
+        raise NotImplementedError
+
+    def query(self, since=None):
+        """Teks query (juga dipakai sebagai kunci cache bersama)."""
+        raise NotImplementedError
+
+    def table_ref(self):
+        """Nama tabel dalam dialek SQL sumber (untuk query ringkasan)."""
+        raise NotImplementedError
+
+    def run_query(self, sql):
+        """Jalankan query agregasi kecil, hasil sebagai DataFrame."""
+        raise NotImplementedError
+
+    def query_errors(self):
+        """Tipe exception warehouse / jaringan (boleh dicoba ulang nanti)."""
+        return (OSError,)
+
+    def _columns(self):
+        cols = list(STATION_COLUMNS)
+        for col in (self.id_col, self.watermark_col):
+            if col and col not in cols:
+                cols.append(col)
+        return ', '.join(cols)
+
+    def _where(self, since, placeholder):
+        if since is None:
+            return f"status = '{ACTIVE_STATUS}'"
+        if not self.watermark_col:
+            raise ValueError('delta load butuh watermark_col')
+        return f'{self.watermark_col} >= {placeholder}'
+
+
+# tipe kolom di skema tabel BigQuery -> tipe ScalarQueryParameter
+BQ_PARAM_TYPES = {'INTEGER': 'INT64', 'INT64': 'INT64', 'FLOAT': 'FLOAT64',
+                  'FLOAT64': 'FLOAT64', 'NUMERIC': 'NUMERIC', 'BIGNUMERIC': 'BIGNUMERIC',
+                  'TIMESTAMP': 'TIMESTAMP', 'DATETIME': 'DATETIME', 'DATE': 'DATE',
+                  'STRING': 'STRING'}
+
+
+def bq_param_value(value, param_type):
+    """Watermark dari snapshot -> nilai Python sesuai tipe parameter BigQuery."""
+    if param_type == 'TIMESTAMP':
+        return pd.Timestamp(value).to_pydatetime()
+    if param_type == 'DATETIME':
+        return pd.Timestamp(value).tz_localize(None).to_pydatetime()
+    if param_type == 'DATE':
+        return pd.Timestamp(value).date()
+    if param_type == 'INT64':
+        return int(value)
+    if param_type == 'FLOAT64':
+        return float(value)
+    if param_type == 'STRING':
+        return str(value)
+    return value
+
+
+class BigQuerySource(StationSource):
+    def __init__(self, client, table, watermark_col=None, id_col=None,
+                 watermark_type=None):
+        """
+        watermark_type : tipe parameter `@since`; default dibaca dari skema
+            kolom watermark di tabel (sekali, saat delta load pertama).
+        """
+        self.client = client
+        self.table = table
+        self.watermark_col = watermark_col
+        self.id_col = id_col
+        self.watermark_type = watermark_type
+
+    def _watermark_type(self):
+        if self.watermark_type is None:
+            field = next(f for f in self.client.get_table(self.table).schema
+                         if f.name == self.watermark_col)
+            self.watermark_type = BQ_PARAM_TYPES.get(field.field_type, field.field_type)
+        return self.watermark_type
+
+    def table_ref(self):
+        return f'`{self.table}`'
+
+    def query(self, since=None):
+        return f"""
+        SELECT {self._columns()}
+        FROM {self.table_ref()}
+        WHERE {self._where(since, '@since')}
+        """
+
+    def run_query(self, sql):
+        return self.client.query(sql).to_dataframe()
+
+    def query_errors(self):
+        from google.api_core.exceptions import GoogleAPIError
+        from google.auth.exceptions import GoogleAuthError
+
+        # error HTTP (requests) turunan OSError
+        return (GoogleAPIError, GoogleAuthError, OSError)
+
+    def iter_pages(self, since=None, page_size=PAGE_SIZE):
+        from google.cloud import bigquery
+
+        query = self.query(since)
+        job_config = None
+        if since is not None:
+            param_type = self._watermark_type()
+            job_config = bigquery.QueryJobConfig(query_parameters=[
+                bigquery.ScalarQueryParameter(
+                    'since', param_type, bq_param_value(since, param_type))])
+
+        rows = self.client.query(query, job_config=job_config).result(
+            page_size=page_size)
+        yield from rows.to_dataframe_iterable()
+
+
+class SQLiteSource(StationSource):
+    """Pengganti BigQuery untuk testing / pengembangan lokal."""
+
+    def __init__(self, database, table='clean_fuel_stations', watermark_col=None,
+                 id_col=None):
+        self.database = database
+        self.table = table
+        self.watermark_col = watermark_col
+        self.id_col = id_col
+
+    def table_ref(self):
+        return self.table
+
+    def query(self, since=None):
+        return f"""
+        SELECT {self._columns()}
+        FROM {self.table_ref()}
+        WHERE {self._where(since, ':since')}
+        """
+
+    def run_query(self, sql):
+        import sqlite3
+
+        with sqlite3.connect(self.database) as con:
+            return pd.read_sql_query(sql, con)
+
+    def query_errors(self):
+        import sqlite3
+
+        # read_sql_query membungkus error eksekusi sebagai pandas DatabaseError
+        return (sqlite3.Error, pd.errors.DatabaseError, OSError)
+
+    def iter_pages(self, since=None, page_size=PAGE_SIZE):
+        import sqlite3
+
+        query = self.query(since)
+        if isinstance(since, np.generic):
+            since = since.item()
+        # angka tetap angka (kolom INTEGER/REAL), selain itu teks seperti di tabel
+        params = {} if since is None else {
+            'since': since if isinstance(since, (int, float)) else str(since)}
+        with sqlite3.connect(self.database) as con:
+            yield from pd.read_sql_query(query, con, params=params,
+                                         chunksize=page_size)
+
+
+def merge_delta(snapshot, delta, key=DEFAULT_KEY):
+    """Upsert baris delta ke snapshot lalu buang stasiun yang tidak aktif."""
+    merged = pd.concat([snapshot, delta], ignore_index=True)
+    merged = merged.drop_duplicates(subset=list(key), keep='last')
+    merged = merged[merged['status'] == ACTIVE_STATUS]
+    return merged.reset_index(drop=True)
+
+
+def drop_missing(snapshot, active_keys, key=DEFAULT_KEY):
+    """Buang baris snapshot yang kuncinya tidak ada di `active_keys` (dihapus / pindah)."""
+    key = list(key)
+    present = snapshot[key].merge(active_keys[key].drop_duplicates(), on=key,
+                                  how='left', indicator=True)['_merge'] == 'both'
+    if present.all():
+        return snapshot
+    return snapshot[present.to_numpy()].reset_index(drop=True)
+
+
+class StationSync:
+    def __init__(self, source, directory=SNAPSHOT_DIR, table='stations',
+                 key=None, page_size=PAGE_SIZE, reconcile_interval=None):
+        """
+        key                : kolom kunci merge, default `source.key()`.
+        reconcile_interval : detik antar rekonsiliasi dengan daftar kunci aktif
+                             di sumber (hapus permanen / koordinat berubah).
+                             None = tidak pernah; delta sync pertama per proses
+                             selalu rekonsiliasi (snapshot bisa sudah lama).
+        """
+        self.source = source
+        self.directory = directory
+        self.table = table
+        self.key = tuple(key) if key is not None else source.key()
+        self.reconcile_interval = reconcile_interval
+        self._reconciled_at = None
+        self.page_size = page_size
+        self._lock = threading.Lock()
+
+    @property
+    def watermark_col(self):
+        return self.source.watermark_col
+
+    def load_snapshot(self):
+        return read_table(self.table, self.directory)
+
+    def watermark(self, snapshot):
+        if snapshot is None or not self.watermark_col or snapshot.empty:
+            return None
+        if self.watermark_col not in snapshot.columns:
+            return None
+        # snapshot dari versi tanpa kolom id: full load
+        if any(col not in snapshot.columns for col in self.key):
+            return None
+        # snapshot lama berkoordinat float32 tidak cocok lagi dengan kunci delta: full load
+        if any(snapshot[col].dtype == np.float32 for col in self.key if col in snapshot.columns):
+            return None
+        return snapshot[self.watermark_col].max()
+
+    def reconcile_due(self):
+        if self.reconcile_interval is None:
+            return False
+        return (self._reconciled_at is None
+                or time.monotonic() - self._reconciled_at >= self.reconcile_interval)
+
+    def _fetch(self, since=None):
+        pages = list(self.source.iter_pages(since=since, page_size=self.page_size))
+        if not pages:
+            return pd.DataFrame(columns=STATION_COLUMNS)
+        return pd.concat(pages, ignore_index=True)
+
+    def sync(self, reconcile=None):
+        """
+        Full load kalau belum ada snapshot (atau sumber tanpa watermark),
+        selain itu delta load. Mengembalikan tabel stasiun aktif lengkap.
+        reconcile : paksa (True) / lewati (False) rekonsiliasi, default
+                    sesuai `reconcile_interval`.
+        """
+        with self._lock:
+            snapshot = self.load_snapshot()
+            since = self.watermark(snapshot)
+            if since is None:
+                df = self._fetch()
+                df = df[df['status'] == ACTIVE_STATUS].reset_index(drop=True)
+                self._reconciled_at = time.monotonic()
+            else:
+                delta = self._fetch(since=since)
+                df = merge_delta(snapshot, delta, key=self.key) if not delta.empty \
+                    else snapshot
+                if reconcile is None:
+                    reconcile = self.reconcile_due()
+                if reconcile:
+                    # hapus permanen tidak pernah muncul di delta (watermark tidak berubah)
+                    df = drop_missing(df, self.source.active_keys(), key=self.key)
+                    self._reconciled_at = time.monotonic()
+                if df is snapshot:
+                    return snapshot
+            write_table(df, self.table, self.directory)
+            return df
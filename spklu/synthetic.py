@@ -0,0 +1,93 @@
+"""
+Data sintetis (tanpa network) untuk benchmark dan uji beban.
+
+Stasiun disebar di sekitar kota-kota besar US dengan skema yang sama seperti
+tabel BigQuery (`station_name, latitude, longitude, city, state, fuel_type,
+status`). Tabel ZIP (index ZIP -> State dan rekomendasi per ZIP) dibangkitkan
+dari pusat kota yang sama, sehingga merge dan coverage berperilaku realistis.
+"""
+
+import numpy as np
+import pandas as pd
+
+# (kota, state, lat, lon, bobot) kira-kira proporsional dengan jumlah stasiun
+CITY_HUBS = [
+    ('Los Angeles', 'CA', 34.05, -118.24, 10), ('San Francisco', 'CA', 37.77, -122.42, 7),
+    ('San Diego', 'CA', 32.72, -117.16, 4), ('Sacramento', 'CA', 38.58, -121.49, 3),
+    ('Seattle', 'WA', 47.61, -122.33, 4), ('Portland', 'OR', 45.52, -122.68, 3),
+    ('Denver', 'CO', 39.74, -104.99, 3), ('Phoenix', 'AZ', 33.45, -112.07, 3),
+    ('Las Vegas', 'NV', 36.17, -115.14, 2), ('Salt Lake City', 'UT', 40.76, -111.89, 2),
+    ('Dallas', 'TX', 32.78, -96.80, 3), ('Houston', 'TX', 29.76, -95.37, 3),
+    ('Austin', 'TX', 30.27, -97.74, 2), ('Chicago', 'IL', 41.88, -87.63, 4),
+    ('Minneapolis', 'MN', 44.98, -93.27, 2), ('Detroit', 'MI', 42.33, -83.05, 2),
+    ('Columbus', 'OH', 39.96, -83.00, 2), ('Atlanta', 'GA', 33.75, -84.39, 3),
+    ('Miami', 'FL', 25.76, -80.19, 3), ('Orlando', 'FL', 28.54, -81.38, 2),
+    ('Charlotte', 'NC', 35.23, -80.84, 2), ('Washington', 'DC', 38.91, -77.04, 2),
+    ('Baltimore', 'MD', 39.29, -76.61, 2), ('Philadelphia', 'PA', 39.95, -75.17, 2),
+    ('New York', 'NY', 40.71, -74.01, 6), ('Boston', 'MA', 42.36, -71.06, 4),
+    ('Newark', 'NJ', 40.74, -74.17, 2), ('Kansas City', 'MO', 39.10, -94.58, 1),
+    ('Nashville', 'TN', 36.16, -86.78, 1), ('Honolulu', 'HI', 21.31, -157.86, 1),
+]
+
+# proporsi fuel_type mirip data AFDC (mayoritas ELEC)
+FUEL_TYPES = ['ELEC', 'E85', 'LPG', 'CNG', 'BD', 'RD', 'LNG', 'HY']
+FUEL_WEIGHTS = [0.80, 0.08, 0.05, 0.03, 0.02, 0.01, 0.005, 0.005]
+
+# sebaran koordinat di sekitar pusat kota (derajat)
+CITY_SPREAD_DEG = 0.35
+
+
+def _pick_hubs(rng, n):
+    weights = np.array([hub[4] for hub in CITY_HUBS], dtype=np.float64)
+    return rng.choice(len(CITY_HUBS), size=n, p=weights / weights.sum())
+
+
+def _hub_columns(hub_idx):
+    hubs = list(zip(*CITY_HUBS))
+    city = pd.Categorical.from_codes(hub_idx, categories=list(dict.fromkeys(hubs[0])))
+    states = list(dict.fromkeys(hubs[1]))
+    state_codes = np.array([states.index(s) for s in hubs[1]])[hub_idx]
+    state = pd.Categorical.from_codes(state_codes, categories=states)
+    lat = np.asarray(hubs[2])[hub_idx]
+    lon = np.asarray(hubs[3])[hub_idx]
+    return city, state, lat, lon
+
+
+def synthetic_stations(n, seed=0):
+    """Tabel stasiun dengan skema yang sama seperti hasil query BigQuery."""
+    rng = np.random.default_rng(seed)
+    hub_idx = _pick_hubs(rng, n)
+    city, state, lat, lon = _hub_columns(hub_idx)
+    return pd.DataFrame({
+        'station_name': [f'Station {i}' for i in range(n)],
+        'latitude': lat + rng.normal(0, CITY_SPREAD_DEG, n),
+        'longitude': lon + rng.normal(0, CITY_SPREAD_DEG, n),
+        'city': np.asarray(city),
+        'state': np.asarray(state),
+        'fuel_type': rng.choice(FUEL_TYPES, size=n, p=FUEL_WEIGHTS),
+        'status': 'E',
+    })
+
+
+def synthetic_zip_tables(n_zips, seed=0):
+    """
+    Index ZIP -> State dan tabel rekomendasi per ZIP.
+
+    Return (zip_state, recommendations) dengan kolom seperti
+    `zip_to_state_geodata.csv` dan `rekomendasi_lokasi_spklu.csv`.
+    """
+    rng = np.random.default_rng(seed)
+    hub_idx = _pick_hubs(rng, n_zips)
+    _, state, lat, lon = _hub_columns(hub_idx)
+    # ZIP 5 digit, unik sampai 100k baris (di atas itu ZIP berulang, seperti
+    # beberapa baris per ZIP di data mentah)
+    zips = rng.permutation(max(n_zips, 100_000))[:n_zips] % 100_000
+    zip_str = pd.Series(zips).astype(str).str.zfill(5)
+    zip_state = pd.DataFrame({'State': np.asarray(state), 'ZIP': zip_str})
+    recommendations = pd.DataFrame({
+        'id': zip_str,
+        'avg_latitude': lat + rng.normal(0, CITY_SPREAD_DEG, n_zips),
+        'avg_longitude': lon + rng.normal(0, CITY_SPREAD_DEG, n_zips),
+        'demand': rng.poisson(20, n_zips) + 1,
+    })
+    return zip_state, recommendations
@@ -0,0 +1,134 @@
+"""
+Warm-up di background untuk cold start replika baru.
+
+Import berat (sklearn, BigQuery, plotly, pydeck), load model dan data awal
+dijalankan di thread terpisah saat skrip pertama kali jalan, sehingga render
+pertama bisa langsung tampil dengan data snapshot / placeholder. Waktu import
+tiap modul dan waktu sampai render pertama / render lengkap dicatat.
+
+    python -m spklu.warmup        # ukur waktu import tiap modul di proses baru
+"""
+
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+WARMUP_ENV = 'SPKLU_WARMUP'
+
+# modul yang import-nya ditunda sampai dibutuhkan (urut dari yang terberat)
+HEAVY_MODULES = ['sklearn.ensemble', 'google.cloud.bigquery', 'plotly.express', 'pydeck']
+
+# waktu proses (modul ini di-import pertama kali = skrip app pertama jalan)
+PROCESS_START = time.perf_counter()
+IMPORT_TIMES = {}
+
+
+def warmup_enabled():
+    return os.environ.get(WARMUP_ENV, '1').lower() not in ('0', 'false', 'no')
+
+
+def timed_import(name):
+    """Import modul dan catat waktunya (yang sudah ter-import tidak dicatat)."""
+    if name in sys.modules:
+        return sys.modules[name]
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORT_TIMES[name] = time.perf_counter() - start
+    return module
+
+
+class Warmup:
+    def __init__(self, jobs, background=True, max_workers=3):
+        """
+        jobs : dict {nama: callable}, dijalankan sekali per proses.
+        background=False menjalankan semua job langsung (mode blocking lama).
+        """
+        self.durations = {}
+        self.errors = {}
+        self.first_paint = None
+        self.first_full_render = None
+        self._lock = threading.Lock()
+        self._futures = {}
+        if background:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                                thread_name_prefix='warmup')
+            for name, job in jobs.items():
+                self._futures[name] = self._executor.submit(self._run, name, job)
+        else:
+            for name, job in jobs.items():
+                self._run(name, job)
+
+    def _run(self, name, job):
+        start = time.perf_counter()
+        try:
+            job()
+        except Exception as e:
+            # job diulang secara sinkron oleh pemanggil, error tampil di sana
+            self.errors[name] = repr(e)
+        finally:
+            self.durations[name] = time.perf_counter() - start
+
+    def done(self, name):
+        future = self._futures.get(name)
+        return future is None or future.done()
+
+    def pending(self):
+        return [name for name, future in self._futures.items() if not future.done()]
+
+    def mark_render(self, complete):
+        """
+        Catat akhir satu rerun penuh. Return ringkasan cold start saat render
+        lengkap pertama (untuk di-log), selain itu None.
+        """
+        now = time.perf_counter()
+        with self._lock:
+            if self.first_paint is None:
+                self.first_paint = now - PROCESS_START
+            if not complete or self.first_full_render is not None:
+                return None
+            self.first_full_render = now - PROCESS_START
+        return self.summary()
+
+    def summary(self):
+        return {
+            'event': 'cold_start',
+            'first_paint_seconds': self.first_paint,
+            'first_full_render_seconds': self.first_full_render,
+            'import_seconds': dict(IMPORT_TIMES),
+            'warmup_seconds': dict(self.durations),
+            'warmup_errors': dict(self.errors),
+        }
+
+
+def measure_imports(modules=HEAVY_MODULES, python=sys.executable):
+    """Waktu import tiap modul di proses Python baru (tanpa cache sys.modules)."""
+    results = {}
+    for name in ['streamlit', 'pandas', *modules]:
+        code = ('import time; t = time.perf_counter(); '
+                f'import {name}; print(time.perf_counter() - t)')
+        out = subprocess.run([python, '-c', code], capture_output=True, text=True, check=True)
+        results[name] = float(out.stdout.strip())
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Ukur waktu import modul berat (cold start)')
+    parser.add_argument('--output', help='tulis hasil sebagai JSON')
+    args = parser.parse_args()
+
+    results = measure_imports()
+    for name, seconds in results.items():
+        print(f'{name:<24} {seconds * 1000:8.1f} ms')
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+"""
+Sweep what-if: evaluasi model di banyak kombinasi input prediksi sekaligus.
+
+Kombinasi fasilitas x jaringan EV x rentang charger / umur stasiun dibangkitkan
+sebagai grid penuh atau sampel acak (`SweepSpec`), fitur turunan diisi dengan
+aturan yang sama seperti form prediksi (`prepare_sites`), lalu diprediksi per
+chunk. Sweep besar dibagi ke process pool (model dikirim sekali per worker);
+sweep kecil jalan langsung karena fast path sudah jauh lebih cepat dari biaya
+start worker. Hasil di-cache ke disk dengan kunci (fingerprint model, spec).
+
+    python -m spklu.whatif --workers 4     # sweep grid default + waktu
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+
+from spklu.batch_scoring import (CHUNK_SIZE, EV_NETWORK_TYPES, FACILITY_TYPES, INPUT_RANGES,
+                                 model_fingerprint, prepare_sites, score_sites)
+from spklu.process_pool import spawn_executor
+from spklu.snapshot_store import SNAPSHOT_DIR, read_table, write_table
+
+SWEEP_DIR = os.path.join(SNAPSHOT_DIR, 'whatif')
+NUMERIC_INPUTS = list(INPUT_RANGES)
+CATEGORY_INPUTS = ['dominant_facility_type', 'dominant_ev_network']
+
+# jumlah titik default per sumbu numerik (grid penuh: 13 x 12 x 10 x 10 x 5 = 78 ribu titik)
+DEFAULT_STEPS = {'total_level2': 10, 'total_dc_fast': 10, 'avg_station_age_days': 5}
+MAX_POINTS = 2_000_000
+
+# di bawah jumlah titik ini sweep jalan di proses utama (start worker + kirim
+# model ~1-2 detik, fast path ~100 ribu titik/detik per core)
+PARALLEL_MIN_POINTS = 200_000
+MAX_WORKERS = 4
+
+
+@dataclass(frozen=True)
+class SweepSpec:
+    facilities: tuple = tuple(FACILITY_TYPES)
+    networks: tuple = tuple(EV_NETWORK_TYPES)
+    total_level2: tuple = ()
+    total_dc_fast: tuple = ()
+    avg_station_age_days: tuple = ()
+    mode: str = 'grid'
+    n_samples: int = 10_000
+    seed: int = 0
+
+    @classmethod
+    def from_ranges(cls, facilities=FACILITY_TYPES, networks=EV_NETWORK_TYPES, ranges=None,
+                    mode='grid', n_samples=10_000, seed=0):
+        """
+        ranges : dict {kolom numerik: (min, max, steps)}; kolom yang tidak
+        diberikan memakai INPUT_RANGES penuh dan DEFAULT_STEPS.
+        """
+        ranges = ranges or {}
+        values = {}
+        for col in NUMERIC_INPUTS:
+            low, high = INPUT_RANGES[col]
+            low, high, steps = ranges.get(col, (low, high, DEFAULT_STEPS[col]))
+            axis = np.unique(np.linspace(low, high, max(int(steps), 1)).round())
+            values[col] = tuple(int(v) for v in axis)
+        return cls(facilities=tuple(facilities), networks=tuple(networks), mode=mode,
+                   n_samples=int(n_samples), seed=int(seed), **values)
+
+    @property
+    def size(self):
+        if self.mode == 'random':
+            return self.n_samples
+        return int(np.prod([len(self.facilities), len(self.networks),
+                            *(len(getattr(self, col)) for col in NUMERIC_INPUTS)]))
+
+    def key(self):
+        """Hash stabil dari isi spec (bagian dari kunci cache)."""
+        payload = json.dumps(asdict(self), sort_keys=True, default=list)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+    def validate(self):
+        if not self.facilities or not self.networks:
+            raise ValueError('Pilih minimal satu tipe fasilitas dan satu jaringan EV')
+        if self.mode not in ('grid', 'random'):
+            raise ValueError(f'mode sweep tidak dikenal: {self.mode}')
+        if self.size > MAX_POINTS:
+            raise ValueError(f'Sweep terlalu besar ({self.size:,} titik, maksimum {MAX_POINTS:,})')
+
+    def points(self):
+        """Input mentah (kolom form prediksi), satu baris per titik sweep."""
+        self.validate()
+        if self.mode == 'random':
+            rng = np.random.default_rng(self.seed)
+            data = {
+                'dominant_facility_type': rng.choice(np.asarray(self.facilities, dtype=object),
+                                                     self.n_samples),
+                'dominant_ev_network': rng.choice(np.asarray(self.networks, dtype=object),
+                                                  self.n_samples),
+            }
+            for col in NUMERIC_INPUTS:
+                axis = getattr(self, col) or INPUT_RANGES[col]
+                data[col] = rng.integers(min(axis), max(axis), self.n_samples, endpoint=True)
+            df = pd.DataFrame(data)
+        else:
+            axes = [self.facilities, self.networks, *(getattr(self, col) for col in NUMERIC_INPUTS)]
+            df = pd.DataFrame(list(itertools.product(*axes)),
+                              columns=CATEGORY_INPUTS + NUMERIC_INPUTS)
+        return df[NUMERIC_INPUTS + CATEGORY_INPUTS]
+
+
+# state per worker process: model dikirim sekali lewat initializer
+_WORKER_MODEL = None
+
+
+def _init_worker(model):
+    global _WORKER_MODEL
+    from sklearn import set_config
+
+    set_config(transform_output='pandas')
+    _WORKER_MODEL = model
+
+
+def _predict_chunk(features):
+    return _WORKER_MODEL.predict(features)
+
+
+class SweepRunner:
+    def __init__(self, model, predictor=None, workers=None, parallel_min_points=PARALLEL_MIN_POINTS,
+                 chunk_size=CHUNK_SIZE, cache_dir=SWEEP_DIR):
+        """
+        model     : pipeline asli (untuk validasi kolom & fingerprint cache).
+        predictor : objek dengan `predict` yang dipakai (mis. FastPipeline), default model.
+        """
+        self.model = model
+        self.predictor = predictor or model
+        self.fingerprint = model_fingerprint(model)
+        self.workers = workers or min(os.cpu_count() or 1, MAX_WORKERS)
+        self.parallel_min_points = parallel_min_points
+        self.chunk_size = chunk_size
+        self.cache_dir = cache_dir
+        self._executor = None
+
+    def cache_name(self, spec):
+        return f'sweep-{self.fingerprint}-{spec.key()}'
+
+    def run(self, spec, use_cache=True):
+        """
+        Return (hasil, info). Hasil berisi kolom input + `predicted_demand`;
+        info berisi jumlah titik, waktu, cache hit, dan jumlah worker.
+        """
+        start = time.perf_counter()
+        name = self.cache_name(spec)
+        if use_cache and self.cache_dir:
+            cached = read_table(name, self.cache_dir, memory_map=False)
+            if cached is not None:
+                return cached, self._info(cached, start, cached=True, workers=0)
+
+        points = spec.points()
+        features = prepare_sites(points, self.model)
+        workers = self.workers if len(points) >= self.parallel_min_points else 1
+        if workers > 1:
+            predictions = self._predict_parallel(features)
+        else:
+            predictions = score_sites(self.predictor, features, self.chunk_size)
+
+        results = points.assign(predicted_demand=predictions)
+        for col in CATEGORY_INPUTS:
+            results[col] = results[col].astype('category')
+        if self.cache_dir:
+            write_table(results, name, self.cache_dir)
+        return results, self._info(results, start, cached=False, workers=workers)
+
+    def _predict_parallel(self, features):
+        if self._executor is None:
+            # spawn: aman dipanggil dari thread server Streamlit
+            self._executor = spawn_executor(self.workers, _init_worker, (self.predictor,))
+        chunks = [features.iloc[i:i + self.chunk_size]
+                  for i in range(0, len(features), self.chunk_size)]
+        return np.concatenate(list(self._executor.map(_predict_chunk, chunks)))
+
+    @staticmethod
+    def _info(results, start, cached, workers):
+        return {'points': len(results), 'seconds': time.perf_counter() - start,
+                'cached': cached, 'workers': workers}
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+
+def heatmap_table(results, index='dominant_facility_type', columns='dominant_ev_network',
+                  value='predicted_demand'):
+    """Rata-rata prediksi per (index x columns), untuk heatmap."""
+    return results.pivot_table(index=index, columns=columns, values=value,
+                               aggfunc='mean', observed=True)
+
+
+def sensitivity(results, column, by=None, value='predicted_demand'):
+    """Kurva rata-rata prediksi terhadap satu input (opsional dipecah per `by`)."""
+    keys = [column] + ([by] if by else [])
+    return (results.groupby(keys, observed=True)[value]
+            .agg(['mean', 'min', 'max']).reset_index())
+
+
+def main():
+    import joblib
+    from sklearn import set_config
+
+    from spklu.fast_inference import FastPipeline, UnsupportedPipelineError
+
+    parser = argparse.ArgumentParser(description='Sweep what-if input prediksi')
+    parser.add_argument('--model', default='best_model_Gradient_Boosting.pkl')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--mode', choices=['grid', 'random'], default='grid')
+    parser.add_argument('--samples', type=int, default=100_000)
+    parser.add_argument('--parallel-min-points', type=int, default=PARALLEL_MIN_POINTS)
+    parser.add_argument('--no-cache', action='store_true')
+    args = parser.parse_args()
+
+    set_config(transform_output='pandas')
+    model = joblib.load(args.model)
+    try:
+        predictor = FastPipeline.from_pipeline(model)
+    except UnsupportedPipelineError:
+        predictor = model
+    runner = SweepRunner(model, predictor, args.workers, args.parallel_min_points,
+                         cache_dir=None if args.no_cache else SWEEP_DIR)
+    spec = SweepSpec.from_ranges(mode=args.mode, n_samples=args.samples)
+    try:
+        results, info = runner.run(spec)
+    finally:
+        runner.close()
+    print(f"{info['points']:,} titik dalam {info['seconds']:.2f} detik "
+          f"(workers={info['workers']}, cache={'hit' if info['cached'] else 'miss'})")
+    print(heatmap_table(results).round(1).iloc[:5, :5])
+
+
+if __name__ == '__main__':
+    main()
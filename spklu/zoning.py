@@ -0,0 +1,160 @@
+"""
+Zonasi stasiun (K-Means) dengan cache per (fingerprint data, k).
+
+Setelah data di-refresh, semua k di K_RANGE dihitung di background thread,
+sehingga slider "Jumlah Cluster" cukup mengambil hasil dari cache. Untuk
+jumlah stasiun besar dipakai MiniBatchKMeans yang di-warm-start dari
+centroid hasil refresh sebelumnya. Dengan `shared` (SharedCache) hasil fit
+dipakai bersama semua replika, jadi tiap (data, k) cukup di-fit sekali.
+"""
+
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+K_RANGE = range(2, 21)
+RANDOM_STATE = 42
+MINIBATCH_THRESHOLD = 50_000
+MAX_FINGERPRINTS = 2
+# hasil zonasi hanya bergantung pada isi data (fingerprint), tidak perlu sering kedaluwarsa
+SHARED_TTL = 7 * 24 * 3600
+
+
+@dataclass
+class Zoning:
+    k: int
+    labels: np.ndarray
+    centroids: np.ndarray
+    inertia: float
+    method: str
+
+    def to_frame(self):
+        """Label per titik + centroid/inertia di attrs (format cache bersama)."""
+        frame = pd.DataFrame({'label': self.labels})
+        frame.attrs = {'k': self.k, 'centroids': self.centroids.tolist(),
+                       'inertia': self.inertia, 'method': self.method}
+        return frame
+
+    @classmethod
+    def from_frame(cls, frame):
+        return cls(k=int(frame.attrs['k']), labels=frame['label'].to_numpy(np.int32),
+                   centroids=np.asarray(frame.attrs['centroids']),
+                   inertia=float(frame.attrs['inertia']), method=frame.attrs['method'])
+
+
+def fingerprint(X):
+    """Hash isi koordinat, dipakai sebagai kunci cache zonasi."""
+    hashed = pd.util.hash_pandas_object(X, index=True).to_numpy()
+    return hashlib.sha1(hashed.tobytes()).hexdigest()[:16]
+
+
+class ZoningService:
+    def __init__(self, k_range=K_RANGE, random_state=RANDOM_STATE,
+                 minibatch_threshold=MINIBATCH_THRESHOLD, max_workers=1, shared=None):
+        self.k_range = k_range
+        self.shared = shared
+        self.random_state = random_state
+        self.minibatch_threshold = minibatch_threshold
+        self._cache = {}
+        self._pending = {}
+        self._warm_centroids = {}
+        self._fingerprints = []
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='zoning')
+
+    def _fit(self, coords, k):
+        if len(coords) >= self.minibatch_threshold:
+            from sklearn.cluster import MiniBatchKMeans
+
+            warm = self._warm_centroids.get(k)
+            if warm is not None:
+                model = MiniBatchKMeans(n_clusters=k, init=warm, n_init=1,
+                                        random_state=self.random_state)
+            else:
+                model = MiniBatchKMeans(n_clusters=k, n_init=3,
+                                        random_state=self.random_state)
+            method = 'minibatch'
+        else:
+            from sklearn.cluster import KMeans
+
+            model = KMeans(n_clusters=k, random_state=self.random_state,
+                           n_init=10)
+            method = 'kmeans'
+
+        labels = model.fit_predict(coords)
+        return Zoning(k=k, labels=labels.astype(np.int32),
+                      centroids=model.cluster_centers_,
+                      inertia=float(model.inertia_), method=method)
+
+    def _register(self, fp):
+        # simpan hasil untuk beberapa versi data terakhir saja
+        if fp in self._fingerprints:
+            return
+        self._fingerprints.append(fp)
+        while len(self._fingerprints) > MAX_FINGERPRINTS:
+            old = self._fingerprints.pop(0)
+            for key in [key for key in self._cache if key[0] == old]:
+                del self._cache[key]
+
+    def _compute(self, coords, fp, k):
+        if self.shared is not None:
+            from spklu.shared_cache import cache_key
+
+            key = cache_key('zoning', fp, k, self.random_state)
+            frame = self.shared.get_or_compute(key, lambda: self._fit(coords, k).to_frame(),
+                                               ttl=SHARED_TTL)
+            zoning = Zoning.from_frame(frame)
+        else:
+            zoning = self._fit(coords, k)
+        with self._lock:
+            self._register(fp)
+            self._cache[fp, k] = zoning
+            self._warm_centroids[k] = zoning.centroids
+            self._pending.pop((fp, k), None)
+        return zoning
+
+    def _submit(self, coords, fp, k):
+        # dipanggil dengan lock terpegang
+        if (fp, k) in self._cache:
+            return None
+        future = self._pending.get((fp, k))
+        if future is None:
+            future = self._executor.submit(self._compute, coords, fp, k)
+            self._pending[fp, k] = future
+        return future
+
+    def precompute(self, X, fp=None):
+        """Jadwalkan semua k di background, return fingerprint data."""
+        fp = fp or fingerprint(X)
+        with self._lock:
+            missing = [k for k in self.k_range
+                       if (fp, k) not in self._cache and (fp, k) not in self._pending]
+            if missing:
+                # salinan float64 hanya dibuat kalau masih ada k yang perlu di-fit
+                coords = np.ascontiguousarray(X, dtype=np.float64)
+                for k in missing:
+                    self._submit(coords, fp, k)
+        return fp
+
+    def get(self, X, k, fp=None):
+        """Hasil zonasi untuk k; tunggu / hitung langsung kalau belum ada."""
+        fp = fp or fingerprint(X)
+        with self._lock:
+            cached = self._cache.get((fp, k))
+            if cached is not None:
+                return cached
+            future = self._pending.get((fp, k))
+        if future is not None and future.running():
+            return future.result()
+        if future is not None:
+            future.cancel()
+        zoning = self._compute(np.ascontiguousarray(X, dtype=np.float64), fp, k)
+        return zoning
+
+    def is_ready(self, fp, k):
+        return (fp, k) in self._cache
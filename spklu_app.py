@@ -5,19 +5,44 @@ Created on Thu Sep 25 11:42:17 2025
 @author: KETSAR
 """
 
+from spklu.process_pool import guard_script_main
+# worker process pool (spawn) tidak menjalankan ulang skrip ini
+guard_script_main(globals())
+
+import time
+_imports_start = time.perf_counter()
+
+# sklearn, BigQuery, plotly dan pydeck di-import saat dipakai (lihat spklu.warmup)
 import streamlit as st
 import pandas as pd
 import numpy as np
-import plotly.express as px
-from sklearn.cluster import KMeans
-from sklearn import set_config
-import joblib
-import pydeck as pdk
 import os
-from google.cloud import bigquery
-from google.oauth2 import service_account
 import json
-set_config(transform_output='pandas')
+from spklu.profiling import RerunProfiler, diagnostics_enabled, profiled, record_miss, stage, track
+from spklu.frame_schema import (STATION_CATEGORICAL, STATION_FLOAT32, compact_recommendations,
+                                compact_stations, memory_report, object_bytes)
+from spklu.snapshot_store import (RECOMMENDATION_CSV, ZIP_STATE_CSV, build_snapshot,
+                                  is_stale, read_table, table_path, zip_to_str)
+from spklu.station_sync import BigQuerySource, StationSync
+from spklu.shared_cache import cache_key, shared_cache_from_env
+from spklu.station_summary import StationSummaries, summarize_frame
+from spklu.zoning import ZoningService, fingerprint
+from spklu.station_index import GAP_RADII_KM, SATURATION_RADIUS_KM, StationIndex, count_column
+from spklu.fast_inference import FastPipeline, sample_inputs
+from spklu.map_layers import (AGGREGATED_TOOLTIP, MAX_RAW_POINTS, RAW_POINTS_MIN_ZOOM,
+                               ZOOM_LEVELS, map_frame)
+from spklu.cluster_profile import COLOR_ALPHA, add_color_columns, cluster_profile
+from spklu.batch_scoring import (EV_NETWORK_TYPES, FACILITY_TYPES, INPUT_RANGES, REQUIRED_COLUMNS,
+                                 coordinate_columns, read_sites, score_frame)
+from spklu.explain import ShapCache, top_factors
+from spklu.whatif import (DEFAULT_STEPS, NUMERIC_INPUTS, SweepRunner, SweepSpec, heatmap_table,
+                          sensitivity)
+from spklu.optimizer import (MILP_BUDGET, MILP_RADIUS_KM, GREEDY_BOUND,
+                             candidates_from_stations, milp_gap, solve_placement)
+from spklu.scenarios import (ALL_REGIONS, DEFAULT_BUDGETS, DEFAULT_RADII, candidate_areas,
+                             load_results, run_scenarios, save_results, scenario_sites)
+from spklu.warmup import HEAVY_MODULES, IMPORT_TIMES, Warmup, timed_import, warmup_enabled
+_imports_seconds = time.perf_counter() - _imports_start
 
 
 st.set_page_config(
@@ -26,6 +51,11 @@ st.set_page_config(
     layout='wide',
 )
 
+# timing per stage for this rerun (shown in the hidden diagnostics tab)
+profiler = RerunProfiler(st.session_state, started_at=_imports_start)
+profiler.record('imports', _imports_seconds)
+IMPORT_TIMES.setdefault('spklu_app', _imports_seconds)
+
 # Setup Mapbox API Token (untuk style peta premium)
 # Token diambil dari .streamlit/secrets.toml
 if "MAPBOX_TOKEN" in st.secrets:
@@ -35,9 +65,26 @@ else:
     # Fallback ke style Open-Source (CartoDB) kalau token tidak ada
     map_style_config = 'https://basemaps.cartocdn.com/gl/dark-matter-gl-style/style.json'
 
+BQ_TABLE = 'personal-480906.raw_spklu_data.clean_fuel_stations'
+STATION_TTL = 660
+# rekonsiliasi hapus permanen membaca seluruh tabel: sekali sehari, bukan tiap refresh
+STATION_RECONCILE_SECONDS = 24 * 3600
+
+
+@st.cache_resource
+def get_shared_cache():
+    # cache lintas proses/replika (SQLite di snapshot/, env SPKLU_SHARED_CACHE=0 untuk mematikan)
+    try:
+        return shared_cache_from_env()
+    except OSError:
+        return None
+
+
+@st.cache_resource
+def get_station_sync():
+    bigquery = timed_import('google.cloud.bigquery')
+    from google.oauth2 import service_account
 
-@st.cache_data(ttl=660)
-def load_data_from_bq():
     gcp_service_account = st.secrets["gcp_service_account"]
     credentials = service_account.Credentials.from_service_account_info(
         gcp_service_account)
@@ -45,73 +92,353 @@ def load_data_from_bq():
     client = bigquery.Client(credentials=credentials,
                              project=credentials.project_id)
 
-    query = """
-    SELECT 
-        station_name, latitude, longitude, city, state, fuel_type, status
-    FROM `personal-480906.raw_spklu_data.clean_fuel_stations`
-    WHERE status = 'E'
-    LIMIT 10000
-    """
+    # kolom watermark (mis. updated_at) opsional, tanpa itu sync selalu full load
+    watermark_col = st.secrets.get("bq_watermark_column")
+    # id stasiun yang stabil (opsional), tanpa itu kunci = nama + koordinat
+    id_col = st.secrets.get("bq_station_id_column")
+    source = BigQuerySource(client, BQ_TABLE, watermark_col=watermark_col,
+                            id_col=id_col)
+    return StationSync(source, reconcile_interval=STATION_RECONCILE_SECONDS)
 
-    df = client.query(query).to_dataframe()
-    return df
 
+def station_frame(df):
+    # versi data (kunci memo frame turunan) dihitung sekali per load, bukan per rerun
+    df = compact_stations(df)
+    return df, fingerprint(df)
 
-@st.cache_data
-def load_recommendation_data(path):
-    try:
-        df = pd.read_csv(path)
 
-        required_cols = {'id', 'avg_latitude', 'avg_longitude', 'demand'}
-        if not required_cols.issubset(df.columns):
-            missing = required_cols - set(df.columns)
-            st.error(
-                f"Gagal memuat data. Kolom berikut tidak ditemukan di CSV: {missing}", icon="🚨")
-            return None
-
-        df['id'] = df['id'].astype(str)
-
-        df['avg_latitude'] = pd.to_numeric(df['avg_latitude'])
-        df['avg_longitude'] = pd.to_numeric(df['avg_longitude'])
-        df.rename(columns={
-            'id': 'zip_code',
-            'demand': 'predicted_demand_covered'
-        }, inplace=True)
-        return df
-    except FileNotFoundError:
-        st.error(
-            f"File tidak ditemukan: {path}. Pastikan nama file CSV sudah benar.", icon="🚨")
+# cache_resource: satu frame stasiun (read-only) dipakai semua sesi, bukan salinan per rerun
+@st.cache_resource(ttl=STATION_TTL)
+def load_data_from_bq():
+    record_miss()
+    # full load paginated saat pertama, selanjutnya hanya delta sejak watermark
+    sync = get_station_sync()
+    shared = get_shared_cache()
+    if shared is None:
+        return station_frame(sync.sync())
+    # satu replika yang query ke BigQuery, replika lain memakai hasilnya (atau salinan lama)
+    return station_frame(shared.get_or_compute(
+        cache_key('stations', sync.source.query()), sync.sync, ttl=STATION_TTL))
+
+
+@st.cache_resource(max_entries=1)
+def load_station_snapshot(mtime):
+    # snapshot terakhir selama sync pertama berjalan, dibaca ulang hanya kalau file berubah
+    df = read_table('stations')
+    return station_frame(df) if df is not None else (None, None)
+
+
+@st.cache_resource
+def get_station_summaries():
+    # KPI & distribusi sebagai query GROUP BY kecil, masing-masing dengan TTL sendiri
+    return StationSummaries(get_station_sync().source, shared=get_shared_cache())
+
+
+def station_summary(name):
+    # hasil query terakhir tanpa menunggu warehouse (refresh di background);
+    # selama belum ada hasil (atau query gagal), hitung dari tabel stasiun yang sudah dimuat
+    frame = get_station_summaries().get(name)
+    if frame is None and df_data_asli is not None:
+        return summarize_frame(df_data_asli, name)
+    return frame
+
+
+@st.cache_resource
+def load_recommendation_data():
+    record_miss()
+    # dibuka dari snapshot Arrow (memory-mapped), build ulang dari CSV kalau belum ada / CSV lebih baru
+    # error tidak ditangkap di sini: exception tidak di-cache dan pesannya ditampilkan pemanggil
+    # (st.error dari thread warm-up tidak pernah sampai ke halaman)
+    if is_stale('recommendations', RECOMMENDATION_CSV, ZIP_STATE_CSV):
+        build_snapshot()
+    # snapshot lama (float64) ikut diringkas
+    df = compact_recommendations(read_table('recommendations'))
+    return df, fingerprint(df)
+
+
+@st.cache_resource
+def load_zip_features(path):
+    # tabel fitur per ZIP (hasil agregasi AFDC), opsional
+    if not os.path.exists(path):
         return None
-    except KeyError as e:
-        st.error(
-            f"Gagal memuat data. Kolom {e} tidak ditemukan di CSV.", icon="🚨")
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    return pd.read_csv(path, dtype={'ZIP': str})
+
+
+@st.cache_resource
+def load_candidate_areas(path):
+    record_miss()
+    if not os.path.exists(path):
         return None
+    # kolom state (dari index ZIP) dipakai filter region di sweep skenario
+    shared = get_shared_cache()
+    if shared is None:
+        return candidate_areas(path, read_table('zip_state'))
+    key = cache_key('candidate_areas', path, os.path.getmtime(path), os.path.getsize(path))
+    return shared.get_or_compute(key, lambda: candidate_areas(path, read_table('zip_state')))
+
+
+@st.cache_data(show_spinner='Menghitung skor lokasi...')
+def run_batch_scoring(_model, sites):
+    record_miss()
+    return score_frame(_model, sites)
+
+
+@st.cache_data(show_spinner='Menjalankan optimasi lokasi...')
+def run_placement_optimization(areas, budget, radius_km):
+    record_miss()
+    chosen, solution = solve_placement(areas, budget, radius_km)
+    return chosen, solution
+
+
+@st.cache_resource
+def get_zoning_service():
+    # satu service per proses, cache zonasi dipakai bersama semua sesi (dan replika lain)
+    return ZoningService(shared=get_shared_cache())
 
 
 @st.cache_resource
 def load_model(path):
+    record_miss()
+    import joblib
+    timed_import('sklearn.ensemble')
+    from sklearn import set_config
+
+    # config sklearn per thread: juga di-set di thread warm-up sebelum parity check
+    set_config(transform_output='pandas')
+    # FileNotFoundError diteruskan ke pemanggil, sama seperti load_recommendation_data
+    return joblib.load(path)
+
+
+@st.cache_resource
+def load_fast_model(_model):
+    record_miss()
+    # jalur inferensi cepat, hanya dipakai kalau lolos parity check terhadap model.predict
     try:
-        model = joblib.load(path)
-        return model
-    except FileNotFoundError:
-        st.error(
-            f"Model tidak ditemukan: {path}. Pastikan 'best_model_Gradient_Boosting.pkl' yang baru ada.", icon='🚨')
+        return FastPipeline.from_pipeline(_model, verify_with=sample_inputs(_model))
+    except Exception:
+        return None
+
+
+@st.cache_resource
+def get_shap_cache(_model, _fast_model):
+    record_miss()
+    # atribusi SHAP semua ZIP dihitung sekali per (model, tabel fitur) di background,
+    # selanjutnya dibaca dari snapshot/shap
+    try:
+        cache = ShapCache(_model, _fast_model)
+    except Exception:
         return None
+    features = load_zip_features(CANDIDATE_PATH)
+    if features is not None:
+        cache.precompute_zips(features, fingerprint(features))
+    return cache
 
 
-recommend_data = load_recommendation_data('rekomendasi_lokasi_spklu.csv')
-df_data_asli = load_data_from_bq()
-model = load_model('best_model_Gradient_Boosting.pkl')
+@st.cache_resource
+def get_sweep_runner(_model, _predictor):
+    # satu runner (dan process pool) per proses, hasil sweep di-cache di disk
+    return SweepRunner(_model, _predictor)
 
-try:
-    # df_full = pd.read_csv('https://drive.google.com/uc?export=download&id=1x3TYeqXpDxGdKmbbhhtH-m8-kBcUgF8i', usecols=['ZIP', 'State'], dtype={'ZIP': str})
-    # df_states = df_full.drop_duplicates('ZIP').rename(columns={'ZIP': 'zip_code'})
-    df_states_map = pd.read_csv('zip_to_state_geodata.csv', dtype={'ZIP': str})
-    df_states_map.rename(columns={'ZIP': 'zip_code'}, inplace=True)
-    if recommend_data is not None:
-        recommend_data = pd.merge(
-            recommend_data, df_states_map, on='zip_code', how='left')
-except FileNotFoundError:
+
+@st.cache_data
+def filter_recommendations(data, states, top_n):
+    # turunan tab rekomendasi, dihitung ulang hanya kalau filter berubah
+    display_data = data
+    if states:
+        display_data = data[data['State'].isin(states)]
+    display_data = display_data.sort_values(
+        'predicted_demand_covered', ascending=False).head(top_n)
+    return display_data.assign(
+        zip_display=zip_to_str(display_data['zip_code']),
+        lat_display=display_data['avg_latitude'].map('{:.2f}'.format),
+        lon_display=display_data['avg_longitude'].map('{:.2f}'.format))
+
+
+@st.cache_resource(max_entries=2)
+def get_station_index(_stations, data_fp):
+    # BallTree stasiun aktif, dibangun sekali per refresh data (kunci data_fp)
+    return StationIndex.from_frame(_stations)
+
+
+@st.cache_data
+def recommendation_gaps(_index, data_fp, _recommendations, recommendations_fp, radii):
+    # gap semua rekomendasi sekaligus (satu query batch per radius)
+    return _index.gap_frame(_recommendations, radii)
+
+
+def _detail_subset(stations, state):
+    if state is None:
+        return stations
+    return stations[stations['state'] == state]
+
+
+# frame turunan data stasiun: argumen `_` tidak di-hash, kuncinya data_fp
+@st.cache_data
+def live_map_frame(_stations, data_fp, zoom, state):
+    stations = _detail_subset(_stations, state)
+    frame, aggregated = map_frame(
+        stations, zoom, ['station_name', 'city', 'state', 'fuel_type'])
+    return frame, aggregated, (float(stations['latitude'].mean()), float(stations['longitude'].mean()))
+
+
+@st.cache_resource(max_entries=2)
+def zoning_input(_stations, data_fp):
+    # koordinat valid + fingerprint-nya sekali per versi data, bukan salinan per rerun
+    coords = _stations[['latitude', 'longitude']].dropna()
+    return coords, fingerprint(coords)
+
+
+# kolom yang dipakai peta zona & profil zona (kolom categorical hanya menyalin kode)
+ZONING_COLUMNS = ['latitude', 'longitude', 'station_name', 'city', 'state', 'fuel_type']
+
+
+@st.cache_resource(max_entries=8)
+def zoning_tables(_stations, _coords, _zoning, data_fp, k):
+    # _coords & _zoning diturunkan dari data stasiun yang sama (data_fp) dan k
+    # save 'label cluster' result to dataframe to show on map
+    df_clustered = _stations.loc[_coords.index, ZONING_COLUMNS].assign(
+        cluster_label=_zoning.labels)
+    # we change the colors by cluster id to makes the maps more vibrant
+    # (numeric r, g, b columns looked up from COLOR_PALETTE, no list per row)
+    df_clustered = add_color_columns(df_clustered)
+
+    # keyword data science = groupBy Aggregation (vectorized with bincount)
+    cluster_stats = cluster_profile(df_clustered)
+    cluster_stats['Zona ID'] = 'Zona ' + cluster_stats['Zona ID'].astype(str)
+    return df_clustered, cluster_stats
+
+
+@st.cache_data
+def cluster_map_frame(_clustered, data_fp, k, zoom, state):
+    stations = _detail_subset(_clustered, state)
+    frame, aggregated = map_frame(
+        stations, zoom, ['station_name', 'city', 'r', 'g', 'b'],
+        group_col='cluster_label')
+    if aggregated:
+        frame = add_color_columns(frame)
+    return frame, aggregated, (float(stations['latitude'].mean()), float(stations['longitude'].mean()))
+
+
+CANDIDATE_PATH = 'zip_features.parquet'
+MODEL_PATH = 'best_model_Gradient_Boosting.pkl'
+WARMUP_POLL_SECONDS = 1
+
+
+def _warm_imports():
+    for name in HEAVY_MODULES:
+        timed_import(name)
+
+
+def _warm_summaries():
+    # query ringkasan pertama di warm-up, render pertama tidak menunggu warehouse
+    get_station_summaries().prefetch()
+
+
+def _warm_model():
+    model = load_model(MODEL_PATH)
+    get_shap_cache(model, load_fast_model(model))
+
+
+@st.cache_resource
+def get_warmup():
+    # sekali per proses: replika baru langsung render, model & data menyusul
+    return Warmup({
+        'stations': load_data_from_bq,
+        'model': _warm_model,
+        'recommendations': load_recommendation_data,
+        'imports': _warm_imports,
+        # setelah imports: thread warm-up terbatas, import berat jangan tertunda
+        'summaries': _warm_summaries,
+    }, background=warmup_enabled())
+
+
+warmup = get_warmup()
+# status warm-up dibaca sekali per rerun supaya konsisten di semua tab
+loading = tuple(warmup.pending())
+startup_complete = not loading
+
+with stage('load_recommendation', cached=True):
+    recommend_data = recommend_fp = None
+    if 'recommendations' not in loading:
+        # gagal load tidak di-cache: rerun berikutnya mencoba lagi
+        try:
+            recommend_data, recommend_fp = load_recommendation_data()
+        except FileNotFoundError as e:
+            st.error(
+                f"File tidak ditemukan: {e.filename}. Pastikan nama file CSV sudah benar.", icon="🚨")
+        except KeyError as e:
+            st.error(
+                f"Gagal memuat data. {e.args[0]}", icon="🚨")
+with stage('load_bq', cached=True):
+    stations_live = 'stations' not in loading
+    # stations_fp: versi data stasiun, kunci memo untuk frame turunan di tab monitoring
+    if stations_live:
+        df_data_asli, stations_fp = load_data_from_bq()
+    else:
+        # selama sync BigQuery pertama berjalan, tampilkan snapshot terakhir (kalau ada)
+        df_data_asli = stations_fp = None
+        snapshot_path = table_path('stations')
+        if os.path.exists(snapshot_path):
+            df_data_asli, stations_fp = load_station_snapshot(os.path.getmtime(snapshot_path))
+with stage('load_model', cached=True):
+    model = fast_model = shap_cache = None
+    if 'model' not in loading:
+        try:
+            model = load_model(MODEL_PATH)
+        except FileNotFoundError:
+            st.error(
+                f"Model tidak ditemukan: {MODEL_PATH}. Pastikan 'best_model_Gradient_Boosting.pkl' yang baru ada.", icon='🚨')
+        fast_model = load_fast_model(model) if model else None
+        shap_cache = get_shap_cache(model, fast_model) if model else None
+        from sklearn import set_config
+        set_config(transform_output='pandas')
+predictor = fast_model or model
+
+# hitung zonasi k=2..20 di background selagi user melihat tab lain
+if df_data_asli is not None:
+    with stage('zoning_precompute'):
+        zoning_service = get_zoning_service()
+        zoning_coords, zoning_fp = zoning_input(df_data_asli, stations_fp)
+        zoning_service.precompute(zoning_coords, zoning_fp)
+
+@st.fragment(run_every=WARMUP_POLL_SECONDS)
+def watch_warmup(pending):
+    # rerun penuh begitu ada bagian warm-up yang selesai
+    if set(warmup.pending()) != set(pending):
+        st.rerun()
+    st.caption(f"⏳ Menyiapkan: {', '.join(pending)}. Konten akan diperbarui otomatis.")
+
+
+def loading_placeholder(what):
+    st.info(f'⏳ {what} sedang dimuat, halaman akan diperbarui otomatis.')
+
+
+def zip_attributions(zip_codes):
+    # atribusi SHAP per ZIP dari cache (None selama precompute belum selesai)
+    table = shap_cache.zip_table if shap_cache else None
+    if table is None:
+        return None
+    return table.set_index('zip_code').reindex(zip_codes)
+
+
+def attribution_chart(attributions):
+    import plotly.express as px
+
+    df_shap = attributions.rename('SHAP').rename_axis('Faktor').reset_index()
+    df_shap = df_shap.reindex(df_shap['SHAP'].abs().sort_values().index)
+    df_shap['Arah'] = np.where(df_shap['SHAP'] >= 0, 'Menaikkan', 'Menurunkan')
+    fig = px.bar(df_shap, x='SHAP', y='Faktor', orientation='h', color='Arah',
+                 template='plotly_dark',
+                 color_discrete_map={'Menaikkan': '#ff4b4b', 'Menurunkan': '#4b9bff'})
+    fig.update_layout(xaxis_title='Kontribusi ke Estimasi Demand', yaxis_title='Faktor')
+    st.plotly_chart(fig, use_container_width=True)
+    st.caption(f'Nilai dasar model {shap_cache.expected_value:.2f} + total kontribusi '
+               f'{attributions.sum():+.2f} = estimasi {shap_cache.expected_value + attributions.sum():.2f}')
+
+
+if recommend_data is not None and 'State' not in recommend_data.columns:
     st.warning("File data asli tidak ditemukan, filter State tidak akan tersedia.")
 
 
@@ -119,22 +446,361 @@ with st.sidebar:
     st.image('https://cdn.motor1.com/images/mgl/g44JxN/s3/polestar-2-at-a-shell-fast-charging-station-abb-chargers.jpg',
              use_container_width=True)
     st.title('Panel Kontrol')
+    st.caption(
+        'Filter dan input ada di masing-masing tab, sehingga setiap interaksi hanya menghitung ulang bagian yang terkait.')
+    st.divider()
+    st.markdown(
+        """
+            <div style="text-align: center;">
+                <small>
+                    © 2025 - Muhammad Ketsar Ali Abi Wahid <br>
+                    PT Epam Digital Mandiri
+                </small>
+            </div>
+            """,
+        unsafe_allow_html=True
+    )
+
+
+# setiap bagian interaktif adalah st.fragment: widget di dalamnya hanya
+# me-rerun fragment itu sendiri, bukan seluruh dashboard
+@st.fragment
+@profiled('fragment_rekomendasi')
+def render_rekomendasi():
+    import pydeck as pdk
+
+    # gap analysis butuh data stasiun, bisa belum tersedia saat cold start
+    has_stations = df_data_asli is not None
+
+    st.subheader("Filter Peta Rekomendasi")
+    f1, f2, f3 = st.columns([3, 1, 1])
+
+    selected_states = ()
+    if 'State' in recommend_data.columns:
+        all_states = recommend_data['State'].dropna().unique().tolist()
+        all_states.sort()
+
+        default_states = recommend_data['State'].value_counts().head(
+            5).index.tolist()
+        selected_states = tuple(f1.multiselect(
+            "Pilih Negara Bagian (State):", all_states, default=default_states))
+
+    max_val = len(recommend_data)
+    if selected_states:
+        max_val = int(recommend_data['State'].isin(selected_states).sum())
+
+    top_n = max_val
+    if max_val > 1:
+        default_val = min(50, max_val)
+        top_n = f2.slider(
+            "Tampilkan Top N Lokasi:", 1, max_val, default_val)
+
+    display_data = filter_recommendations(recommend_data, selected_states, top_n)
+    if has_stations:
+        gap_radii = tuple(sorted(f3.multiselect(
+            'Radius Gap Analysis (km):', [1, 2, 5, 10, 25, 50], default=list(GAP_RADII_KM),
+            help=f'Jumlah stasiun aktif di sekitar lokasi rekomendasi. Saturasi = stasiun dalam {SATURATION_RADIUS_KM} km / estimasi permintaan.')))
+
+        with stage('gap_analysis', cached=True):
+            station_index = get_station_index(df_data_asli, stations_fp)
+            gaps = recommendation_gaps(station_index, stations_fp,
+                                       recommend_data, recommend_fp, gap_radii)
+        display_data = display_data.join(gaps)
+        display_data['jarak_display'] = display_data['jarak_terdekat_km'].map('{:.2f}'.format)
+        display_data['saturasi_display'] = display_data['saturasi'].map('{:.2f}'.format)
+    else:
+        f3.caption('⏳ Gap analysis menunggu data stasiun.')
+
+    with stage('zip_shap_lookup'):
+        site_shap = zip_attributions(display_data['zip_code'])
+    if site_shap is not None:
+        site_shap = site_shap.set_axis(display_data.index).dropna()
+        display_data['faktor_shap'] = top_factors(site_shap).reindex(
+            display_data.index, fill_value='-')
+
+    track('rekomendasi (tampil)', display_data)
+
+    m1, m2, m3 = st.columns(3)
+    m1.metric('Total Rekomendasi Lokasi :', display_data.shape[0])
+    m2.metric('Total Estimasi Permintaan Tercover',
+              display_data.predicted_demand_covered.sum())
+
+    mean_demand = display_data['predicted_demand_covered'].mean(
+    ) if not display_data.empty else 0
+    m3.metric("Rata-rata Permintaan per Lokasi", f"{mean_demand:.2f}")
     st.divider()
+
+    if not display_data.empty:
+        view_state = pdk.ViewState(
+            longitude=float(display_data['avg_longitude'].mean()),
+            latitude=float(display_data['avg_latitude'].mean()),
+            zoom=3.5,
+            pitch=50
+        )
+
+        coverage_layer = pdk.Layer(
+            'ScatterplotLayer',
+            data=display_data,
+            get_position='[avg_longitude, avg_latitude]',
+            get_color='[255, 30, 30, 50]',
+            get_radius=10000,
+            pickable=False,
+            auto_highlight=True
+        )
+
+        station_layer = pdk.Layer(
+            'ScatterplotLayer',
+            id='rekomendasi',
+            data=display_data,
+            get_position='[avg_longitude, avg_latitude]',
+            get_color='[255, 30, 30, 200]',
+            get_radius=2000,
+            pickable=True,
+            auto_highlight=True
+        )
+
+        tooltip = {
+            "html": "Kode Pos : <b>{zip_display}</b></br>"
+                    "Negara Bagian : <b>{State}</b></br>"
+                    "Estimasi Permintaan : <b>{predicted_demand_covered}</b></br>"
+                    "Lintang (latitude) : <b>{lat_display}</b></br>"
+                    "Bujur (longitude) : <b>{lon_display}</b>"
+        }
+        if has_stations:
+            tooltip['html'] += (
+                "</br>"
+                f"Stasiun Aktif ≤ {SATURATION_RADIUS_KM} km : <b>{{{count_column(SATURATION_RADIUS_KM)}}}</b></br>"
+                "Stasiun Terdekat : <b>{jarak_display} km</b></br>"
+                "Saturasi : <b>{saturasi_display}</b>")
+        if site_shap is not None:
+            tooltip['html'] += "</br>Faktor Utama (SHAP) : <b>{faktor_shap}</b>"
+
+        peta_rekomendasi = pdk.Deck(
+            layers=[coverage_layer, station_layer],
+            initial_view_state=view_state,
+            map_style=map_style_config,  # Pakai variabel safe config
+            tooltip=tooltip
+        )
+
+        with stage('deck_rekomendasi'):
+            event = st.pydeck_chart(peta_rekomendasi, use_container_width=True,
+                                    on_select='rerun', selection_mode='single-object',
+                                    key='peta_rekomendasi')
+
+        selected = event.selection.objects.get('rekomendasi', [])
+        if selected and has_stations:
+            site = selected[0]
+            st.markdown(f"**Gap Analysis Kode Pos {site['zip_display']}** ({site.get('State', '-')})")
+            shown_radii = sorted(set(gap_radii) | {SATURATION_RADIUS_KM})
+            g_cols = st.columns(len(shown_radii) + 2)
+            for col, radius in zip(g_cols, shown_radii):
+                col.metric(f'Stasiun ≤ {radius} km', f'{site[count_column(radius)]:,}')
+            g_cols[-2].metric('Stasiun Terdekat', f"{site['jarak_display']} km")
+            g_cols[-1].metric('Saturasi', site['saturasi_display'],
+                              help='> 1 berarti area ini sudah jenuh terhadap estimasi permintaannya.')
+        elif has_stations:
+            st.caption('Klik titik rekomendasi di peta untuk melihat gap analysis lokasi tersebut.')
+        if selected and site_shap is not None:
+            site_attributions = zip_attributions([selected[0]['zip_code']])
+            if site_attributions is not None and site_attributions.notna().all(axis=None):
+                with st.expander(f"Kontribusi Faktor (SHAP) Kode Pos {selected[0]['zip_display']}",
+                                 expanded=True):
+                    attribution_chart(site_attributions.iloc[0])
+
+        st.subheader('Detail Data Lokasi Rekomendasi')
+        st.dataframe(display_data.assign(zip_code=display_data['zip_display']).drop(
+            columns=['zip_display', 'lat_display', 'lon_display', 'jarak_display',
+                     'saturasi_display', 'faktor_shap'],
+            errors='ignore'), use_container_width=True)
+
+        if not has_stations:
+            return
+        with st.expander('📍 Cek Gap di Titik Lain'):
+            with st.form('form_cek_titik'):
+                c1, c2 = st.columns(2)
+                point_lat = c1.number_input('Latitude :', -90.0, 90.0,
+                                            float(display_data['avg_latitude'].iloc[0]), format='%.4f')
+                point_lon = c2.number_input('Longitude :', -180.0, 180.0,
+                                            float(display_data['avg_longitude'].iloc[0]), format='%.4f')
+                check_point = st.form_submit_button('Cek Titik')
+            if check_point:
+                point_gap = station_index.gap_analysis([point_lat], [point_lon], radii=gap_radii).iloc[0]
+                p_cols = st.columns(len(point_gap))
+                for col, (name, value) in zip(p_cols, point_gap.items()):
+                    col.metric(name, f'{value:.2f} km' if name == 'jarak_terdekat_km' else f'{value:,.0f}')
+        st.dataframe(df_data_asli, use_container_width=True)
+
+
+@st.fragment
+@profiled('fragment_optimasi')
+def render_optimasi():
+    import pydeck as pdk
+
+    st.header('Optimasi Interaktif (Lazy Greedy)')
+
+    p1, p2 = st.columns(2)
+    budget_input = p1.slider(
+        'Jumlah SPKLU Baru (Budget):', 1, 500, MILP_BUDGET)
+    radius_input = p2.slider(
+        'Radius Cakupan (km):', 1, 50, MILP_RADIUS_KM)
+
+    candidate_areas = load_candidate_areas(CANDIDATE_PATH)
+    if candidate_areas is None and df_data_asli is None:
+        loading_placeholder('Data kandidat area (stasiun live)')
+        return
+    # MILP dihitung per ZIP dari tabel fitur yang sama; kandidat per kota tidak sebanding
+    zip_candidates = candidate_areas is not None
+    if not zip_candidates:
+        candidate_areas = candidates_from_stations(df_data_asli)
+        st.caption(
+            f'Tabel fitur ZIP (`{CANDIDATE_PATH}`) tidak ditemukan, kandidat area diambil dari agregasi stasiun live per kota.')
+
+    with stage('optimizer', cached=True):
+        chosen_sites, solution = run_placement_optimization(
+            candidate_areas, budget_input, radius_input)
+
+    o1, o2, o3, o4 = st.columns(4)
+    o1.metric('Lokasi Terpilih', len(chosen_sites))
+    o2.metric('Demand Tercover', f'{solution.covered_demand:,.0f}',
+              f'{solution.coverage_ratio:.1%} dari total')
+    o3.metric('Jaminan Optimalitas', f'≥ {solution.optimality_ratio:.1%}',
+              help=f'Batas bawah terbukti terhadap solusi optimal (greedy minimal {GREEDY_BOUND:.1%}).')
+    o4.metric('Waktu Komputasi', f'{solution.elapsed * 1000:.0f} ms')
+
+    if not zip_candidates:
+        st.caption(
+            'Perbandingan dengan MILP tidak ditampilkan: MILP memakai kandidat per ZIP dari tabel fitur ZIP, bukan agregasi stasiun per kota.')
+    elif budget_input == MILP_BUDGET and radius_input == MILP_RADIUS_KM:
+        gap, milp_covered = milp_gap(
+            solution, recommend_data, candidate_areas, radius_input)
+        if pd.notna(gap):
+            st.info(
+                f'Perbandingan dengan MILP (CBC): demand tercover MILP **{milp_covered:,.0f}**, greedy **{solution.covered_demand:,.0f}** (gap {gap:.2f}%).')
+    else:
+        st.caption(
+            f'Perbandingan dengan MILP hanya tersedia untuk skenario {MILP_BUDGET} SPKLU dan radius {MILP_RADIUS_KM} km.')
+
+    if not chosen_sites.empty:
+        optim_layer = pdk.Layer(
+            'ScatterplotLayer',
+            data=chosen_sites,
+            get_position='[avg_longitude, avg_latitude]',
+            get_color='[255, 200, 0, 80]',
+            get_radius=radius_input * 1000,
+            pickable=True,
+            auto_highlight=True
+        )
+        st.pydeck_chart(pdk.Deck(
+            layers=[optim_layer],
+            initial_view_state=pdk.ViewState(
+                longitude=float(chosen_sites['avg_longitude'].mean()),
+                latitude=float(chosen_sites['avg_latitude'].mean()),
+                zoom=3.5,
+                pitch=0
+            ),
+            map_style=map_style_config,
+            tooltip={"html": "Area : <b>{id}</b></br>"
+                     "Urutan : <b>{urutan}</b></br>"
+                     "Tambahan Demand : <b>{marginal_demand}</b>"}
+        ), use_container_width=True)
+        st.dataframe(chosen_sites, use_container_width=True)
+
+
+SCENARIO_BUDGETS = [10, 30, 50, 80, 100, 150, 200, 300]
+SCENARIO_RADII = [2, 5, 10, 15, 25, 50]
+
+
+@st.fragment
+@profiled('fragment_skenario')
+def render_skenario():
+    import plotly.express as px
+
+    st.header('📈 Kurva Coverage vs Budget')
+    st.caption(
+        'Grid skenario budget x radius x region diselesaikan paralel. Untuk satu radius & region, semua budget diambil dari satu urutan greedy (solusi budget kecil adalah prefix solusi budget besar).')
+
+    areas = load_candidate_areas(CANDIDATE_PATH)
+    if areas is None and df_data_asli is None:
+        loading_placeholder('Data kandidat area (stasiun live)')
+        return
+    if areas is None:
+        areas = candidates_from_stations(df_data_asli)
+    areas_fp = fingerprint(areas[['id', 'avg_latitude', 'avg_longitude', 'demand']])
+
+    region_options = [ALL_REGIONS]
+    if 'state' in areas.columns:
+        region_options += sorted(areas['state'].dropna().astype(str).unique())
+    with st.form('form_skenario'):
+        s1, s2, s3 = st.columns(3)
+        budgets = s1.multiselect('Budget (Jumlah SPKLU) :', SCENARIO_BUDGETS,
+                                 default=list(DEFAULT_BUDGETS))
+        radii = s2.multiselect('Radius Cakupan (km) :', SCENARIO_RADII, default=list(DEFAULT_RADII))
+        regions = s3.multiselect('Region (State) :', region_options, default=[ALL_REGIONS],
+                                 help=f'{ALL_REGIONS} = semua area kandidat.')
+        run_button = st.form_submit_button(
+            type='primary', label='Jalankan Skenario', use_container_width=True)
+
+    if run_button:
+        try:
+            with stage('scenario_sweep'), st.spinner('Menjalankan skenario...'):
+                results, sites = run_scenarios(areas, budgets, radii, regions, data_fp=areas_fp)
+                save_results(results, sites)
+        except ValueError as e:
+            st.error(f"Skenario tidak valid: {e}", icon='🚨')
+
+    results, sites = load_results()
+    if results is not None:
+        results = results[results['data_fp'] == areas_fp]
+    if results is None or results.empty:
+        st.info("Belum ada hasil skenario untuk data kandidat ini. Tekan 'Jalankan Skenario' atau jalankan `python -m spklu.scenarios`.")
+        return
+
+    shown_regions = sorted(results['region'].unique(), key=lambda r: (r != ALL_REGIONS, r))
+    region = st.selectbox('Tampilkan Region :', shown_regions, key='skenario_region')
+    curve = results[results['region'] == region].sort_values(['radius_km', 'budget'])
+    fig = px.line(curve, x='budget', y='coverage_ratio',
+                  color=curve['radius_km'].map('{:g} km'.format), markers=True,
+                  template='plotly_dark', hover_data=['covered_demand', 'optimality_ratio'],
+                  labels={'budget': 'Jumlah SPKLU Baru', 'coverage_ratio': 'Demand Tercover',
+                          'color': 'Radius', 'covered_demand': 'Demand',
+                          'optimality_ratio': 'Jaminan Optimalitas'})
+    fig.update_yaxes(tickformat='.0%')
+    st.plotly_chart(fig, use_container_width=True)
+    if (curve['status'] == 'time_limit').any():
+        st.warning('Sebagian skenario berhenti karena batas waktu, coverage-nya adalah hasil sebelum waktu habis.')
+
+    st.dataframe(curve[['radius_km', 'budget', 'n_selected', 'covered_demand', 'coverage_ratio',
+                        'optimality_ratio', 'status', 'elapsed_s', 'run_at']],
+                 use_container_width=True, hide_index=True)
+
+    with st.expander('Lokasi Terpilih per Skenario'):
+        d1, d2 = st.columns(2)
+        detail_radius = d1.selectbox('Radius (km) :', sorted(curve['radius_km'].unique()),
+                                     format_func='{:g}'.format, key='skenario_radius')
+        detail_budget = d2.selectbox('Budget :', sorted(curve['budget'].unique()),
+                                     key='skenario_budget')
+        st.dataframe(scenario_sites(sites, areas_fp, region, detail_radius, detail_budget),
+                     use_container_width=True, hide_index=True)
+
+
+@st.fragment
+@profiled('fragment_prediksi')
+def render_prediksi():
     st.subheader('⚙️ Masukan Data Untuk Prediksi')
     st.caption(
         'Masukkan data untuk lokasi hipotetis untuk mendapatkan estimasi jumlah stasiun (permintaan).')
 
-    facility_type = ['HOTEL', 'CAR_DEALER', 'PUBLIC', 'OFFICE_BLDG', 'PARKING_LOT', 'FED_GOV',
-                     'GAS_STATION', 'MUNI_GOV', 'SHOPPING_CENTER', 'RESTAURANT', 'COLLEGE_CAMPUS', 'CONVENIENCE_STORE', 'OTHER']
-    ev_network_type = ['ChargePoint Network', 'Non-Networked', 'Blink Network', 'Tesla Destination',
-                       'Tesla', 'EV Connect', 'AMPUP', 'SHELL_RECHARGE', 'FLO', 'Electrify America', 'EVgo', 'OTHER_NETWORK']
-
-    facility_input = st.selectbox('Tipe Fasilitas :', facility_type)
-    ev_network_input = st.selectbox('Jaringan EV :', ev_network_type)
-    level2_charger_input = st.slider('Jumlah Charger Level 2 :', 0, 1056, 20)
-    dc_charger_input = st.slider('Jumlah DC Fast Charger :', 0, 151, 2)
-    station_age_days_input = st.slider('Rata-rata Umur Stasiun (hari) :', 0,
-                                       8519, 300, help='Perkiraan Rata-Rata Umur Stasiun (hari) Di Area Tersebut')
+    # input dikumpulkan di form: slider tidak memicu rerun sampai tombol ditekan
+    with st.form('form_prediksi'):
+        i1, i2 = st.columns(2)
+        facility_input = i1.selectbox('Tipe Fasilitas :', FACILITY_TYPES)
+        ev_network_input = i2.selectbox('Jaringan EV :', EV_NETWORK_TYPES)
+        level2_charger_input = i1.slider('Jumlah Charger Level 2 :', *INPUT_RANGES['total_level2'], 20)
+        dc_charger_input = i2.slider('Jumlah DC Fast Charger :', *INPUT_RANGES['total_dc_fast'], 2)
+        station_age_days_input = st.slider('Rata-rata Umur Stasiun (hari) :',
+                                           *INPUT_RANGES['avg_station_age_days'], 300, help='Perkiraan Rata-Rata Umur Stasiun (hari) Di Area Tersebut')
+        predict_button = st.form_submit_button(
+            type='primary', label='Prediksi', use_container_width=True)
 
     days = station_age_days_input
     years = days // 365
@@ -143,130 +809,380 @@ with st.sidebar:
 
     st.caption(
         f'{days} Hari = {years} Tahun {months} Bulan {remaining_days} Hari')
-    st.divider()
 
-    predict_button = st.button(
-        type='primary', label='Prediksi', use_container_width=True)
+    st.subheader('Hasil Prediksi Permintaan')
+    if predict_button:
+        if model:
+            input_data = {
+                "total_level2": level2_charger_input,
+                "total_dc_fast": dc_charger_input,
+                "dominant_facility_type": facility_input,
+                "dominant_ev_network": ev_network_input,
+                "avg_station_age_days": station_age_days_input,
+                "dominant_interaction": f'{facility_input}_{ev_network_input}',
+                "new_station_last_2_years": 2,
+                "last_station_opened_days_ago": station_age_days_input * 0.5
+            }
+            df_user_input = pd.DataFrame(input_data, index=[0])
 
+            try:
+                with stage('predict'):
+                    prediction = predictor.predict(df_user_input)
+                predict_demand = round(prediction[0], 0)
+
+                st.metric(
+                    label="Estimasi Jumlah Stasiun (Demand)",
+                    value=f"~ {predict_demand}",
+                    help='Nilai ini merepresentasikan potensi permintaan. Semakin tinggi, semakin baik.'
+                )
+                if shap_cache:
+                    # atribusi input yang sama diambil dari cache disk
+                    with stage('shap_adhoc'):
+                        attributions = shap_cache.explain_rows(df_user_input).iloc[0]
+                    st.markdown('**Kontribusi Faktor (SHAP)**')
+                    attribution_chart(attributions)
+                with st.expander('Lihat detail input mentah yang dikirim ke model'):
+                    st.dataframe(input_data)
+            except Exception as e:
+                st.error(f"Terjadi error saat prediksi: {e}", icon="🚨")
+        elif 'model' in loading:
+            loading_placeholder('Model prediksi')
+        else:
+            st.error("Model prediksi tidak dapat dimuat.")
+    else:
+        st.error(
+            "Hasil prediksi akan muncul di sini setelah menekan tombol 'Prediksi'.")
 
-st.title('⚡ Dashboard Optimasi Penempatan SPKLU')
-st.caption('Alat bantu pengambilan keputusan berbasis data untuk investasi infrastruktur kendaraan listrik.')
-tab1, tab2, tab3, tab4 = st.tabs(
-    ['📌 Rekomendasi Lokasi Optimal', '🔬 Simulasi & Insight Model', '📄 Informasi Proyek', '📊  Monitoring Real-Time'])
 
+@st.fragment
+@profiled('fragment_batch_scoring')
+def render_batch_scoring():
+    import pydeck as pdk
 
-with tab1:
-    st.header('Maps Sebaran Lokasi Hasil Optimisasi')
-    if recommend_data is not None:
+    st.subheader('🗂️ Skoring Batch Lokasi')
+    st.caption(
+        f'Skor banyak lokasi kandidat sekaligus. Kolom wajib: {", ".join(REQUIRED_COLUMNS)}. Kolom `latitude`/`longitude` opsional untuk ditampilkan di peta.')
 
-        st.sidebar.divider()
-        st.sidebar.subheader("Filter Peta Rekomendasi")
-
-        display_data = recommend_data.copy()
-
-        # filter berdasarkan State
-        if 'State' in display_data.columns:
-            all_states = display_data['State'].dropna().unique().tolist()
-            all_states.sort()
-
-            default_states = recommend_data['State'].value_counts().head(
-                5).index.tolist()
-            selected_states = st.sidebar.multiselect(
-                "Pilih Negara Bagian (State):", all_states, default=default_states)
-            if selected_states:
-                display_data = recommend_data[recommend_data['State'].isin(
-                    selected_states)]
-
-        if not display_data.empty:
-            min_val = 1
-            max_val = len(display_data)
-
-            if max_val > min_val:
-                default_val = min(50, max_val)
-                top_n = st.sidebar.slider(
-                    "Tampilkan Top N Lokasi:", min_val, max_val, default_val)
-                display_data = display_data.sort_values(
-                    'predicted_demand_covered', ascending=False).head(top_n)
-            else:
-                top_n = 1
-
-        st.sidebar.divider()
-        st.sidebar.markdown(
-            """
-                <div style="text-align: center;">
-                    <small>
-                        © 2025 - Muhammad Ketsar Ali Abi Wahid <br>
-                        PT Epam Digital Mandiri
-                    </small>
-                </div>
-                """,
-            unsafe_allow_html=True
-        )
+    batch_source = st.radio('Sumber Lokasi Kandidat :', [
+        'Upload File (CSV / Parquet)', 'Semua ZIP di Tabel Fitur'], horizontal=True)
 
-        m1, m2, m3 = st.columns(3)
-        m1.metric('Total Rekomendasi Lokasi :', display_data.shape[0])
-        m2.metric('Total Estimasi Permintaan Tercover',
-                  display_data.predicted_demand_covered.sum())
+    batch_sites = None
+    if batch_source == 'Upload File (CSV / Parquet)':
+        uploaded_sites = st.file_uploader(
+            'Upload file lokasi kandidat', type=['csv', 'parquet'])
+        if uploaded_sites is not None:
+            try:
+                batch_sites = read_sites(uploaded_sites)
+            except Exception as e:
+                st.error(f"File tidak dapat dibaca: {e}", icon='🚨')
+    else:
+        batch_sites = load_zip_features(CANDIDATE_PATH)
+        if batch_sites is None:
+            st.warning(f'Tabel fitur ZIP (`{CANDIDATE_PATH}`) belum tersedia.')
+
+    if batch_sites is not None and 'model' in loading:
+        loading_placeholder('Model prediksi')
+    if batch_sites is not None and model:
+        try:
+            with stage('batch_scoring', cached=True):
+                scored_sites = run_batch_scoring(predictor, batch_sites)
+        except ValueError as e:
+            st.error(f"Data lokasi tidak valid: {e}", icon='🚨')
+            scored_sites = None
+
+        if scored_sites is not None:
+            b1, b2, b3 = st.columns(3)
+            b1.metric('Jumlah Lokasi Diskor', f'{len(scored_sites):,}')
+            b2.metric('Rata-rata Estimasi Demand',
+                      f"{scored_sites['predicted_demand'].mean():.2f}")
+            b3.metric('Estimasi Demand Tertinggi',
+                      f"{scored_sites['predicted_demand'].max():.2f}")
+
+            coords = coordinate_columns(scored_sites)
+            if coords is not None:
+                lat_col, lon_col = coords
+                map_sites = scored_sites[[lat_col, lon_col, 'predicted_demand']].dropna()
+                map_sites.columns = ['lat', 'lon', 'predicted_demand']
+                batch_layer = pdk.Layer(
+                    'ScatterplotLayer',
+                    data=map_sites,
+                    get_position='[lon, lat]',
+                    get_color='[255, 140, 0, 160]',
+                    get_radius='predicted_demand * 200',
+                    radius_min_pixels=2,
+                    pickable=True,
+                )
+                st.pydeck_chart(pdk.Deck(
+                    layers=[batch_layer],
+                    initial_view_state=pdk.ViewState(
+                        latitude=float(map_sites['lat'].mean()),
+                        longitude=float(map_sites['lon'].mean()),
+                        zoom=3,
+                        pitch=0
+                    ),
+                    map_style=map_style_config,
+                    tooltip={"html": "Estimasi Demand : <b>{predicted_demand}</b>"}
+                ), use_container_width=True)
+
+            st.dataframe(scored_sites.sort_values(
+                'predicted_demand', ascending=False), use_container_width=True)
+            st.download_button('Download Hasil Skoring (CSV)',
+                               scored_sites.to_csv(index=False).encode('utf-8'),
+                               file_name='hasil_skoring_lokasi.csv', mime='text/csv')
+
+
+SWEEP_LABELS = {
+    'total_level2': 'Jumlah Charger Level 2',
+    'total_dc_fast': 'Jumlah DC Fast Charger',
+    'avg_station_age_days': 'Rata-rata Umur Stasiun (hari)',
+    'dominant_facility_type': 'Tipe Fasilitas',
+    'dominant_ev_network': 'Jaringan EV',
+}
+
+
+@st.fragment
+@profiled('fragment_sweep')
+def render_sweep():
+    import plotly.express as px
+
+    st.subheader('🧪 Sweep What-If')
+    st.caption(
+        'Evaluasi model di semua kombinasi fasilitas x jaringan EV x rentang charger dan umur stasiun sekaligus (grid penuh atau sampel acak), lalu lihat heatmap dan kurva sensitivitasnya.')
+
+    with st.form('form_sweep'):
+        s1, s2 = st.columns(2)
+        facilities = s1.multiselect('Tipe Fasilitas :', FACILITY_TYPES, default=FACILITY_TYPES)
+        networks = s2.multiselect('Jaringan EV :', EV_NETWORK_TYPES, default=EV_NETWORK_TYPES)
+        ranges = {}
+        for col, column in zip(NUMERIC_INPUTS, st.columns(len(NUMERIC_INPUTS))):
+            low, high = INPUT_RANGES[col]
+            span = column.slider(f'{SWEEP_LABELS[col]} :', low, high, (low, high))
+            steps = column.number_input('Jumlah titik :', 2, 50, DEFAULT_STEPS[col],
+                                        key=f'sweep_steps_{col}')
+            ranges[col] = (*span, steps)
+        m1, m2 = st.columns(2)
+        mode = m1.radio('Mode Sweep :', ['Grid Penuh', 'Sampel Acak'], horizontal=True)
+        n_samples = m2.number_input('Jumlah sampel (mode acak) :', 1_000, 500_000, 50_000,
+                                    step=1_000)
+        sweep_button = st.form_submit_button(
+            type='primary', label='Jalankan Sweep', use_container_width=True)
+
+    if sweep_button:
+        st.session_state['sweep_spec'] = SweepSpec.from_ranges(
+            facilities, networks, ranges,
+            mode='grid' if mode == 'Grid Penuh' else 'random', n_samples=n_samples)
+    spec = st.session_state.get('sweep_spec')
+    if spec is None:
+        st.info("Hasil sweep akan muncul di sini setelah menekan tombol 'Jalankan Sweep'.")
+        return
+    if 'model' in loading:
+        loading_placeholder('Model prediksi')
+        return
+    if not model:
+        st.error("Model prediksi tidak dapat dimuat.")
+        return
 
-        mean_demand = display_data['predicted_demand_covered'].mean(
-        ) if not display_data.empty else 0
-        m3.metric("Rata-rata Permintaan per Lokasi", f"{mean_demand:.2f}")
-        st.divider()
+    try:
+        with stage('whatif_sweep') as entry:
+            sweep_results, sweep_info = get_sweep_runner(model, predictor).run(spec)
+            entry['cache'] = 'hit' if sweep_info['cached'] else 'miss'
+    except ValueError as e:
+        st.error(f"Sweep tidak valid: {e}", icon='🚨')
+        return
+
+    w1, w2, w3 = st.columns(3)
+    w1.metric('Jumlah Titik', f"{sweep_info['points']:,}")
+    w2.metric('Waktu', f"{sweep_info['seconds']:.2f} detik")
+    w3.metric('Sumber', 'Cache' if sweep_info['cached'] else f"Dihitung ({sweep_info['workers']} proses)")
+
+    h1, h2 = st.columns(2)
+    for column, (index, columns) in zip((h1, h2), [
+            ('dominant_facility_type', 'dominant_ev_network'),
+            ('total_dc_fast', 'total_level2')]):
+        fig = px.imshow(heatmap_table(sweep_results, index, columns), aspect='auto',
+                        color_continuous_scale='Viridis', template='plotly_dark',
+                        labels={'x': SWEEP_LABELS[columns], 'y': SWEEP_LABELS[index],
+                                'color': 'Rata-rata Demand'})
+        column.plotly_chart(fig, use_container_width=True)
+
+    c1, c2 = st.columns(2)
+    curve_input = c1.selectbox('Kurva sensitivitas terhadap :', NUMERIC_INPUTS,
+                               format_func=SWEEP_LABELS.get)
+    curve_by = c2.selectbox('Dipecah per :', [None, 'dominant_facility_type', 'dominant_ev_network'],
+                            format_func=lambda col: 'Tidak ada' if col is None else SWEEP_LABELS[col])
+    curve = sensitivity(sweep_results, curve_input, curve_by)
+    fig = px.line(curve, x=curve_input, y='mean', color=curve_by, markers=True,
+                  template='plotly_dark',
+                  labels={curve_input: SWEEP_LABELS[curve_input], 'mean': 'Rata-rata Demand'})
+    st.plotly_chart(fig, use_container_width=True)
+
+    st.download_button('Download Hasil Sweep (CSV)',
+                       sweep_results.to_csv(index=False).encode('utf-8'),
+                       file_name='hasil_sweep_whatif.csv', mime='text/csv')
+
+
+def detail_controls(key):
+    """Slider level detail (+ pilihan state di mode detail), return (zoom, state)."""
+    # level of detail: far zoom = aggregated grid, near zoom = raw points
+    detail_label = st.select_slider(
+        'Level Detail Peta', options=list(ZOOM_LEVELS), value='Nasional', key=key)
+    map_zoom = ZOOM_LEVELS[detail_label]
+
+    detail_state = None
+    if map_zoom >= RAW_POINTS_MIN_ZOOM and len(df_data_asli) > MAX_RAW_POINTS:
+        # raw points only for one state so the payload stays small
+        state_counts = df_data_asli['state'].value_counts()
+        detail_state = st.selectbox(
+            'Negara Bagian (mode detail) :', state_counts.index.tolist(), key=f'{key}_state')
+    return map_zoom, detail_state
+
+
+@st.fragment
+@profiled('fragment_peta_live')
+def render_live_map():
+    import pydeck as pdk
 
-        if not display_data.empty:
-            display_data['lat_display'] = display_data['avg_latitude'].map(
-                '{:.2f}'.format)
-            display_data['lon_display'] = display_data['avg_longitude'].map(
-                '{:.2f}'.format)
+    # spread maps (with scatterplot map)
+    st.subheader('🗺️ Peta Sebaran Stasiun (Live)')
+    map_zoom, detail_state = detail_controls('live_detail')
 
-            view_state = pdk.ViewState(
-                longitude=display_data['avg_longitude'].mean(),
-                latitude=display_data['avg_latitude'].mean(),
-                zoom=3.5,
-                pitch=50
-            )
-
-            coverage_layer = pdk.Layer(
-                'ScatterplotLayer',
-                data=display_data,
-                get_position='[avg_longitude, avg_latitude]',
-                get_color='[255, 30, 30, 50]',
-                get_radius=10000,
-                pickable=False,
-                auto_highlight=True
-            )
-
-            station_layer = pdk.Layer(
-                'ScatterplotLayer',
-                data=display_data,
-                get_position='[avg_longitude, avg_latitude]',
-                get_color='[255, 30, 30, 200]',
-                get_radius=2000,
-                pickable=True,
-                auto_highlight=True
-            )
-
-            tooltip = {
-                "html": "Kode Pos : <b>{zip_code}</b></br>"
-                        "Negara Bagian : <b>{State}</b></br>"
-                        "Estimasi Permintaan : <b>{predicted_demand_covered}</b></br>"
-                        "Lintang (latitude) : <b>{lat_display}</b></br>"
-                        "Bujur (longitude) : <b>{lon_display}</b>"
-            }
+    live_frame, live_aggregated, center = live_map_frame(
+        df_data_asli, stations_fp, map_zoom, detail_state)
+    track('peta live', live_frame)
 
-            peta_rekomendasi = pdk.Deck(
-                layers=[coverage_layer, station_layer],
-                initial_view_state=view_state,
-                map_style=map_style_config,  # Pakai variabel safe config
-                tooltip=tooltip
-            )
+    # using pydeck for making maps interactive & pretty
+    map_layer = pdk.Layer(
+        "ScatterplotLayer",
+        data=live_frame,
+        get_position='[lon, lat]',
+        get_color='[0,128,255,160]',
+        get_radius='radius' if live_aggregated else 5000,
+        pickable=True,
+        auto_highlight=True
+    )
+
+    view_state = pdk.ViewState(
+        latitude=center[0],
+        longitude=center[1],
+        zoom=map_zoom,
+        pitch=0
+    )
+
+    tooltip_live = {
+        "html": "<b>{station_name}</b><br/>"
+                "Kota: {city}, {state}<br/>"
+                "Tipe: {fuel_type}"
+    }
 
-            st.pydeck_chart(peta_rekomendasi, use_container_width=True)
+    with stage('deck_live'):
+        st.pydeck_chart(pdk.Deck(
+            layers=[map_layer],
+            initial_view_state=view_state,
+            tooltip=AGGREGATED_TOOLTIP if live_aggregated else tooltip_live,
+            map_style=map_style_config
+        ))
 
-            st.subheader('Detail Data Lokasi Rekomendasi')
-            st.dataframe(display_data.drop(
-                columns=['lat_display', 'lon_display']), use_container_width=True)
-            st.dataframe(df_data_asli, use_container_width=True)
+
+@st.fragment
+@profiled('fragment_zonasi')
+def render_zoning():
+    import pydeck as pdk
+
+    st.subheader('🤖 Analisis Zona Otomatis (AI Clustering)')
+    st.caption(
+        'Biarkan Machine Learning (K-Means) mengelompokan stasiun menjadi Zona Strategis')
+
+    z1, z2 = st.columns(2)
+    with z1:
+        num_cluster = st.slider(
+            'Jumlah Cluster', min_value=2, max_value=20, value=5)
+    with z2:
+        map_zoom, detail_state = detail_controls('zone_detail')
+
+    # k-means result from zoning cache (precomputed in background)
+    with stage('kmeans'):
+        zoning = zoning_service.get(zoning_coords, num_cluster, zoning_fp)
+
+    # label, warna dan profil tiap zona, di-memo per (data, k)
+    with stage('cluster_profile'):
+        df_clustered, cluster_stats = zoning_tables(
+            df_data_asli, zoning_coords, zoning, stations_fp, num_cluster)
+
+    # same level of detail as the live map, aggregated per (cell, cluster)
+    cluster_frame, cluster_aggregated, center = cluster_map_frame(
+        df_clustered, stations_fp, num_cluster, map_zoom, detail_state)
+    track('peta zona', cluster_frame)
+
+    # new maps layers (support dynamic colors)
+    cluster_layer = pdk.Layer(
+        "ScatterplotLayer",
+        data=cluster_frame,
+        get_position='[lon, lat]',
+        get_color=f'[r, g, b, {COLOR_ALPHA}]',
+        get_radius='radius' if cluster_aggregated else 5000,
+        pickable=True,
+        auto_highlight=True,
+    )
+
+    tooltip_cluster = {
+        "html": "<b>{station_name}</b><br/>"
+        "Zona (Cluster): <b>{cluster_label}</b></br>"
+        "Kota: <b>{city}</b>"
+    }
+    if cluster_aggregated:
+        tooltip_cluster = {
+            "html": "Zona (Cluster): <b>{cluster_label}</b></br>"
+            "Jumlah Stasiun di Area Ini : <b>{count}</b>"
+        }
+    with stage('deck_cluster'):
+        st.pydeck_chart(pdk.Deck(
+            layers=[cluster_layer],
+            initial_view_state=pdk.ViewState(
+                latitude=center[0], longitude=center[1], zoom=map_zoom, pitch=0),
+            map_style=map_style_config,
+            tooltip=tooltip_cluster
+        ))
+    st.info(
+        f'💡 Insight: Algoritma sudah membagi area menjadi : {num_cluster} zona. Coba geser slide untuk melihat bagaimana AI membagi area tersebut.')
+
+    st.divider()
+
+    st.subheader('📋 Profil Tiap Zona (Cluster Insight)')
+
+    # show table
+    st.dataframe(cluster_stats.style.background_gradient(
+        subset=['Total Stasiun'], cmap='Reds'), use_container_width=True)
+
+    # automatic story telling
+    top_zone = cluster_stats.sort_values(
+        by='Total Stasiun', ascending=False).iloc[0]
+    st.success(f'**Zona Paling Padat :** {top_zone['Zona ID']} dengan **{top_zone['Total Stasiun']:,}** Stasiun. Di dominasi oleh bahan bakar **{top_zone['Dominan Fuel']}**. Zona ini mencangkup **{top_zone['Jml Kota']:,}** Kota dan **{top_zone['Jml N.Bagian']:,}** Negara Bagian')
+
+
+st.title('⚡ Dashboard Optimasi Penempatan SPKLU')
+st.caption('Alat bantu pengambilan keputusan berbasis data untuk investasi infrastruktur kendaraan listrik.')
+if not startup_complete:
+    watch_warmup(loading)
+# tab diagnostik hanya muncul dengan ?diag=1 atau env SPKLU_DIAGNOSTICS=1
+show_diagnostics = diagnostics_enabled(st.query_params)
+tab_labels = ['📌 Rekomendasi Lokasi Optimal', '🔬 Simulasi & Insight Model',
+              '📄 Informasi Proyek', '📊  Monitoring Real-Time']
+if show_diagnostics:
+    tab_labels.append('🩺 Diagnostik')
+tabs = st.tabs(tab_labels)
+tab1, tab2, tab3, tab4 = tabs[:4]
+
+
+with tab1:
+    st.header('Maps Sebaran Lokasi Hasil Optimisasi')
+    if recommend_data is not None:
+        render_rekomendasi()
+        st.divider()
+        render_optimasi()
+        st.divider()
+        render_skenario()
+    elif 'recommendations' in loading:
+        loading_placeholder('Data rekomendasi')
     else:
         st.error('Data rekomendasi tidak dapat dimuat.')
 
@@ -276,43 +1192,15 @@ with tab2:
     col1, col2 = st.columns(2, gap='large')
 
     with col1:
-        st.subheader('Hasil Prediksi Permintaan')
-        if predict_button:
-            if model:
-                input_data = {
-                    "total_level2": level2_charger_input,
-                    "total_dc_fast": dc_charger_input,
-                    "dominant_facility_type": facility_input,
-                    "dominant_ev_network": ev_network_input,
-                    "avg_station_age_days": station_age_days_input,
-                    "dominant_interaction": f'{facility_input}_{ev_network_input}',
-                    "new_station_last_2_years": 2,
-                    "last_station_opened_days_ago": station_age_days_input * 0.5
-                }
-                df_user_input = pd.DataFrame(input_data, index=[0])
-
-                try:
-                    prediction = model.predict(df_user_input)
-                    predict_demand = round(prediction[0], 0)
-
-                    st.metric(
-                        label="Estimasi Jumlah Stasiun (Demand)",
-                        value=f"~ {predict_demand}",
-                        help='Nilai ini merepresentasikan potensi permintaan. Semakin tinggi, semakin baik.'
-                    )
-                    with st.expander('Lihat detail input mentah yang dikirim ke model'):
-                        st.dataframe(input_data)
-                except Exception as e:
-                    st.error(f"Terjadi error saat prediksi: {e}", icon="🚨")
-            else:
-                st.error("Model prediksi tidak dapat dimuat.")
-        else:
-            st.error(
-                "Hasil prediksi akan muncul di sini setelah menekan tombol 'Prediksi' di sidebar.")
+        render_prediksi()
 
     with col2:
         st.subheader("Faktor Paling Berpengaruh")
-        if model:
+        if 'model' in loading:
+            loading_placeholder('Model prediksi')
+        elif model:
+            import plotly.express as px
+
             try:
                 regressor = model.named_steps.get(
                     'regressor') or model.named_steps.get('gb')
@@ -326,10 +1214,28 @@ with tab2:
                              template='plotly_dark', color_discrete_sequence=['#ff4b4b'])
                 fig.update_layout(yaxis={'categoryorder': 'total ascending'},
                                   xaxis_title="Tingkat Pengaruh", yaxis_title="Faktor")
-                st.plotly_chart(fig, use_container_width=True)
+                with stage('feature_importance_chart'):
+                    st.plotly_chart(fig, use_container_width=True)
             except Exception as e:
                 st.error(f"Terjadi error saat prediksi : {e}", icon='🚨')
 
+            if shap_cache and shap_cache.zip_table is not None:
+                st.caption('Rata-rata |SHAP| per faktor di seluruh ZIP:')
+                df_shap = shap_cache.zip_table.drop(columns='zip_code').abs().mean()
+                df_shap = df_shap.sort_values().rename_axis('Feature').reset_index(name='SHAP')
+                fig = px.bar(df_shap, x='SHAP', y='Feature', orientation='h',
+                             template='plotly_dark', color_discrete_sequence=['#ff4b4b'])
+                fig.update_layout(xaxis_title='Rata-rata |SHAP|', yaxis_title='Faktor')
+                st.plotly_chart(fig, use_container_width=True)
+            elif shap_cache and shap_cache.computing:
+                st.caption('⏳ Atribusi SHAP per ZIP sedang dihitung di background.')
+
+    st.divider()
+    render_batch_scoring()
+
+    st.divider()
+    render_sweep()
+
 
 with tab3:
     st.header('📄 Tentang Proyek Optimisasi Penempatan SPKLU')
@@ -374,164 +1280,183 @@ with tab3:
 with tab4:
     st.header('📊  Real-time SPKLU Monitoring')
     st.caption(
-        f'Data langsung dari Google BigQuery: `personal-480906.raw_spklu_data.clean_fuel_stations`')
-
-    # kpi scorecards (important number)
-    col1, col2, col3 = st.columns(3)
-    total_stations = len(df_data_asli)
-    top_fuel = df_data_asli['fuel_type'].mode()[0]
-    total_state = df_data_asli['state'].nunique()
-
-    col1.metric('Total Stasiun Aktif', f'{total_stations:,}')
-    col2.metric('Bahan Bakar Terpopuler', top_fuel)
-    col3.metric('Cakupan Negara Bagian', f'{total_state} Bagian')
-
-    st.divider()
-    # spread maps (with scatterplot map)
-    st.subheader('🗺️ Peta Sebaran Stasiun (Live)')
-    # using pydeck for making maps interactive & pretty
-    map_layer = pdk.Layer(
-        "ScatterplotLayer",
-        data=df_data_asli,
-        get_position='[longitude, latitude]',
-        get_color='[0,128,255,160]',
-        get_radius=5000,
-        pickable=True,
-        auto_highlight=True
-    )
-
-    view_state = pdk.ViewState(
-        latitude=df_data_asli['latitude'].mean(),
-        longitude=df_data_asli['longitude'].mean(),
-        zoom=3,
-        pitch=0
-    )
-
-    tooltip_live = {
-        "html": "<b>{station_name}</b><br/>"
-                "Kota: {city}, {state}<br/>"
-                "Tipe: {fuel_type}"
-    }
-
-    st.pydeck_chart(pdk.Deck(
-        layers=[map_layer],
-        initial_view_state=view_state,
-        tooltip=tooltip_live,
-        map_style=map_style_config
-    ))
-
-    st.divider()
-
-    st.subheader('🤖 Analisis Zona Otomatis (AI Clustering)')
-    st.caption(
-        'Biarkan Machine Learning (K-Means) mengelompokan stasiun menjadi Zona Strategis')
-
-    num_cluster = st.slider(
-        'Jumlah Cluster', min_value=2, max_value=20, value=5)
-
-    # get data for ml (just lat/lon)
-    X = df_data_asli[['latitude', 'longitude']].dropna()
-
-    # running k-means
-    kmeans = KMeans(n_clusters=num_cluster, random_state=42, n_init=10)
-    clusters = kmeans.fit_predict(X)
-
-    # save 'label cluster' result to dataframe to show on map
-    # we must make copy of df_data_asli to avoid warning
-    df_clustered = df_data_asli.copy()
-    df_clustered = df_clustered.loc[X.index]
-    df_clustered['cluster_label'] = clusters
-
-    # we change the colors by cluster id to makes the maps more vibrant
-    # color dictionary (RGB) to 20 cluster first
-    COLOR_PALETTE = [
-        [255, 0, 0], [0, 255, 0], [0, 0, 255], [255, 255, 0], [0, 255, 255],
-        [255, 0, 255], [128, 0, 0], [0, 128, 0], [0, 0, 128], [128, 128, 0],
-        [128, 0, 128], [0, 128, 128], [255, 128, 0], [
-            255, 0, 128], [128, 255, 0],
-        [0, 255, 128], [0, 128, 255], [128, 0, 255], [
-            192, 192, 192], [64, 64, 64]
-    ]
-
-    def get_color(cluster_id):
-        # get color from palette, if color is out of range return back to first color
-        base_color = COLOR_PALETTE[cluster_id % len(COLOR_PALETTE)]
-        return base_color + [160]  # alpha channel for transparency
-
-    # apply colors to each rows
-    df_clustered['color'] = df_clustered['cluster_label'].apply(get_color)
-
-    # new maps layers (support dynamic colors)
-    cluster_layer = pdk.Layer(
-        "ScatterplotLayer",
-        data=df_clustered,
-        get_position='[longitude, latitude]',
-        get_color='color',
-        get_radius=5000,
-        pickable=True,
-        auto_highlight=True,
-    )
-
-    tooltip_cluster = {
-        "html": "<b>{station_name}</b><br/>"
-        "Zona (Cluster): <b>{cluster_label}</b></br>"
-        "Kota: <b>{city}</b>"
-    }
-    st.pydeck_chart(pdk.Deck(
-        layers=[cluster_layer],
-        initial_view_state=view_state,
-        map_style=map_style_config,
-        tooltip=tooltip_cluster
-    ))
-    st.info(
-        f'💡 Insight: Algoritma sudah membagi area menjadi : {num_cluster} zona. Coba geser slide untuk melihat bagaimana AI membagi area tersebut.')
-
-    st.divider()
-
-    st.subheader('📋 Profil Tiap Zona (Cluster Insight)')
-
-    # keyword data science = groupBy Aggregation
-    cluster_stats = df_clustered.groupby('cluster_label').agg({
-        'station_name': 'count',
-        'fuel_type': lambda x: x.mode()[0] if not x.mode().empty else 'N/A',
-        'city': 'nunique',
-        'state': 'nunique'
-    }).reset_index()
-
-    cluster_stats.columns = ['Zona ID', 'Total Stasiun',
-                             'Dominan Fuel', 'Jml Kota', 'Jml N.Bagian']
-
-    cluster_stats['Zona ID'] = cluster_stats['Zona ID'].apply(
-        lambda x: f'Zona {x}')
+        f'Data langsung dari Google BigQuery: `{BQ_TABLE}`')
+
+    # kpi scorecards (important number), diagregasi di BigQuery tanpa menunggu tarikan semua stasiun
+    with stage('station_summary'):
+        kpi = station_summary('kpi')
+        fuel_counts = station_summary('fuel_distribution')
+    if kpi is not None and fuel_counts is not None:
+        col1, col2, col3 = st.columns(3)
+        total_stations = int(kpi['total_stations'].iloc[0])
+        top_fuel = fuel_counts['fuel_type'].iloc[0] if not fuel_counts.empty else '-'
+        total_state = int(kpi['total_states'].iloc[0])
+
+        col1.metric('Total Stasiun Aktif', f'{total_stations:,}')
+        col2.metric('Bahan Bakar Terpopuler', top_fuel)
+        col3.metric('Cakupan Negara Bagian', f'{total_state} Bagian')
+
+    summaries = get_station_summaries()
+    summary_errors = [summaries.errors[name] for name in ('kpi', 'fuel_distribution')
+                      if name in summaries.errors]
+    summary_age = summaries.age('kpi')
+    if summary_errors:
+        st.caption(f'⚠️ Query ringkasan ke BigQuery gagal ({summary_errors[0]}), dicoba lagi '
+                   f'dalam {summaries.backoff} detik. Angka dihitung dari data stasiun yang sudah dimuat.')
+    elif summary_age is not None:
+        st.caption(f'Ringkasan diperbarui {summary_age:.0f} detik lalu.')
+
+    if df_data_asli is None:
+        loading_placeholder('Data stasiun dari BigQuery')
+    else:
+        if not stations_live:
+            st.caption('⏳ Menampilkan snapshot stasiun terakhir, sinkronisasi BigQuery sedang berjalan.')
 
-    # show table
-    st.dataframe(cluster_stats.style.background_gradient(
-        subset=['Total Stasiun'], cmap='Reds'), use_container_width=True)
+        st.divider()
+        render_live_map()
 
-    # automatic story telling
-    top_zone = cluster_stats.sort_values(
-        by='Total Stasiun', ascending=False).iloc[0]
-    st.success(f'**Zona Paling Padat :** {top_zone['Zona ID']} dengan **{top_zone['Total Stasiun']:,}** Stasiun. Di dominasi oleh bahan bakar **{top_zone['Dominan Fuel']}**. Zona ini mencangkup **{top_zone['Jml Kota']:,}** Kota dan **{top_zone['Jml N.Bagian']:,}** Negara Bagian')
+        st.divider()
+        render_zoning()
 
     st.divider()
 
     # graph for visualizing fuel type distribution
-    st.subheader('📊 Distribusi Jenis Bahan Bakar')
-
-    # count of each fuel type
-    fuel_counts = df_data_asli['fuel_type'].value_counts().reset_index()
-    fuel_counts.columns = ['Jenis Bahan Bakar', 'Jumlah Stasiun']
-
-    # make donut chart
-    fig_fuel = px.pie(
-        fuel_counts,
-        values='Jumlah Stasiun',
-        names='Jenis Bahan Bakar',
-        hole=0.4,
-        color_discrete_sequence=px.colors.sequential.RdBu
-    )
-    st.plotly_chart(fig_fuel, use_container_width=True)
+    if fuel_counts is not None:
+        st.subheader('📊 Distribusi Jenis Bahan Bakar')
+
+        # count of each fuel type (hasil query GROUP BY)
+        fuel_counts = fuel_counts.rename(
+            columns={'fuel_type': 'Jenis Bahan Bakar', 'n_stations': 'Jumlah Stasiun'})
+
+        # make donut chart
+        import plotly.express as px
+
+        fig_fuel = px.pie(
+            fuel_counts,
+            values='Jumlah Stasiun',
+            names='Jenis Bahan Bakar',
+            hole=0.4,
+            color_discrete_sequence=px.colors.sequential.RdBu
+        )
+        with stage('fuel_chart'):
+            st.plotly_chart(fig_fuel, use_container_width=True)
 
     # table for show raw data
-    with st.expander("🔍 Lihat Data Mentah BigQuery"):
-        st.dataframe(df_data_asli, use_container_width=True)
+    if df_data_asli is not None:
+        with st.expander("🔍 Lihat Data Mentah BigQuery"):
+            st.dataframe(df_data_asli, use_container_width=True)
+
+# rerun selesai: simpan waktu per stage (tab diagnostik dirender setelahnya)
+run_record = profiler.finish()
+cold_start = warmup.mark_render(startup_complete)
+if cold_start:
+    profiler.log_event(cold_start)
+
+if show_diagnostics:
+    import plotly.express as px
+
+    with tabs[4]:
+        st.header('🩺 Diagnostik Performa')
+        st.caption(
+            f'Sesi `{profiler.session_id}` — waktu tiap tahap pada rerun terakhir. Tahap bertanda cache menunjukkan hit / miss dari `st.cache_*`.')
+
+        d1, d2, d3 = st.columns(3)
+        d1.metric('Jumlah Rerun Sesi Ini', f'{run_record["rerun"]:,}')
+        d2.metric('Durasi Rerun Terakhir',
+                  f'{run_record["total_seconds"] * 1000:,.0f} ms')
+        d3.metric('Cache Miss', sum(
+            stage['cache'] == 'miss' for stage in run_record['stages']))
+
+        df_stages = pd.DataFrame(run_record['stages'])
+        if not df_stages.empty:
+            df_stages['ms'] = df_stages['seconds'] * 1000
+            fig_stages = px.bar(df_stages.sort_values('ms'), x='ms', y='stage', color='cache',
+                                orientation='h', template='plotly_dark')
+            fig_stages.update_layout(xaxis_title='Durasi (ms)', yaxis_title='Tahap')
+            st.plotly_chart(fig_stages, use_container_width=True)
+            st.dataframe(df_stages[['stage', 'cache', 'ms']],
+                         use_container_width=True)
+
+        st.subheader('Riwayat Rerun')
+        st.caption(
+            'Scope `app` = rerun seluruh skrip; scope `fragment_*` = hanya fragment tersebut yang dijalankan ulang (tab ini diperbarui pada rerun penuh berikutnya).')
+        df_history = pd.DataFrame([
+            {'rerun': r['rerun'], 'scope': r.get('scope', 'app'),
+             'total_ms': r['total_seconds'] * 1000,
+             'cache_miss': sum(stage['cache'] == 'miss' for stage in r['stages'])}
+            for r in profiler.history])
+        st.dataframe(df_history, use_container_width=True)
+
+        st.subheader('Cold Start')
+        s1, s2 = st.columns(2)
+        s1.metric('Render Pertama', f'{warmup.first_paint:.2f} s',
+                  help='Sejak skrip pertama kali jalan di proses ini sampai render pertama (boleh dengan placeholder).')
+        s2.metric('Render Lengkap Pertama',
+                  f'{warmup.first_full_render:.2f} s' if warmup.first_full_render else 'belum',
+                  help='Sampai render pertama dengan model dan semua data sudah siap.')
+        st.dataframe(pd.DataFrame({
+            'import (ms)': pd.Series(IMPORT_TIMES) * 1000,
+            'warm-up (ms)': pd.Series(warmup.durations) * 1000,
+        }), use_container_width=True)
+        if warmup.errors:
+            st.warning(f'Warm-up gagal (dimuat ulang secara sinkron): {warmup.errors}')
+
+        st.subheader('Memori')
+        shared_objects = {
+            'stasiun (df_data_asli)': df_data_asli,
+            'rekomendasi': recommend_data,
+            'koordinat zonasi': zoning_coords if df_data_asli is not None else None,
+            'fitur ZIP': load_zip_features(CANDIDATE_PATH),
+            'area kandidat': load_candidate_areas(CANDIDATE_PATH),
+        }
+        session_objects = dict(profiler.frames)
+        session_objects.update({f'session_state: {key}': value
+                                for key, value in st.session_state.items()})
+        df_memory = memory_report(shared_objects, session_objects)
+        session_mb = df_memory.loc[df_memory['cakupan'] == 'sesi', 'MB'].sum()
+        shared_mb = df_memory.loc[df_memory['cakupan'] != 'sesi', 'MB'].sum()
+        mem1, mem2, mem3 = st.columns(3)
+        mem1.metric('Footprint per Sesi', f'{session_mb:,.2f} MB',
+                    help='Frame yang dibuat rerun terakhir sesi ini + isi session_state.')
+        mem2.metric('Data Bersama per Proses', f'{shared_mb:,.1f} MB',
+                    help='Dipakai semua sesi di replika ini (read-only, tidak disalin per sesi).')
+        if df_data_asli is not None:
+            # pembanding: skema lama (teks object + koordinat float64)
+            wide_mb = object_bytes(df_data_asli.astype(
+                {**{col: object for col in STATION_CATEGORICAL if col in df_data_asli.columns},
+                 **{col: np.float64 for col in STATION_FLOAT32}})) / 1024 ** 2
+            compact_mb = df_memory.loc[df_memory['objek'] == 'stasiun (df_data_asli)', 'MB'].sum()
+            mem3.metric('Tabel Stasiun (Skema Ringkas)', f'{compact_mb:,.1f} MB',
+                        delta=f'{compact_mb - wide_mb:,.1f} MB vs object/float64',
+                        delta_color='inverse')
+        st.dataframe(df_memory.sort_values('MB', ascending=False).round(3),
+                     use_container_width=True)
+
+        st.subheader('Cache Bersama')
+        shared_cache = get_shared_cache()
+        if shared_cache is None:
+            st.caption('Cache bersama lintas replika tidak aktif (`SPKLU_SHARED_CACHE=0`).')
+        else:
+            c1, c2, c3, c4 = st.columns(4)
+            c1.metric('Hit', f"{shared_cache.stats['hit']:,}")
+            c2.metric('Salinan Lama', f"{shared_cache.stats['stale']:,}",
+                      help='Entri kedaluwarsa disajikan selagi replika lain menghitung ulang.')
+            c3.metric('Menunggu Replika Lain', f"{shared_cache.stats['wait']:,}")
+            c4.metric('Miss (Dihitung)', f"{shared_cache.stats['miss']:,}")
+            df_entries = shared_cache.backend.entries()
+            now = time.time()
+            df_entries = pd.DataFrame({
+                'key': df_entries['key'],
+                'ukuran (KB)': df_entries['size'] / 1024,
+                'umur (s)': now - df_entries['created'],
+                'kedaluwarsa dalam (s)': df_entries['expires'] - now,
+            })
+            st.caption(f'Statistik proses ini; {len(df_entries)} entri, '
+                       f"{df_entries['ukuran (KB)'].sum() / 1024:,.1f} MB di `{shared_cache.backend.path}`.")
+            st.dataframe(df_entries.round(1), use_container_width=True)
+
+        if profiler.log_path:
+            st.caption(f'Log JSONL ditulis ke `{profiler.log_path}`.')
+        else:
+            st.caption(
+                'Set env `SPKLU_PROFILE_LOG=<file>` untuk menyimpan tiap rerun sebagai JSON lines.')
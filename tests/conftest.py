@@ -0,0 +1,21 @@
+import os
+
+import joblib
+import pytest
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), os.pardir,
+                          'best_model_Gradient_Boosting.pkl')
+
+
+@pytest.fixture(scope='session')
+def model():
+    return joblib.load(MODEL_PATH)
+
+
+@pytest.fixture
+def pandas_output():
+    # sama dengan load_model di app: pipeline butuh output transformer berupa DataFrame
+    from sklearn import config_context
+
+    with config_context(transform_output='pandas'):
+        yield
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from spklu.batch_scoring import (DEFAULT_NEW_STATIONS, LAST_OPENED_RATIO, prepare_sites,
+                                 score_frame, score_sites)
+
+pytestmark = pytest.mark.usefixtures('pandas_output')
+
+
+def sites(**overrides):
+    df = pd.DataFrame({
+        'total_level2': [4, 0, 12],
+        'total_dc_fast': [1, 0, 3],
+        'dominant_facility_type': ['PARKING_LOT', 'HOTEL', 'PUBLIC'],
+        'dominant_ev_network': ['ChargePoint Network', 'Non-Networked', 'Tesla'],
+        'avg_station_age_days': [1200, 300, 2500],
+    })
+    return df.assign(**overrides)
+
+
+def test_derived_columns_follow_sidebar_defaults(model):
+    features = prepare_sites(sites(), model)
+    assert (features['new_station_last_2_years'] == DEFAULT_NEW_STATIONS).all()
+    assert features['last_station_opened_days_ago'].tolist() == \
+        [age * LAST_OPENED_RATIO for age in [1200, 300, 2500]]
+    assert features.loc[0, 'dominant_interaction'] == 'PARKING_LOT_ChargePoint Network'
+
+
+def test_missing_values_pass_through_to_imputer(model):
+    df = sites(total_level2=[4, None, 12],
+               dominant_ev_network=['ChargePoint Network', None, np.nan])
+    features = prepare_sites(df, model)
+    assert np.isnan(features.loc[1, 'total_level2'])
+    assert features['dominant_ev_network'].isna().tolist() == [False, True, True]
+    assert 'nan' not in features['dominant_interaction'].dropna().tolist()
+    assert features['dominant_interaction'].isna().tolist() == [False, True, True]
+    assert np.isfinite(score_frame(model, df)['predicted_demand']).all()
+
+
+def test_non_numeric_text_is_rejected(model):
+    with pytest.raises(ValueError, match='total_dc_fast'):
+        prepare_sites(sites(total_dc_fast=[1, 'banyak', 3]), model)
+
+
+def test_missing_required_column_is_rejected(model):
+    with pytest.raises(ValueError, match='avg_station_age_days'):
+        prepare_sites(sites().drop(columns='avg_station_age_days'), model)
+
+
+def test_chunked_scoring_matches_single_predict(model):
+    features = prepare_sites(pd.concat([sites()] * 5, ignore_index=True), model)
+    np.testing.assert_allclose(score_sites(model, features, chunk_size=4),
+                               model.predict(features))
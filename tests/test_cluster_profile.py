@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from spklu.cluster_profile import add_color_columns, cluster_colors, cluster_profile
+
+
+def clustered(categorical=False):
+    df = pd.DataFrame({
+        'station_name': ['A', 'B', None, 'D', 'E', np.nan],
+        'fuel_type': ['ELEC', 'CNG', 'CNG', 'ELEC', None, None],
+        'city': ['X', 'Y', 'Y', 'Z', 'Z', None],
+        'state': ['CA', 'CA', 'NV', 'NY', 'NY', 'NY'],
+        'cluster_label': [0, 0, 0, 2, 2, 3],
+    })
+    if categorical:
+        df = df.astype({col: 'category' for col in ['station_name', 'fuel_type', 'city', 'state']})
+    return df
+
+
+def groupby_profile(df):
+    # implementasi lama (groupby + lambda) sebagai acuan
+    stats = df.groupby('cluster_label', observed=True).agg({
+        'station_name': 'count',
+        'fuel_type': lambda x: x.mode()[0] if not x.mode().empty else 'N/A',
+        'city': 'nunique',
+        'state': 'nunique',
+    }).reset_index()
+    stats.columns = ['Zona ID', 'Total Stasiun', 'Dominan Fuel', 'Jml Kota', 'Jml N.Bagian']
+    return stats
+
+
+@pytest.mark.parametrize('categorical', [False, True])
+def test_profile_matches_groupby(categorical):
+    df = clustered(categorical)
+    profile = cluster_profile(df)
+    expected = groupby_profile(clustered())
+    pd.testing.assert_frame_equal(profile, expected, check_dtype=False)
+    assert profile['Total Stasiun'].tolist() == [2, 2, 0]
+
+
+def test_colors_wrap_around_palette():
+    assert (cluster_colors([0, 20]) == cluster_colors([0, 0])).all()
+    colored = add_color_columns(clustered())
+    assert colored[['r', 'g', 'b']].iloc[0].tolist() == [255, 0, 0]
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from spklu.coverage import EARTH_RADIUS_KM, build_coverage_matrix
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(0)
+    return rng.uniform(40, 41, 200), rng.uniform(-75, -74, 200)
+
+
+def test_matches_brute_force(points):
+    lat, lon = points
+    matrix = build_coverage_matrix(lat, lon, radius_km=10).toarray()
+    dist = haversine_km(lat[:, None], lon[:, None], lat[None, :], lon[None, :])
+    # pasangan tepat di batas radius bisa beda karena pembulatan
+    clear = np.abs(dist - 10) > 1e-6
+    np.testing.assert_array_equal(matrix[clear], (dist <= 10)[clear])
+    assert matrix.diagonal().all()
+
+
+def test_return_distance_keeps_zero_distance(points):
+    lat, lon = points
+    distance = build_coverage_matrix(lat, lon, radius_km=5, return_distance=True)
+    assert distance.dtype == np.float32
+    assert distance.nnz == build_coverage_matrix(lat, lon, radius_km=5).nnz
+    np.testing.assert_allclose(distance.diagonal(), 0, atol=1e-4)
+
+
+def test_exact_uses_geodesic_near_radius():
+    geopy = pytest.importorskip('geopy.distance')
+    # sepanjang meridian dekat ekuator haversine lebih panjang dari geodesic WGS-84
+    lat, lon = np.array([0.0, 0.0899]), np.array([0.0, 0.0])
+    radius = geopy.geodesic((0, 0), (0.0899, 0)).kilometers
+    assert build_coverage_matrix(lat, lon, radius_km=radius)[0, 1] == 0
+    assert build_coverage_matrix(lat, lon, radius_km=radius, exact=True)[0, 1] == 1
+
+
+def test_separate_area_points_and_empty_input():
+    matrix = build_coverage_matrix([0.0], [0.0], [0.0, 10.0], [0.0, 10.0], radius_km=1)
+    assert matrix.shape == (1, 2)
+    assert matrix.toarray().tolist() == [[1, 0]]
+    assert build_coverage_matrix([], [], radius_km=1).shape == (0, 0)
+    with pytest.raises(ValueError):
+        build_coverage_matrix([0.0], [0.0], radius_km=0)
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from spklu.explain import ShapCache, top_factors
+from spklu.fast_inference import sample_inputs
+
+pytest.importorskip('shap')
+pytestmark = pytest.mark.usefixtures('pandas_output')
+
+
+@pytest.fixture(scope='module')
+def inputs(model):
+    return sample_inputs(model, 20, seed=5)
+
+
+def test_attributions_add_up_to_prediction(model, inputs, tmp_path):
+    cache = ShapCache(model, directory=str(tmp_path))
+    attributions = cache.explain_rows(inputs)
+    assert list(attributions.columns) == list(model.feature_names_in_)
+    np.testing.assert_allclose(cache.expected_value + attributions.sum(axis=1),
+                               model.predict(inputs), atol=1e-4)
+
+
+def test_adhoc_rows_are_cached_on_disk(model, inputs, tmp_path):
+    first = ShapCache(model, directory=str(tmp_path)).explain_rows(inputs.iloc[:5])
+    cache = ShapCache(model, directory=str(tmp_path))
+    assert len(cache._adhoc) == 5
+    pd.testing.assert_frame_equal(cache.explain_rows(inputs.iloc[:5]), first)
+
+
+def test_zip_table_keeps_one_row_per_zip(model, inputs, tmp_path):
+    features = inputs.iloc[:4].assign(ZIP=['01803', '01803', '94103', 'V7B'])
+    cache = ShapCache(model, directory=str(tmp_path))
+    table = cache.precompute_zips(features, 'fp', background=False)
+    assert table['zip_code'].tolist() == [1803, 94103]
+    assert cache.zip_table is table
+    expected = cache.explain_rows(inputs.iloc[[0, 2]])
+    np.testing.assert_allclose(table.drop(columns='zip_code').to_numpy(),
+                               expected.to_numpy(), atol=1e-5)
+
+
+def test_top_factors_orders_by_absolute_value():
+    attributions = pd.DataFrame({'a': [0.5], 'b': [-2.0], 'c': [1.0]})
+    assert top_factors(attributions, n=2).iloc[0] == 'b -2.00 · c +1.00'
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from spklu.fast_inference import (NUMPY_TRAVERSAL_MAX_ROWS, FastPipeline,
+                                  UnsupportedPipelineError, _FlatForest, sample_inputs)
+
+pytestmark = pytest.mark.usefixtures('pandas_output')
+
+
+@pytest.fixture(scope='module')
+def fast(model):
+    return FastPipeline.from_pipeline(model)
+
+
+def assert_parity(model, fast, X):
+    np.testing.assert_allclose(fast.predict(X), model.predict(X), rtol=0, atol=1e-6)
+
+
+@pytest.mark.parametrize('n_rows', [1, NUMPY_TRAVERSAL_MAX_ROWS, 500])
+def test_parity_on_sample_rows(model, fast, n_rows):
+    # <= NUMPY_TRAVERSAL_MAX_ROWS lewat traversal NumPy, di atasnya lewat predict_stages
+    assert_parity(model, fast, sample_inputs(model, n_rows, seed=n_rows))
+
+
+@pytest.fixture
+def edge_rows(model):
+    X = sample_inputs(model, 4, seed=1).reset_index(drop=True)
+    X = X.astype({col: object for col in X.columns if X[col].dtype == object})
+    X.loc[0, 'dominant_ev_network'] = 'JARINGAN_BARU'
+    X.loc[1, 'total_level2'] = np.nan
+    X.loc[2, 'dominant_facility_type'] = None
+    X.loc[3, 'dominant_interaction'] = np.nan
+    return X
+
+
+def test_parity_on_edge_rows(model, fast, edge_rows):
+    assert_parity(model, fast, edge_rows)
+    for i in range(len(edge_rows)):
+        assert_parity(model, fast, edge_rows.iloc[[i]])
+
+
+def test_parity_on_edge_rows_in_large_batch(model, fast, edge_rows):
+    X = pd.concat([edge_rows] * 50, ignore_index=True)
+    assert len(X) > NUMPY_TRAVERSAL_MAX_ROWS
+    assert_parity(model, fast, X)
+
+
+def test_from_pipeline_verifies_parity(model):
+    fast = FastPipeline.from_pipeline(model, verify_with=sample_inputs(model, 50))
+    assert list(fast.feature_names_in_) == list(model.feature_names_in_)
+
+
+@pytest.mark.parametrize('n_rows', [1, 1000])
+def test_from_pipeline_rejects_broken_numpy_traversal(model, monkeypatch, n_rows):
+    # sampel besar hanya lewat predict_stages: traversal NumPy tetap harus dicek
+    predict = _FlatForest.predict
+    monkeypatch.setattr(_FlatForest, 'predict', lambda self, X: predict(self, X) + 1.0)
+    with pytest.raises(UnsupportedPipelineError):
+        FastPipeline.from_pipeline(model, verify_with=sample_inputs(model, n_rows))
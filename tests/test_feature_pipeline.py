@@ -0,0 +1,90 @@
+import pandas as pd
+import pytest
+
+from spklu.feature_pipeline import FeatureAccumulator
+
+AS_OF = '2025-06-01'
+
+
+def raw_rows():
+    return pd.DataFrame({
+        'ZIP': ['01803', '01803', '01803', '94103', '94103', '10001'],
+        'Fuel Type Code': ['ELEC'] * 5 + ['CNG'],
+        'Status Code': ['E', 'E', 'E', 'E', 'T', 'E'],
+        'Country': ['US'] * 6,
+        'EV Level2 EVSE Num': [2, 4, None, 6, 1, 1],
+        'EV DC Fast Count': [None, 1, 2, 0, 0, 0],
+        'Facility Type': ['HOTEL', 'HOTEL', 'PARKING_LOT', None, 'HOTEL', 'HOTEL'],
+        'EV Network': ['Tesla', 'Tesla', 'EVgo', 'EVgo', 'EVgo', 'EVgo'],
+        'Open Date': ['2024-06-01', '2020-01-01', None, '2025-05-01', '2025-01-01',
+                      '2025-01-01'],
+        'Latitude': [42.5, 42.6, 42.7, 37.7, 37.7, 40.7],
+        'Longitude': [-71.2, -71.3, -71.4, -122.4, -122.4, -74.0],
+    })
+
+
+def accumulate(df):
+    acc = FeatureAccumulator()
+    acc.add(df)
+    return acc
+
+
+def test_features_per_zip():
+    features = accumulate(raw_rows()).features(AS_OF).set_index('ZIP')
+    assert features.index.tolist() == ['01803', '94103']
+    row = features.loc['01803']
+    assert row['jumlah_stasiun'] == 3
+    assert row['total_level2'] == 6 and row['total_dc_fast'] == 3
+    assert row['avg_latitude'] == pytest.approx(42.6)
+    assert row['dominant_facility_type'] == 'HOTEL'
+    assert row['dominant_interaction'] == 'HOTEL_Tesla'
+    assert row['new_station_last_2_years'] == 1
+    assert row['last_station_opened_days_ago'] == 365
+    # Facility Type kosong: interaksi NaN, bukan 'nan_EVgo'
+    assert pd.isna(features.loc['94103', 'dominant_interaction'])
+    assert features.loc['94103', 'dominant_ev_network'] == 'EVgo'
+
+
+def test_removed_rows_match_rebuild_and_are_counted_separately():
+    df = raw_rows()
+    acc = accumulate(df)
+    acc.add(df.iloc[[1]], sign=-1)
+    rebuilt = accumulate(df.drop(index=1))
+    pd.testing.assert_frame_equal(acc.features(AS_OF), rebuilt.features(AS_OF),
+                                  check_dtype=False)
+    assert acc.rows_processed == 4
+    assert acc.rows_removed == 1
+
+
+def test_state_roundtrip(tmp_path):
+    acc = accumulate(raw_rows())
+    acc.add(raw_rows().iloc[[0]], sign=-1)
+    acc.save(str(tmp_path))
+    loaded = FeatureAccumulator.load(str(tmp_path))
+    assert (loaded.rows_processed, loaded.rows_removed) == (4, 1)
+    pd.testing.assert_frame_equal(loaded.features(AS_OF), acc.features(AS_OF))
+
+
+def test_removing_newest_station_lowers_last_open_day():
+    df = raw_rows()
+    acc = accumulate(df)
+    acc.add(df.iloc[[0]], sign=-1)
+    features = acc.features(AS_OF).set_index('ZIP')
+    # stasiun tersisa di 01803 dibuka 2020-01-01
+    assert features.loc['01803', 'last_station_opened_days_ago'] == 1978
+    assert features.loc['01803', 'new_station_last_2_years'] == 0
+    pd.testing.assert_frame_equal(acc.features(AS_OF),
+                                  accumulate(df.drop(index=0)).features(AS_OF),
+                                  check_dtype=False)
+
+
+def test_features_for_later_as_of():
+    acc = accumulate(raw_rows())
+    later = acc.features('2030-06-01').set_index('ZIP')
+    assert later['new_station_last_2_years'].tolist() == [0, 0]
+    assert later.loc['01803', 'last_station_opened_days_ago'] == 365 + 5 * 365 + 1
+    # delta sesudahnya tetap masuk hitungan stasiun baru
+    new_row = raw_rows().iloc[[0]].assign(**{'Open Date': '2029-01-01'})
+    acc.add(new_row)
+    assert acc.features('2030-06-01').set_index('ZIP').loc[
+        '01803', 'new_station_last_2_years'] == 1
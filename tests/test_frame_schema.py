@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from spklu.frame_schema import (SCOPE_SESSION, SCOPE_SHARED, compact_frame, compact_stations,
+                                memory_report, object_bytes)
+
+
+def stations(n=1000):
+    return pd.DataFrame({
+        'station_name': [f'Stasiun {i % 50}' for i in range(n)],
+        'latitude': np.linspace(30, 40, n),
+        'longitude': np.linspace(-120, -80, n),
+        'city': ['Austin', 'Denver'] * (n // 2),
+        'state': ['TX', 'CO'] * (n // 2),
+        'fuel_type': ['ELEC'] * n,
+        'status': ['E'] * n,
+    })
+
+
+def test_compact_stations_casts_and_shrinks():
+    df = stations()
+    compact = compact_stations(df)
+    assert compact['latitude'].dtype == np.float32
+    assert isinstance(compact['city'].dtype, pd.CategoricalDtype)
+    np.testing.assert_allclose(compact['latitude'], df['latitude'], atol=1e-5)
+    assert object_bytes(compact) < object_bytes(df) / 3
+
+
+def test_compact_frame_is_noop_for_compact_input_and_drops_unused_categories():
+    compact = compact_stations(stations())
+    assert compact_stations(compact) is compact
+    subset = compact_stations(compact[compact['state'] == 'TX'])
+    assert subset['state'].cat.categories.tolist() == ['TX']
+    assert subset['city'].cat.categories.tolist() == ['Austin']
+
+
+def test_compact_frame_ignores_missing_columns():
+    df = pd.DataFrame({'a': [1.0]})
+    assert compact_frame(df, categorical=['x'], float32=['y']) is df
+
+
+def test_memory_report_rows():
+    report = memory_report({'stasiun': stations(10), 'kosong': None},
+                           {'state': {'a': np.zeros(100)}})
+    assert report['objek'].tolist() == ['stasiun', 'state']
+    assert report['cakupan'].tolist() == [SCOPE_SHARED, SCOPE_SESSION]
+    assert report.loc[0, 'baris'] == 10 and pd.isna(report.loc[1, 'baris'])
+    assert (report['MB'] > 0).all()
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from spklu.map_layers import RAW_POINTS_MIN_ZOOM, aggregate_grid, cell_size_deg, map_frame
+
+
+def stations(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'latitude': rng.uniform(30, 45, n),
+        'longitude': rng.uniform(-120, -75, n),
+        'station_name': [f'S{i}' for i in range(n)],
+        'fuel_type': rng.choice(['ELEC', 'CNG'], n),
+    })
+
+
+def test_grid_counts_every_valid_point_once():
+    df = stations()
+    df.loc[:4, 'latitude'] = np.nan
+    grid = aggregate_grid(df, cell_size_deg(3))
+    assert grid['count'].sum() == len(df) - 5
+    assert grid['radius'].max() == np.float32(cell_size_deg(3) * 111.32 * 1000 / 2)
+
+
+def test_grid_cell_centroid_is_mean_of_points():
+    df = pd.DataFrame({'latitude': [10.1, 10.3, 50.0], 'longitude': [20.1, 20.2, 60.0]})
+    grid = aggregate_grid(df, 1.0).sort_values('count', ascending=False)
+    assert grid['count'].tolist() == [2, 1]
+    assert np.isclose(grid['lat'].iloc[0], 10.2) and np.isclose(grid['lon'].iloc[0], 20.15)
+
+
+def test_grid_splits_cells_by_group():
+    df = stations()
+    grid = aggregate_grid(df, 360.0, group_col='fuel_type')
+    counts = grid.set_index('fuel_type')['count'].to_dict()
+    assert counts == df['fuel_type'].value_counts().to_dict()
+
+
+def test_map_frame_switches_between_raw_points_and_grid():
+    df = stations()
+    raw, aggregated = map_frame(df, zoom=3, columns=['station_name'], max_points=len(df))
+    assert not aggregated
+    assert list(raw.columns) == ['lat', 'lon', 'station_name']
+    assert raw['lat'].dtype == np.float32
+
+    grid, aggregated = map_frame(df, zoom=3, max_points=50)
+    assert aggregated and grid['count'].sum() == len(df)
+
+    _, aggregated = map_frame(df, zoom=RAW_POINTS_MIN_ZOOM, max_points=50)
+    assert not aggregated
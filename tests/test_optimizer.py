@@ -0,0 +1,85 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+
+from spklu.optimizer import GREEDY_BOUND, lazy_greedy_max_coverage, solve_placement, upper_bound
+
+
+def brute_force(coverage, demand, budget):
+    dense = coverage.toarray().astype(bool)
+    best = 0.0
+    for combo in itertools.combinations(range(dense.shape[0]), budget):
+        best = max(best, demand[dense[list(combo)].any(axis=0)].sum())
+    return best
+
+
+def random_instance(seed, n_cand=10, n_area=14):
+    rng = np.random.default_rng(seed)
+    coverage = sparse.csr_matrix(rng.random((n_cand, n_area)) < 0.25, dtype=np.int8)
+    return coverage, rng.integers(1, 20, n_area).astype(float)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_greedy_guarantee_and_bound(seed):
+    coverage, demand = random_instance(seed)
+    solution = lazy_greedy_max_coverage(coverage, demand, 3)
+    opt = brute_force(coverage, demand, 3)
+    assert solution.covered_demand >= GREEDY_BOUND * opt - 1e-9
+    assert solution.upper_bound >= opt - 1e-9
+    assert solution.covered_demand <= opt + 1e-9
+
+
+def test_lazy_matches_plain_greedy():
+    coverage, demand = random_instance(42, n_cand=30, n_area=40)
+    dense = coverage.toarray().astype(bool)
+    covered = np.zeros(dense.shape[1], dtype=bool)
+    expected = []
+    for _ in range(5):
+        gains = np.where(dense, demand * ~covered, 0).sum(axis=1)
+        best = int(np.argmax(gains))
+        if gains[best] <= 0:
+            break
+        expected.append(best)
+        covered |= dense[best]
+    solution = lazy_greedy_max_coverage(coverage, demand, 5)
+    assert solution.selected.tolist() == expected
+    np.testing.assert_allclose(solution.gains.sum(), solution.covered_demand)
+
+
+def test_stops_when_everything_covered_and_validates_input():
+    coverage = sparse.csr_matrix(np.eye(3, dtype=np.int8))
+    solution = lazy_greedy_max_coverage(coverage, np.ones(3), 10)
+    assert len(solution.selected) == 3 and solution.coverage_ratio == 1.0
+    with pytest.raises(ValueError):
+        lazy_greedy_max_coverage(coverage, np.ones(2), 1)
+    with pytest.raises(ValueError):
+        lazy_greedy_max_coverage(coverage, np.ones(3), -1)
+
+
+def test_solve_placement_frame():
+    areas = pd.DataFrame({'id': ['a', 'b', 'c'], 'avg_latitude': [0.0, 0.01, 5.0],
+                          'avg_longitude': [0.0, 0.0, 5.0], 'demand': [5, 3, 1]})
+    chosen, solution = solve_placement(areas, budget=2, radius_km=5)
+    assert chosen['id'].tolist() == ['a', 'c']
+    assert chosen['urutan'].tolist() == [1, 2]
+    assert solution.covered_demand == 9
+
+
+def test_bound_for_truncated_prefix_skips_greedy_cap():
+    # 10 kandidat disjoint, demand 10: satu terpilih dari budget 10, OPT = 100
+    coverage = sparse.identity(10, dtype=np.int8, format='csr')
+    demand = np.full(10, 10.0)
+    covered = np.zeros(10, dtype=bool)
+    covered[0] = True
+    assert upper_bound(coverage, demand, covered, 10) == 100.0
+    assert upper_bound(coverage, demand, covered, 10, greedy=True) == pytest.approx(10 / GREEDY_BOUND)
+
+
+def test_timed_out_solution_keeps_valid_bound():
+    coverage = sparse.identity(10, dtype=np.int8, format='csr')
+    solution = lazy_greedy_max_coverage(coverage, np.full(10, 10.0), 10, time_limit=-1)
+    assert solution.timed_out
+    assert solution.upper_bound >= 100.0
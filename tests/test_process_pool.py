@@ -0,0 +1,51 @@
+import multiprocessing
+import sys
+import types
+
+from spklu.process_pool import guard_script_main, spawn_executor
+
+
+def script_main(tmp_path):
+    # pengganti modul __main__ ala Streamlit: punya __file__, tanpa __spec__
+    marker = tmp_path / 'dijalankan'
+    script = tmp_path / 'app.py'
+    script.write_text(f'open({str(marker)!r}, "w").close()\n')
+    main = types.ModuleType('__main__')
+    main.__file__ = str(script)
+    return main, marker
+
+
+def run_pool(max_workers):
+    executor = spawn_executor(max_workers)
+    try:
+        assert list(executor.map(abs, [-1, -2, -3])) == [1, 2, 3]
+    finally:
+        executor.shutdown()
+
+
+def test_unguarded_script_main_is_rerun_by_workers(tmp_path, monkeypatch):
+    main, marker = script_main(tmp_path)
+    monkeypatch.setitem(sys.modules, '__main__', main)
+    run_pool(1)
+    assert marker.exists()
+
+
+def test_guarded_script_main_is_not_rerun(tmp_path, monkeypatch):
+    main, marker = script_main(tmp_path)
+    guard_script_main(main.__dict__)
+    monkeypatch.setitem(sys.modules, '__main__', main)
+    run_pool(2)
+    # worker yang di-start di luar spawn_executor juga tidak menjalankan skrip
+    process = multiprocessing.get_context('spawn').Process(target=abs, args=(-1,))
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    assert not marker.exists()
+    assert sys.modules['__main__'] is main
+
+
+def test_guard_keeps_existing_spec(tmp_path):
+    main, _ = script_main(tmp_path)
+    main.__spec__ = spec = types.SimpleNamespace(name='spklu.whatif')
+    guard_script_main(main.__dict__)
+    assert main.__spec__ is spec
@@ -0,0 +1,123 @@
+import json
+import time
+
+import pytest
+
+from spklu import profiling
+from spklu.profiling import (HISTORY_SIZE, RerunProfiler, diagnostics_enabled, profiled,
+                             record_miss, stage, track)
+
+
+@pytest.fixture(autouse=True)
+def no_active_profiler(monkeypatch):
+    monkeypatch.delenv(profiling.PROFILE_LOG_ENV, raising=False)
+    yield
+    profiling._active.profiler = None
+
+
+def test_stages_are_timed_and_nested():
+    profiler = RerunProfiler({})
+    with profiler.stage('luar'):
+        with profiler.stage('dalam'):
+            time.sleep(0.02)
+    profiler.record('imports', 0.5)
+    record = profiler.finish()
+    stages = {entry['stage']: entry for entry in record['stages']}
+    # stage dalam selesai lebih dulu
+    assert [entry['stage'] for entry in record['stages']] == ['dalam', 'luar', 'imports']
+    assert stages['dalam']['seconds'] >= 0.02
+    assert stages['luar']['seconds'] >= stages['dalam']['seconds']
+    assert stages['imports']['seconds'] == 0.5
+    assert record['total_seconds'] >= stages['luar']['seconds']
+
+
+def test_cache_hit_and_miss():
+    profiler = RerunProfiler({})
+    with profiler.stage('hit', cached=True):
+        pass
+    with profiler.stage('miss', cached=True):
+        with profiler.stage('tanpa_cache'):
+            pass
+        # body fungsi cache: menandai stage yang paling dalam saat itu
+        record_miss()
+    with profiler.stage('tanpa_cache'):
+        pass
+    caches = [(entry['stage'], entry['cache']) for entry in profiler.finish()['stages']]
+    assert caches == [('hit', 'hit'), ('tanpa_cache', None), ('miss', 'miss'),
+                      ('tanpa_cache', None)]
+
+
+def test_module_helpers_are_noops_without_profiler():
+    record_miss()
+    track('frame', object())
+    with stage('apa saja') as entry:
+        assert entry == {}
+
+
+def test_history_is_per_session_and_bounded():
+    session, other = {}, {}
+    for _ in range(HISTORY_SIZE + 10):
+        RerunProfiler(session).finish()
+    RerunProfiler(other).finish()
+    state = session[profiling._SESSION_KEY]
+    assert state['reruns'] == HISTORY_SIZE + 10
+    assert len(state['history']) == HISTORY_SIZE
+    assert state['history'][0]['rerun'] == 11
+    assert state['history'][-1]['rerun'] == HISTORY_SIZE + 10
+    assert {r['session_id'] for r in state['history']} == {state['session_id']}
+    assert other[profiling._SESSION_KEY]['session_id'] != state['session_id']
+
+
+def test_profile_log_is_jsonl(tmp_path, monkeypatch):
+    log_path = tmp_path / 'profile.jsonl'
+    monkeypatch.setenv(profiling.PROFILE_LOG_ENV, str(log_path))
+    session = {}
+    for _ in range(2):
+        profiler = RerunProfiler(session)
+        with profiler.stage('load_bq', cached=True):
+            pass
+        profiler.finish()
+    records = [json.loads(line) for line in log_path.read_text().splitlines()]
+    assert [r['rerun'] for r in records] == [1, 2]
+    assert set(records[0]) == {'ts', 'session_id', 'rerun', 'scope', 'total_seconds', 'stages'}
+    assert records[0]['scope'] == 'app'
+    assert records[0]['stages'][0]['stage'] == 'load_bq'
+    assert set(records[0]['stages'][0]) == {'stage', 'cache', 'seconds'}
+
+
+def test_profiled_fragment_inside_and_outside_full_rerun():
+    session = {}
+
+    @profiled('fragment_x', session_state=session)
+    def fragment(value):
+        with stage('hitung'):
+            return value * 2
+
+    # rerun penuh: stage masuk ke profiler rerun itu
+    profiler = RerunProfiler(session)
+    assert fragment(2) == 4
+    record = profiler.finish()
+    assert [entry['stage'] for entry in record['stages']] == ['hitung', 'fragment_x']
+
+    # rerun fragment saja: record sendiri dengan scope = nama fragment
+    assert fragment(3) == 6
+    history = session[profiling._SESSION_KEY]['history']
+    assert history[-1]['scope'] == 'fragment_x'
+    assert [entry['stage'] for entry in history[-1]['stages']] == ['hitung', 'fragment_x']
+    assert getattr(profiling._active, 'profiler', None) is None
+
+
+def test_track_keeps_frames_of_active_rerun():
+    profiler = RerunProfiler({})
+    frame = object()
+    track('rekomendasi', frame)
+    assert profiler.frames == {'rekomendasi': frame}
+    assert 'frames' not in profiler.finish()
+
+
+def test_diagnostics_enabled(monkeypatch):
+    monkeypatch.delenv(profiling.DIAGNOSTICS_ENV, raising=False)
+    assert not diagnostics_enabled()
+    assert diagnostics_enabled({'diag': '1'})
+    monkeypatch.setenv(profiling.DIAGNOSTICS_ENV, 'true')
+    assert diagnostics_enabled()
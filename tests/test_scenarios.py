@@ -0,0 +1,92 @@
+import dataclasses
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from spklu import scenarios
+from spklu.optimizer import solve_placement
+from spklu.scenarios import (ALL_REGIONS, load_results, run_scenarios, save_results,
+                             scenario_sites)
+
+
+def areas(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'id': [f'{i:05d}' for i in range(n)],
+        'avg_latitude': rng.uniform(35, 36, n),
+        'avg_longitude': rng.uniform(-100, -99, n),
+        'demand': rng.integers(1, 20, n),
+        'state': np.where(np.arange(n) % 2, 'CA', 'TX'),
+    })
+
+
+def test_budget_prefixes_match_separate_solves():
+    df = areas()
+    results, sites = run_scenarios(df, budgets=(3, 8), radii=(10,), workers=1, data_fp='fp')
+    for budget in (3, 8):
+        chosen, solution = solve_placement(df, budget, 10)
+        row = results[results['budget'] == budget].iloc[0]
+        assert row['covered_demand'] == pytest.approx(solution.covered_demand)
+        assert row['optimality_ratio'] == pytest.approx(solution.optimality_ratio)
+        assert row['status'] == 'ok'
+        assert scenario_sites(sites, 'fp', ALL_REGIONS, 10, budget)['id'].tolist() == \
+            chosen['id'].tolist()
+
+
+def test_region_uses_only_its_areas():
+    df = areas()
+    results, sites = run_scenarios(df, budgets=(5,), radii=(10,), regions=('CA',), workers=1)
+    assert results['total_demand'].iloc[0] == df.loc[df['state'] == 'CA', 'demand'].sum()
+    assert set(sites['id']) <= set(df.loc[df['state'] == 'CA', 'id'])
+
+
+def test_time_limit_prefix_does_not_claim_greedy_bound(monkeypatch):
+    # 10 area disjoint (berjauhan) dengan demand sama, greedy terpotong setelah 1 langkah
+    df = pd.DataFrame({'id': [str(i) for i in range(10)], 'avg_latitude': np.arange(10) * 5.0,
+                       'avg_longitude': 0.0, 'demand': 10})
+    solve = scenarios.lazy_greedy_max_coverage
+
+    def truncated(*args, **kwargs):
+        solution = solve(*args, **kwargs)
+        return dataclasses.replace(solution, selected=solution.selected[:1],
+                                   gains=solution.gains[:1], timed_out=True)
+
+    monkeypatch.setattr(scenarios, 'lazy_greedy_max_coverage', truncated)
+    results, _ = run_scenarios(df, budgets=(1, 10), radii=(1,), workers=1)
+    one, ten = results.sort_values('budget').to_dict('records')
+    assert one['status'] == 'ok' and ten['status'] == 'time_limit'
+    # OPT(10) = 100: rasio terbukti untuk 1 lokasi paling tinggi 10 / 100
+    assert ten['optimality_ratio'] == pytest.approx(0.1)
+
+
+def test_store_replaces_rerun_scenarios(tmp_path):
+    df = areas()
+    first = run_scenarios(df, budgets=(3,), radii=(5, 10), workers=1, data_fp='fp')
+    save_results(*first, directory=str(tmp_path))
+    rerun = run_scenarios(df, budgets=(3,), radii=(10,), workers=1, data_fp='fp')
+    save_results(*rerun, directory=str(tmp_path))
+    results, sites = load_results(str(tmp_path))
+    assert len(results) == 2
+    assert len(sites[sites['radius_km'] == 10]) == 3
+
+
+def _save_many(directory, results, sites, worker, n_saves):
+    for i in range(n_saves):
+        data_fp = f'{worker}-{i}'
+        save_results(results.assign(data_fp=data_fp), sites.assign(data_fp=data_fp),
+                     directory=directory)
+
+
+def test_concurrent_processes_do_not_lose_results(tmp_path):
+    results, sites = run_scenarios(areas(), budgets=(3,), radii=(10,), workers=1)
+    directory = str(tmp_path)
+    with ProcessPoolExecutor(4) as executor:
+        futures = [executor.submit(_save_many, directory, results, sites, worker, 5)
+                   for worker in range(4)]
+        for future in futures:
+            future.result()
+    stored, stored_sites = load_results(directory)
+    assert stored['data_fp'].nunique() == 20
+    assert stored_sites['data_fp'].nunique() == 20
@@ -0,0 +1,102 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from spklu.shared_cache import (SharedCache, SQLiteBackend, cache_key, deserialize_frame,
+                                serialize_frame)
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return SQLiteBackend(str(tmp_path / 'cache.sqlite'))
+
+
+def frame(value=1):
+    return pd.DataFrame({'x': [value, value + 1], 'name': ['a', 'b']})
+
+
+def test_cache_key_ignores_query_whitespace():
+    assert cache_key('q', 'SELECT 1\n   FROM t') == cache_key('q', 'SELECT 1 FROM t')
+    assert cache_key('q', 'SELECT 1') != cache_key('other', 'SELECT 1')
+    assert cache_key('z', 'fp', 3) != cache_key('z', 'fp', 4)
+
+
+def test_serialize_roundtrip_keeps_attrs():
+    df = frame().assign(c=lambda d: d['name'].astype('category'))
+    df.attrs = {'k': 3}
+    restored = deserialize_frame(serialize_frame(df))
+    pd.testing.assert_frame_equal(restored, df)
+    assert restored.attrs == {'k': 3}
+
+
+def test_hit_after_miss(backend):
+    cache = SharedCache(backend)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return frame()
+
+    cache.get_or_compute('k', compute)
+    pd.testing.assert_frame_equal(cache.get_or_compute('k', compute), frame())
+    assert len(calls) == 1
+    assert cache.stats['miss'] == 1 and cache.stats['hit'] == 1
+
+
+def test_stale_copy_served_while_another_worker_recomputes(backend):
+    backend.put('k', serialize_frame(frame(1)), time.time() - 1)
+    assert backend.acquire('k', 'other-worker')
+    cache = SharedCache(backend)
+    result = cache.get_or_compute('k', lambda: pytest.fail('tidak boleh menghitung'))
+    pd.testing.assert_frame_equal(result, frame(1))
+    assert cache.stats['stale'] == 1
+
+
+def test_entries_past_max_stale_are_not_served(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'cache.sqlite'), max_stale=60)
+    backend.put('old', serialize_frame(frame(1)), time.time() - 120)
+    assert backend.get('old') is None
+    backend.put('recent', serialize_frame(frame(1)), time.time() - 30)
+    assert backend.get('recent') is not None
+
+
+def test_waiting_workers_get_the_first_result(backend):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.5)
+        return frame(7)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        SharedCache(backend).get_or_compute('k', compute))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    for result in results:
+        pd.testing.assert_frame_equal(result, frame(7))
+
+
+def test_expired_lock_lease_can_be_taken_over(backend):
+    assert backend.acquire('k', 'a', lease=-1)
+    assert backend.acquire('k', 'b')
+    assert not backend.acquire('k', 'c')
+    backend.release('k', 'b')
+    assert backend.acquire('k', 'c')
+
+
+def test_least_recently_read_entries_are_evicted(tmp_path):
+    payload = serialize_frame(frame())
+    backend = SQLiteBackend(str(tmp_path / 'cache.sqlite'), max_bytes=2 * len(payload))
+    expires = time.time() + 60
+    backend.put('a', payload, expires)
+    backend.put('b', payload, expires)
+    time.sleep(0.01)
+    backend.get('a')
+    backend.put('c', payload, expires)
+    assert sorted(backend.entries()['key']) == ['a', 'c']
@@ -0,0 +1,73 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from spklu.snapshot_store import (is_stale, read_table, recommendation_frame, write_table,
+                                  zip_state_index, zip_to_int, zip_to_str)
+
+
+def test_zip_codes_roundtrip_with_leading_zeros():
+    codes = zip_to_int(['01803', '02143', '94103', 'V7B 1Y9', None])
+    assert codes.tolist()[:3] == [1803, 2143, 94103]
+    assert codes.isna().tolist() == [False, False, False, True, True]
+    labels = zip_to_str(codes)
+    assert labels.tolist()[:3] == ['01803', '02143', '94103']
+    assert labels.isna().tolist()[3:] == [True, True]
+
+
+def test_recommendations_join_state_on_int_zip():
+    zip_state = zip_state_index(pd.DataFrame({'ZIP': ['01803', '94103', '94103'],
+                                              'State': ['MA', 'CA', 'CA']}))
+    assert len(zip_state) == 2
+    df = recommendation_frame(pd.DataFrame({
+        'id': ['01803', '94103'], 'avg_latitude': [42.5, 37.8],
+        'avg_longitude': [-71.2, -122.4], 'demand': [3, 5],
+    }), zip_state)
+    assert df['State'].astype(str).tolist() == ['MA', 'CA']
+    assert zip_to_str(df['zip_code']).tolist() == ['01803', '94103']
+
+
+def test_write_read_table_and_staleness(tmp_path):
+    directory = str(tmp_path)
+    source = tmp_path / 'source.csv'
+    source.write_text('x\n1\n')
+    assert read_table('t', directory) is None
+    assert is_stale('t', str(source), directory=directory)
+
+    df = pd.DataFrame({'a': [1, 2], 'b': ['x', 'y']})
+    path = write_table(df, 't', directory)
+    pd.testing.assert_frame_equal(read_table('t', directory), df)
+    assert not is_stale('t', str(source), directory=directory)
+
+    os.utime(source, (os.path.getmtime(path) + 10,) * 2)
+    assert is_stale('t', str(source), directory=directory)
+
+
+def _write_many(directory, worker):
+    df = pd.DataFrame({'worker': [worker] * 1000, 'x': range(1000)})
+    for _ in range(20):
+        write_table(df, 't', directory)
+
+
+def test_concurrent_writers_do_not_collide(tmp_path):
+    directory = str(tmp_path)
+    with ThreadPoolExecutor(4) as threads, ProcessPoolExecutor(2) as processes:
+        futures = [threads.submit(_write_many, directory, i) for i in range(4)]
+        futures += [processes.submit(_write_many, directory, i) for i in range(4, 6)]
+        for future in futures:
+            future.result()
+    df = read_table('t', directory)
+    assert len(df) == 1000 and df['worker'].nunique() == 1
+    assert os.listdir(directory) == ['t.arrow']
+
+
+def test_failed_write_leaves_no_temp_file(tmp_path, monkeypatch):
+    def fail(src, dst):
+        raise OSError('disk penuh')
+
+    monkeypatch.setattr(os, 'replace', fail)
+    with pytest.raises(OSError):
+        write_table(pd.DataFrame({'a': [1]}), 't', str(tmp_path))
+    assert os.listdir(tmp_path) == []
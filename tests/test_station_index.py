@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from spklu.coverage import EARTH_RADIUS_KM
+from spklu.station_index import SATURATION_RADIUS_KM, StationIndex, count_column
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def test_counts_and_nearest_match_brute_force():
+    rng = np.random.default_rng(0)
+    st_lat, st_lon = rng.uniform(40, 41, 300), rng.uniform(-75, -74, 300)
+    pt_lat, pt_lon = rng.uniform(40, 41, 20), rng.uniform(-75, -74, 20)
+    index = StationIndex(st_lat, st_lon)
+    dist = haversine_km(pt_lat[:, None], pt_lon[:, None], st_lat[None, :], st_lon[None, :])
+    for radius in (2, 10):
+        np.testing.assert_array_equal(index.count_within(pt_lat, pt_lon, radius),
+                                      (dist <= radius).sum(axis=1))
+    np.testing.assert_allclose(index.nearest_km(pt_lat, pt_lon), dist.min(axis=1))
+
+
+def test_from_frame_keeps_active_stations_with_coordinates():
+    df = pd.DataFrame({'latitude': [40.0, 40.0, np.nan], 'longitude': [-74.0, -74.0, -74.0],
+                       'status': ['E', 'T', 'E']})
+    assert StationIndex.from_frame(df).size == 1
+
+
+def test_gap_frame_saturation_and_empty_index():
+    index = StationIndex([40.0, 40.01], [-74.0, -74.0])
+    recs = pd.DataFrame({'avg_latitude': [40.0, 10.0], 'avg_longitude': [-74.0, 10.0],
+                         'predicted_demand_covered': [4, 0]}, index=[7, 9])
+    gaps = index.gap_frame(recs, radii=(5,))
+    assert list(gaps.index) == [7, 9]
+    assert gaps[count_column(SATURATION_RADIUS_KM)].tolist() == [2, 0]
+    assert gaps.loc[7, 'saturasi'] == 0.5 and np.isnan(gaps.loc[9, 'saturasi'])
+
+    empty = StationIndex([], []).gap_analysis([40.0], [-74.0])
+    assert empty['jarak_terdekat_km'].iloc[0] == np.inf
+    assert empty[count_column(5)].iloc[0] == 0
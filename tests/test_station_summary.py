@@ -0,0 +1,102 @@
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from spklu.station_summary import SUMMARIES, StationSummaries, summarize_frame
+from spklu.station_sync import SQLiteSource
+
+TABLE = 'clean_fuel_stations'
+
+
+@pytest.fixture
+def stations():
+    rng = np.random.default_rng(0)
+    n = 500
+    return pd.DataFrame({
+        'station_name': [f'S{i}' for i in range(n)],
+        'latitude': rng.uniform(30, 45, n),
+        'longitude': rng.uniform(-120, -75, n),
+        'city': rng.choice(['Austin', 'Denver', None], n),
+        'state': rng.choice(['TX', 'CO', 'CA', None], n),
+        # seri jumlah antar fuel type diuji lewat urutan nama
+        'fuel_type': rng.choice(['ELEC', 'CNG', 'LPG', None], n),
+        'status': rng.choice(['E', 'T', 'P'], n, p=[0.8, 0.1, 0.1]),
+    })
+
+
+@pytest.fixture
+def source(stations, tmp_path):
+    path = str(tmp_path / 'stations.db')
+    with sqlite3.connect(path) as con:
+        stations.to_sql(TABLE, con, index=False)
+    return SQLiteSource(path, TABLE)
+
+
+def wait_for(summaries, name, errors=False, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        frame = summaries.get(name)
+        if frame is not None or (errors and name in summaries.errors):
+            return frame
+        time.sleep(0.01)
+    raise AssertionError(f'ringkasan {name} tidak selesai')
+
+
+@pytest.mark.parametrize('name', list(SUMMARIES))
+def test_sql_matches_pandas(stations, source, name):
+    summaries = StationSummaries(source)
+    pd.testing.assert_frame_equal(source.run_query(summaries.query(name)),
+                                  summarize_frame(stations, name), check_dtype=False)
+
+
+def test_get_does_not_wait_for_the_query(source):
+    summaries = StationSummaries(source)
+    assert summaries.get('kpi') is None
+    assert summaries.age('kpi') is None
+    frame = wait_for(summaries, 'kpi')
+    assert frame['total_stations'].iloc[0] > 0
+    assert summaries.age('kpi') >= 0
+
+
+class FlakySource(SQLiteSource):
+    def __init__(self, database, table, error):
+        super().__init__(database, table)
+        self.error = error
+        self.calls = 0
+
+    def run_query(self, sql):
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return super().run_query(sql)
+
+
+def test_warehouse_error_backs_off(source):
+    flaky = FlakySource(source.database, TABLE, sqlite3.OperationalError('database is locked'))
+    summaries = StationSummaries(flaky, backoff=0.5)
+    assert wait_for(summaries, 'kpi', errors=True) is None
+    assert 'database is locked' in summaries.errors['kpi']
+    for _ in range(5):
+        assert summaries.get('kpi') is None
+    assert flaky.calls == 1
+
+    # setelah jeda backoff query dicoba lagi
+    flaky.error = None
+    assert wait_for(summaries, 'kpi') is not None
+    assert flaky.calls == 2
+    assert 'kpi' not in summaries.errors
+
+
+def test_other_errors_reach_the_caller(source):
+    summaries = StationSummaries(FlakySource(source.database, TABLE, KeyError('kolom')))
+    with pytest.raises(KeyError):
+        wait_for(summaries, 'kpi')
+
+
+def test_prefetch_fills_every_summary(source):
+    summaries = StationSummaries(source)
+    summaries.prefetch()
+    assert all(summaries.get(name) is not None for name in SUMMARIES)
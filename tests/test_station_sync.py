@@ -0,0 +1,189 @@
+import sqlite3
+import time
+
+import pandas as pd
+import pytest
+
+from spklu.frame_schema import compact_stations
+from spklu.snapshot_store import write_table
+from spklu.station_sync import BigQuerySource, SQLiteSource, StationSync
+
+TABLE = 'clean_fuel_stations'
+
+
+def station_rows(**overrides):
+    rows = pd.DataFrame({
+        'station_id': [1, 2],
+        'station_name': ['Alpha', 'Beta'],
+        'latitude': [37.774929, 40.712776],
+        'longitude': [-122.419416, -74.005974],
+        'city': ['San Francisco', 'New York'],
+        'state': ['CA', 'NY'],
+        'fuel_type': ['ELEC', 'ELEC'],
+        'status': ['E', 'E'],
+        'updated_at': ['2025-01-01', '2025-01-01'],
+    })
+    return rows.assign(**overrides)
+
+
+@pytest.fixture
+def database(tmp_path):
+    path = str(tmp_path / 'stations.db')
+    with sqlite3.connect(path) as con:
+        station_rows().to_sql(TABLE, con, index=False)
+    return path
+
+
+def execute(database, sql, *params):
+    with sqlite3.connect(database) as con:
+        con.execute(sql, params)
+
+
+@pytest.fixture
+def sync(database, tmp_path):
+    return StationSync(SQLiteSource(database, TABLE, watermark_col='updated_at'),
+                       directory=str(tmp_path / 'snapshot'))
+
+
+def test_delta_update_keeps_one_row_per_station(sync, database):
+    sync.sync()
+    execute(database, "UPDATE clean_fuel_stations SET fuel_type = 'CNG', "
+                      "updated_at = '2025-02-01' WHERE station_name = 'Alpha'")
+    df = sync.sync()
+    assert len(df) == 2
+    assert df.set_index('station_name').loc['Alpha', 'fuel_type'] == 'CNG'
+    assert df['latitude'].dtype == 'float64'
+
+
+def test_float32_snapshot_from_older_version_triggers_full_load(sync, database):
+    write_table(compact_stations(station_rows()), sync.table, sync.directory)
+    execute(database, "UPDATE clean_fuel_stations SET updated_at = '2025-02-01' "
+                      "WHERE station_name = 'Alpha'")
+    df = sync.sync()
+    assert len(df) == 2
+    assert df['latitude'].dtype == 'float64'
+
+
+def test_full_load_keeps_only_active_stations(sync, database):
+    execute(database, "INSERT INTO clean_fuel_stations (station_id, station_name, latitude, "
+                      "longitude, status, updated_at) VALUES (3, 'Gamma', 1.0, 2.0, 'T', "
+                      "'2025-01-01')")
+    df = sync.sync()
+    assert sorted(df['station_name']) == ['Alpha', 'Beta']
+    assert sync.load_snapshot()['station_name'].tolist() == df['station_name'].tolist()
+
+
+def test_delta_inserts_new_station(sync, database):
+    sync.sync()
+    execute(database, "INSERT INTO clean_fuel_stations (station_id, station_name, latitude, "
+                      "longitude, status, updated_at) VALUES (3, 'Gamma', 1.0, 2.0, 'E', "
+                      "'2025-02-01')")
+    df = sync.sync()
+    assert sorted(df['station_name']) == ['Alpha', 'Beta', 'Gamma']
+
+
+def test_deactivated_station_is_removed(sync, database):
+    sync.sync()
+    execute(database, "UPDATE clean_fuel_stations SET status = 'T', "
+                      "updated_at = '2025-02-01' WHERE station_name = 'Beta'")
+    assert sync.sync()['station_name'].tolist() == ['Alpha']
+
+
+def test_hard_deleted_station_is_removed_on_reconcile(sync, database):
+    sync.sync()
+    execute(database, "DELETE FROM clean_fuel_stations WHERE station_name = 'Beta'")
+    assert sorted(sync.sync()['station_name']) == ['Alpha', 'Beta']
+    assert sync.sync(reconcile=True)['station_name'].tolist() == ['Alpha']
+
+
+def test_moved_station_without_id_keeps_one_row_after_reconcile(sync, database):
+    sync.sync()
+    execute(database, "UPDATE clean_fuel_stations SET latitude = 37.8, "
+                      "updated_at = '2025-02-01' WHERE station_name = 'Alpha'")
+    df = sync.sync(reconcile=True)
+    assert len(df) == 2
+    assert df.set_index('station_name').loc['Alpha', 'latitude'] == 37.8
+
+
+class CountingSource(SQLiteSource):
+    key_queries = 0
+
+    def active_keys(self):
+        self.key_queries += 1
+        return super().active_keys()
+
+
+def test_reconcile_runs_only_when_interval_elapsed(database, tmp_path, monkeypatch):
+    source = CountingSource(database, TABLE, watermark_col='updated_at')
+    snapshot_dir = str(tmp_path / 'snapshot')
+    StationSync(source, directory=snapshot_dir).sync()
+    sync = StationSync(source, directory=snapshot_dir, reconcile_interval=3600)
+    # snapshot dari proses sebelumnya: delta sync pertama selalu rekonsiliasi
+    sync.sync()
+    sync.sync()
+    assert source.key_queries == 1
+    now = time.monotonic()
+    monkeypatch.setattr(time, 'monotonic', lambda: now + 3600)
+    sync.sync()
+    assert source.key_queries == 2
+
+
+def test_reconcile_off_by_default(sync, database, monkeypatch):
+    monkeypatch.setattr(sync.source, 'active_keys', lambda: pytest.fail('full scan'))
+    sync.sync()
+    sync.sync()
+
+
+def test_station_id_is_the_merge_key(database, tmp_path):
+    source = SQLiteSource(database, TABLE, watermark_col='updated_at', id_col='station_id')
+    sync = StationSync(source, directory=str(tmp_path / 'snapshot'))
+    assert sync.key == ('station_id',)
+    sync.sync()
+    execute(database, "UPDATE clean_fuel_stations SET station_name = 'Alpha 2', "
+                      "latitude = 37.8, updated_at = '2025-02-01' WHERE station_id = 1")
+    df = sync.sync().set_index('station_id')
+    assert len(df) == 2
+    assert df.loc[1, 'station_name'] == 'Alpha 2'
+
+
+def test_unchanged_source_returns_snapshot(sync):
+    first = sync.sync()
+    second = sync.sync()
+    pd.testing.assert_frame_equal(first, second)
+
+
+class FakeField:
+    def __init__(self, name, field_type):
+        self.name = name
+        self.field_type = field_type
+
+
+class FakeBigQueryClient:
+    def __init__(self, schema):
+        self.schema = schema
+        self.job_configs = []
+
+    def get_table(self, table):
+        return type('Table', (), {'schema': self.schema})()
+
+    def query(self, sql, job_config=None):
+        self.job_configs.append(job_config)
+        result = type('Rows', (), {'to_dataframe_iterable': lambda rows: iter([])})()
+        return type('Job', (), {'result': lambda job, page_size=None: result})()
+
+
+@pytest.mark.parametrize('field_type, since, param_type, value', [
+    ('TIMESTAMP', '2025-01-01 10:00:00', 'TIMESTAMP',
+     pd.Timestamp('2025-01-01 10:00', tz='UTC')),
+    ('DATE', '2025-01-01', 'DATE', pd.Timestamp('2025-01-01').date()),
+    ('INTEGER', 1735725600, 'INT64', 1735725600),
+])
+def test_bigquery_since_parameter_takes_column_type(field_type, since, param_type, value):
+    pytest.importorskip('google.cloud.bigquery')
+    client = FakeBigQueryClient([FakeField('station_name', 'STRING'),
+                                 FakeField('updated_at', field_type)])
+    source = BigQuerySource(client, 'project.dataset.table', watermark_col='updated_at')
+    list(source.iter_pages(since=since))
+    (param,) = client.job_configs[0].query_parameters
+    assert param.type_ == param_type
+    assert param.value == value
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+
+from spklu import benchmark
+from spklu.snapshot_store import recommendation_frame, zip_state_index
+from spklu.station_sync import STATION_COLUMNS
+from spklu.synthetic import CITY_HUBS, FUEL_TYPES, synthetic_stations, synthetic_zip_tables
+
+
+def test_stations_match_warehouse_schema():
+    df = synthetic_stations(2000, seed=3)
+    assert list(df.columns) == STATION_COLUMNS
+    assert len(df) == 2000 and df['station_name'].is_unique
+    assert df['latitude'].dtype == np.float64 and df['longitude'].dtype == np.float64
+    assert set(df['fuel_type']) <= set(FUEL_TYPES)
+    assert (df['status'] == 'E').all()
+    hubs = {(city, state) for city, state, *_ in CITY_HUBS}
+    assert set(zip(df['city'], df['state'])) <= hubs
+    pd.testing.assert_frame_equal(df, synthetic_stations(2000, seed=3))
+
+
+def test_zip_tables_match_csv_schema():
+    zip_state, recommendations = synthetic_zip_tables(500, seed=1)
+    assert list(zip_state.columns) == ['State', 'ZIP']
+    assert list(recommendations.columns) == ['id', 'avg_latitude', 'avg_longitude', 'demand']
+    assert zip_state['ZIP'].str.fullmatch(r'\d{5}').all()
+    assert zip_state['ZIP'].is_unique
+    assert (recommendations['demand'] >= 1).all()
+    # ZIP yang sama di kedua tabel: semua rekomendasi mendapat State
+    df = recommendation_frame(recommendations, zip_state_index(zip_state))
+    assert df['State'].notna().all()
+
+
+def test_zip_count_is_capped(monkeypatch):
+    monkeypatch.setattr(benchmark, 'MAX_ZIPS', 50)
+    stages = benchmark.stage_functions(1000)
+    assert stages['zip_state_merge'][0] == 50
+    assert stages['kmeans_zoning'][0] == 1000
+    assert len(stages['recommendation_filter_top_n'][1]()) <= benchmark.TOP_N
+    assert benchmark.stage_functions(20)['zip_state_merge'][0] == 4
+
+
+def test_run_and_compare_small_scale():
+    report = benchmark.run(sizes=(300,), repeats=1, model_path=None,
+                           stages=['zip_state_merge', 'cluster_profile'])
+    assert {r['stage'] for r in report['results']} == {'zip_state_merge', 'cluster_profile'}
+    assert all(r['n_stations'] == 300 and r['median_s'] > 0 for r in report['results'])
+    assert report['meta']['seed'] == 0
+    speedups = benchmark.compare(report, report)
+    assert speedups == {'zip_state_merge@300': 1.0, 'cluster_profile@300': 1.0}
@@ -0,0 +1,85 @@
+import json
+import sys
+import threading
+
+import pytest
+
+from spklu import warmup
+from spklu.warmup import Warmup, timed_import, warmup_enabled
+
+
+def wait_all(w):
+    for future in w._futures.values():
+        future.result(timeout=10)
+
+
+def test_jobs_run_once_in_background():
+    calls = {'a': 0, 'b': 0}
+    release = threading.Event()
+
+    def job(name):
+        def run():
+            if name == 'b':
+                release.wait(10)
+            calls[name] += 1
+        return run
+
+    w = Warmup({'a': job('a'), 'b': job('b')})
+    w._futures['a'].result(timeout=10)
+    assert w.done('a') and not w.done('b')
+    assert w.pending() == ['b']
+    release.set()
+    wait_all(w)
+    assert w.pending() == []
+    assert calls == {'a': 1, 'b': 1}
+    assert set(w.durations) == {'a', 'b'}
+    # job yang tidak dikenal dianggap selesai
+    assert w.done('lain')
+
+
+def test_failed_job_is_reported():
+    def fail():
+        raise FileNotFoundError('model.pkl')
+
+    w = Warmup({'model': fail, 'data': lambda: None})
+    wait_all(w)
+    assert w.pending() == []
+    assert 'FileNotFoundError' in w.errors['model']
+    assert 'data' not in w.errors
+    assert w.mark_render(complete=True)['warmup_errors'] == w.errors
+
+
+def test_blocking_mode_runs_jobs_before_returning(monkeypatch):
+    monkeypatch.setenv(warmup.WARMUP_ENV, '0')
+    assert not warmup_enabled()
+    calls = []
+    w = Warmup({'a': lambda: calls.append('a'), 'b': lambda: calls.append('b')},
+               background=warmup_enabled())
+    assert calls == ['a', 'b']
+    assert w.pending() == [] and w.done('a')
+    monkeypatch.setenv(warmup.WARMUP_ENV, '1')
+    assert warmup_enabled()
+
+
+def test_mark_render_reports_cold_start_once():
+    w = Warmup({}, background=False)
+    assert w.mark_render(complete=False) is None
+    first_paint = w.first_paint
+    assert first_paint is not None and w.first_full_render is None
+    summary = w.mark_render(complete=True)
+    assert summary['event'] == 'cold_start'
+    assert summary['first_paint_seconds'] == first_paint
+    assert summary['first_full_render_seconds'] >= first_paint
+    assert w.mark_render(complete=True) is None
+    assert w.first_paint == first_paint
+
+
+def test_timed_import_records_only_new_imports(monkeypatch):
+    monkeypatch.setattr(warmup, 'IMPORT_TIMES', {})
+    assert timed_import('json') is json
+    assert 'json' not in warmup.IMPORT_TIMES
+    monkeypatch.delitem(sys.modules, 'colorsys', raising=False)
+    timed_import('colorsys')
+    assert warmup.IMPORT_TIMES['colorsys'] >= 0
+    with pytest.raises(ImportError):
+        timed_import('modul_yang_tidak_ada')
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from spklu.batch_scoring import prepare_sites
+from spklu.whatif import MAX_POINTS, SweepRunner, SweepSpec, heatmap_table
+
+pytestmark = pytest.mark.usefixtures('pandas_output')
+
+
+def small_spec(**kwargs):
+    return SweepSpec.from_ranges(
+        facilities=['HOTEL', 'PUBLIC'], networks=['Tesla', 'EVgo', 'FLO'],
+        ranges={'total_level2': (0, 10, 3), 'total_dc_fast': (0, 4, 2),
+                'avg_station_age_days': (100, 1000, 2)}, **kwargs)
+
+
+def test_grid_points_cover_every_combination():
+    spec = small_spec()
+    points = spec.points()
+    assert spec.size == len(points) == 2 * 3 * 3 * 2 * 2
+    assert not points.duplicated().any()
+    assert sorted(points['total_level2'].unique()) == [0, 5, 10]
+
+
+def test_random_points_are_reproducible_and_in_range():
+    spec = small_spec(mode='random', n_samples=500, seed=3)
+    points = spec.points()
+    assert len(points) == 500
+    assert points.equals(small_spec(mode='random', n_samples=500, seed=3).points())
+    assert points['avg_station_age_days'].between(100, 1000).all()
+    assert spec.key() != small_spec(mode='random', n_samples=500, seed=4).key()
+
+
+def test_invalid_specs_are_rejected():
+    with pytest.raises(ValueError):
+        SweepSpec.from_ranges(facilities=[]).validate()
+    with pytest.raises(ValueError):
+        SweepSpec.from_ranges(ranges={'total_level2': (0, 1000, MAX_POINTS)}).validate()
+
+
+def test_parallel_sweep_matches_serial(model):
+    spec = small_spec()
+    serial, info = SweepRunner(model, workers=1, cache_dir=None).run(spec)
+    assert info['workers'] == 1
+    runner = SweepRunner(model, workers=2, parallel_min_points=1, chunk_size=16,
+                         cache_dir=None)
+    try:
+        parallel, info = runner.run(spec)
+    finally:
+        runner.close()
+    assert info['workers'] == 2
+    np.testing.assert_allclose(parallel['predicted_demand'], serial['predicted_demand'])
+    np.testing.assert_allclose(serial['predicted_demand'],
+                               model.predict(prepare_sites(spec.points(), model)))
+    assert heatmap_table(serial).shape == (2, 3)
+
+
+def test_results_are_cached_per_model_and_spec(model, tmp_path):
+    runner = SweepRunner(model, workers=1, cache_dir=str(tmp_path))
+    first, info = runner.run(small_spec())
+    assert not info['cached']
+    second, info = runner.run(small_spec())
+    assert info['cached']
+    np.testing.assert_array_equal(first['predicted_demand'], second['predicted_demand'])
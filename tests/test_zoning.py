@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from spklu.shared_cache import SharedCache, SQLiteBackend
+from spklu.zoning import Zoning, ZoningService, fingerprint
+
+
+def blobs(n_per_blob=50, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = np.array([[37.0, -122.0], [40.7, -74.0], [29.7, -95.4]])
+    points = np.concatenate([c + rng.normal(scale=0.1, size=(n_per_blob, 2)) for c in centers])
+    return pd.DataFrame(points, columns=['latitude', 'longitude'])
+
+
+def test_fingerprint_changes_with_data():
+    X = blobs()
+    assert fingerprint(X) == fingerprint(X.copy())
+    assert fingerprint(X) != fingerprint(X.assign(latitude=X['latitude'] + 1e-6))
+
+
+def test_zoning_frame_roundtrip():
+    zoning = Zoning(k=2, labels=np.array([0, 1, 1], dtype=np.int32),
+                    centroids=np.array([[0.0, 1.0], [2.0, 3.0]]), inertia=1.5,
+                    method='kmeans')
+    restored = Zoning.from_frame(zoning.to_frame())
+    assert restored.k == 2 and restored.method == 'kmeans' and restored.inertia == 1.5
+    np.testing.assert_array_equal(restored.labels, zoning.labels)
+    np.testing.assert_array_equal(restored.centroids, zoning.centroids)
+
+
+def test_precompute_fills_every_k():
+    X = blobs()
+    service = ZoningService(k_range=range(2, 5))
+    fp = service.precompute(X)
+    for k in range(2, 5):
+        zoning = service.get(X, k, fp=fp)
+        assert service.is_ready(fp, k)
+        assert zoning.k == k and len(zoning.labels) == len(X)
+    # tiga blob terpisah jauh: k=3 memisahkan tiap blob
+    labels = service.get(X, 3, fp=fp).labels.reshape(3, -1)
+    assert all(len(set(row)) == 1 for row in labels)
+    assert len({row[0] for row in labels}) == 3
+
+
+def test_minibatch_for_large_inputs():
+    X = blobs()
+    service = ZoningService(k_range=range(3, 4), minibatch_threshold=10)
+    assert service.get(X, 3).method == 'minibatch'
+
+
+def test_shared_cache_reuses_fit_across_services(tmp_path):
+    X = blobs()
+    shared = SharedCache(SQLiteBackend(str(tmp_path / 'cache.sqlite')))
+    first = ZoningService(k_range=range(3, 4), shared=shared).get(X, 3)
+    second = ZoningService(k_range=range(3, 4), shared=shared).get(X, 3)
+    assert shared.stats['miss'] == 1 and shared.stats['hit'] == 1
+    np.testing.assert_array_equal(first.labels, second.labels)
+    np.testing.assert_allclose(first.centroids, second.centroids)